@@ -1,220 +1,152 @@
 import ttkbootstrap as ttk
 import tkinter as tk
 from ttkbootstrap.constants import *
-from tkinter import filedialog, simpledialog, messagebox
-import pandas as pd
-from tkinter.scrolledtext import ScrolledText
-import numpy as np
+from tkinter import messagebox
+import app
+from analisis_core.profiling import PROFILER
+from widgets import DataGrid
 
-class DatasetApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Analizador de Datasets")
-        self.root.geometry("1024x600")
-        self.root.minsize(900, 500)
-        self.style = ttk.Style("morph")
+# Pestañas: parte del análisis que muestra cada una y su título
+TABS = [
+    ("dataset", "Dataset"),
+    ("targets", "Targets"),
+    ("fdr", "FDR"),
+    ("pearson", "Pearson"),
+    ("cross", "Correlación Cruzada"),
+]
 
-        self.df = None
-        self.targets = None
-        self.fdr_results = {}
-        self.cross_correlation = None
-        self.pearson = None
+class FilterDialog:
+    FIELDS = [
+        ("rows", "Filas (p. ej. 0-99, 150):"),
+        ("columns", "Columnas (índices, nombres o patrones como temp_*):"),
+        ("max_row_nan", "Máx. fracción de NaN por fila (0-1):"),
+        ("max_column_nan", "Máx. fracción de NaN por columna (0-1):"),
+        ("low", "Valor mínimo permitido:"),
+        ("high", "Valor máximo permitido:"),
+    ]
 
-        # Grupo de botones de acción
-        action_frame = ttk.Frame(root)
-        action_frame.pack(pady=10)
+    def __init__(self, parent):
+        self.top = ttk.Toplevel(parent)
+        self.top.title("Filtrar filas y columnas")
+        self.result = None
 
-        ttk.Button(action_frame, text="Abrir CSV", command=self.load_csv).grid(row=0, column=0, padx=5)
-        ttk.Button(action_frame, text="Seleccionar Target", command=self.select_target).grid(row=0, column=1, padx=5)
-        ttk.Button(action_frame, text="Eliminar Fila", command=self.drop_row).grid(row=0, column=2, padx=5)
-        ttk.Button(action_frame, text="Eliminar Columna", command=self.drop_column).grid(row=0, column=3, padx=5)
-        ttk.Button(action_frame, text="Calcular FDR", command=self.compute_fdr, bootstyle=INFO).grid(row=1, column=0, padx=5, pady=5)
-        ttk.Button(action_frame, text="Coef. Pearson", command=self.compute_pearson_coef, bootstyle=INFO).grid(row=1, column=1, padx=5, pady=5)
-        ttk.Button(action_frame, text="Correlación Cruzada", command=self.compute_cross_correlation, bootstyle=INFO).grid(row=1, column=2, padx=5, pady=5)
+        self.entries = {}
+        for key, label in self.FIELDS:
+            ttk.Label(self.top, text=label).pack(padx=10, pady=(10, 0), anchor="w")
+            self.entries[key] = ttk.Entry(self.top, width=40)
+            self.entries[key].pack(padx=10, pady=2, fill="x")
 
-        # Notebook de pestañas para visualización
-        notebook = ttk.Notebook(root)
-        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        self.constant_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.top, text="Eliminar columnas sin variación", variable=self.constant_var).pack(pady=5)
 
-        self.tabs = {}
-        for name in ["Dataset", "Targets", "FDR", "Pearson", "Correlación Cruzada"]:
-            tab = ttk.Frame(notebook)
-            notebook.add(tab, text=name)
-            self.tabs[name] = tab
+        btn_frame = ttk.Frame(self.top)
+        btn_frame.pack(pady=10)
 
-        self.text_widgets = {}
-        for name in self.tabs:
-            frame = ttk.Frame(self.tabs[name], padding=10)
-            frame.pack(fill="both", expand=True)
-            self.text_widgets[name] = create_styled_scrolledtext(frame, width=120, height=20)
-            self.text_widgets[name].pack(fill="both", expand=True)
-
-    def load_csv(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
-        if file_path:
-            dialog = CSVOptionsDialog(self.root)
-            if dialog.result:
-                sep, has_header = dialog.result
-                try:
-                    header = 0 if has_header else None
-                    self.resetAll()
-                    self.df = pd.read_csv(file_path, sep=sep, header=header)
-                    self.display_dataframe()
-                except Exception as e:
-                    messagebox.showerror("Error", f"No se pudo abrir el archivo: {e}")
-
-    def select_target(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "No hay ningún DataFrame cargado.")
-            return
-        try:
-            column_input = simpledialog.askstring("Seleccionar target", "Nombre o índice de la columna target:")
-            if column_input is None or column_input.strip() == "":
-                return
-            try:
-                column_key = int(column_input)
-            except ValueError:
-                column_key = column_input.strip()
-            if column_key not in self.df.columns:
-                messagebox.showerror("Error", f"La columna '{column_key}' no existe.")
-                return
-            self.targets = self.df[column_key]
-            self.df.drop(column_key, axis=1, inplace=True)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al seleccionar el target: {e}")
-
-    def drop_row(self):
-        if self.df is None:
-            return
+        ttk.Button(btn_frame, text="Aceptar", command=self.on_accept, bootstyle=SUCCESS).pack(side=LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancelar", command=self.top.destroy, bootstyle=DANGER).pack(side=LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
         try:
-            index = simpledialog.askinteger("Eliminar Fila", "Índice de la fila a eliminar:")
-            if index is not None:
-                self.df.drop(index, axis=0, inplace=True)
-                self.df.reset_index(drop=True, inplace=True)
-                if self.targets is not None:
-                    self.targets.drop(index, axis=0, inplace=True)
-                    self.targets.reset_index(drop=True, inplace=True)
-                self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar la fila: {e}")
-
-    def drop_column(self):
-        if self.df is None:
+            numbers = {key: float(values[key]) if values[key] else None
+                       for key in ("max_row_nan", "max_column_nan", "low", "high")}
+        except ValueError as e:
+            messagebox.showerror("Error", f"Valor numérico inválido: {e}", parent=self.top)
             return
-        try:
-            column_input = simpledialog.askstring("Eliminar Columna", "Nombre o índice de la columna:")
-            if column_input is None or column_input.strip() == "":
-                return
-            try:
-                column_key = int(column_input)
-            except ValueError:
-                column_key = column_input.strip()
-            if column_key not in self.df.columns:
-                messagebox.showerror("Error", f"La columna '{column_key}' no existe.")
-                return
-            self.df.drop(column_key, axis=1, inplace=True)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar la columna: {e}")
-
-    def compute_fdr(self):
-        if self.df is None or self.targets is None:
-            messagebox.showwarning("Advertencia", "Dataset o targets no inicializados.")
+        bounds = None
+        if numbers["low"] is not None or numbers["high"] is not None:
+            bounds = (numbers["low"], numbers["high"])
+        options = {
+            "max_row_nan": numbers["max_row_nan"],
+            "max_column_nan": numbers["max_column_nan"],
+            "drop_constant": self.constant_var.get(),
+            "bounds": bounds,
+        }
+        self.result = (values["rows"], values["columns"], options)
+        self.top.destroy()
+
+class MultiTargetDialog:
+    def __init__(self, parent, targets=""):
+        self.top = ttk.Toplevel(parent)
+        self.top.title("FDR con varios targets")
+        self.result = None
+
+        ttk.Label(self.top, text="Columnas target (índices, nombres o patrones como clase_*):").pack(padx=10, pady=(10, 0), anchor="w")
+        self.targets_entry = ttk.Entry(self.top, width=40)
+        self.targets_entry.insert(0, targets)
+        self.targets_entry.pack(padx=10, pady=2, fill="x")
+
+        self.one_vs_rest_var = ttk.BooleanVar(value=True)
+        ttk.Checkbutton(self.top, text="Cada clase contra el resto", variable=self.one_vs_rest_var).pack(pady=5)
+        self.class_pairs_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.top, text="Desglose por pares de clases", variable=self.class_pairs_var).pack(pady=5)
+
+        btn_frame = ttk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        ttk.Button(btn_frame, text="Aceptar", command=self.on_accept, bootstyle=SUCCESS).pack(side=LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancelar", command=self.top.destroy, bootstyle=DANGER).pack(side=LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        text = self.targets_entry.get().strip()
+        if not text:
+            messagebox.showerror("Error", "Indique al menos una columna target.", parent=self.top)
             return
+        self.result = (text, self.one_vs_rest_var.get(), self.class_pairs_var.get())
+        self.top.destroy()
+
+class SelectionDialog:
+    def __init__(self, parent, k=10):
+        self.top = ttk.Toplevel(parent)
+        self.top.title("Seleccionar características")
+        self.result = None
+
+        ttk.Label(self.top, text="Características a elegir:").pack(padx=10, pady=(10, 0), anchor="w")
+        self.k_entry = ttk.Entry(self.top)
+        self.k_entry.insert(0, str(k))
+        self.k_entry.pack(padx=10, pady=2, fill="x")
+
+        ttk.Label(self.top, text="Peso de la redundancia (0 = sólo relevancia):").pack(padx=10, pady=(10, 0), anchor="w")
+        self.weight_entry = ttk.Entry(self.top)
+        self.weight_entry.insert(0, "1.0")
+        self.weight_entry.pack(padx=10, pady=2, fill="x")
+
+        ttk.Label(self.top, text="Relevancia:").pack(padx=10, pady=(10, 0), anchor="w")
+        self.relevance_var = ttk.StringVar(value="FDR")
+        ttk.Combobox(self.top, textvariable=self.relevance_var, values=("FDR", "Información mutua"),
+                     state="readonly").pack(padx=10, pady=2, fill="x")
+
+        self.apply_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.top, text="Conservar sólo las elegidas (se puede deshacer)", variable=self.apply_var).pack(pady=5)
+
+        btn_frame = ttk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        ttk.Button(btn_frame, text="Aceptar", command=self.on_accept, bootstyle=SUCCESS).pack(side=LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cancelar", command=self.top.destroy, bootstyle=DANGER).pack(side=LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
         try:
-            classes = np.unique(self.targets)
-            fdr_values = np.zeros(self.df.shape[1])
-            for f in range(self.df.shape[1]):
-                fdr_f = 0.0
-                means = []
-                variances = []
-                for c in classes:
-                    X_c = self.df.loc[self.targets == c].iloc[:, f]
-                    means.append(np.mean(X_c))
-                    variances.append(np.var(X_c) + 1e-8)
-                for i in range(len(classes)):
-                    for j in range(len(classes)):
-                        if i != j:
-                            numerator = (means[i] - means[j]) ** 2
-                            denominator = variances[i] + variances[j]
-                            fdr_f += numerator / denominator
-                fdr_values[f] = fdr_f
-            self.fdr_results = sorted(zip(self.df.columns, fdr_values), key=lambda x: x[1], reverse=True)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al calcular FDR: {e}")
-
-    def compute_cross_correlation(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+            k = int(self.k_entry.get())
+            weight = float(self.weight_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Indique un número de características y un peso válidos.", parent=self.top)
             return
-        try:
-            corr = np.abs(np.corrcoef(self.df, rowvar=False))
-            np.fill_diagonal(corr, 0)
-            self.cross_correlation = np.sum(corr, axis=0)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo calcular la correlación cruzada: {e}")
-
-    def compute_pearson_coef(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+        if k < 1:
+            messagebox.showerror("Error", "Hay que elegir al menos una característica.", parent=self.top)
             return
-        try:
-            coef = simpledialog.askfloat("Coeficiente de Pearson", "Ingrese el coeficiente de Pearson")
-            if coef is None:
-                return
-            corr = np.abs(np.corrcoef(self.df, rowvar=False))
-            columns = self.df.columns
-            selected_pairs = []
-            for i in range(corr.shape[0]):
-                for j in range(i + 1, corr.shape[1]):
-                    if corr[i, j] >= coef:
-                        selected_pairs.append((columns[i], corr[i, j]))
-                        selected_pairs.append((columns[j], corr[i, j]))
-            pearson_dict = {}
-            for name, value in selected_pairs:
-                if name not in pearson_dict or pearson_dict[name] < value:
-                    pearson_dict[name] = value
-            self.pearson = sorted(pearson_dict.items(), key=lambda x: x[1], reverse=True)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo calcular Pearson: {e}")
-
-    def display_dataframe(self):
-        if self.df is not None:
-            self.set_text("Dataset", self.df.to_string())
-        if self.targets is not None:
-            self.set_text("Targets", self.targets.to_string())
-        if self.fdr_results:
-            df_fdr = pd.DataFrame(self.fdr_results, columns=["Característica", "FDR"])
-            df_fdr["FDR"] = df_fdr["FDR"].round(4)
-            self.set_text("FDR", df_fdr.to_string(index=False))
-        if self.pearson:
-            df_pearson = pd.DataFrame(self.pearson, columns=["Característica", "Pearson"])
-            df_pearson["Pearson"] = df_pearson["Pearson"].round(4)
-            self.set_text("Pearson", df_pearson.drop_duplicates().to_string(index=False))
-        if self.cross_correlation is not None:
-            df_cross = pd.DataFrame({
-                "Característica": self.df.columns,
-                "Correlación Cruzada": np.round(self.cross_correlation, 4)
-            })
-            self.set_text("Correlación Cruzada", df_cross.to_string(index=False))
-
-    def set_text(self, tab_name, content):
-        widget = self.text_widgets[tab_name]
-        widget.delete("1.0", "end")
-        widget.insert("end", content)
-
-    def resetAll(self):
-        self.df = None
-        self.targets = None
-        self.fdr_results = {}
-        self.cross_correlation = None
-        self.pearson = None
-        for widget in self.text_widgets.values():
-            widget.delete("1.0", "end")
+        relevance = "mi" if self.relevance_var.get() == "Información mutua" else "fdr"
+        self.result = (k, weight, relevance, self.apply_var.get())
+        self.top.destroy()
 
 class CSVOptionsDialog:
     def __init__(self, parent):
@@ -230,6 +162,13 @@ class CSVOptionsDialog:
         self.has_header_var = ttk.BooleanVar(value=True)
         ttk.Checkbutton(self.top, text="El archivo tiene encabezado", variable=self.has_header_var).pack(pady=5)
 
+        self.streaming_var = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(self.top, text="Modo streaming (archivos grandes)", variable=self.streaming_var).pack(pady=5)
+
+        ttk.Label(self.top, text="Columna target (opcional, nombre o índice):").pack(padx=10, pady=(10, 0))
+        self.target_entry = ttk.Entry(self.top)
+        self.target_entry.pack(padx=10, pady=5)
+
         btn_frame = ttk.Frame(self.top)
         btn_frame.pack(pady=10)
 
@@ -242,7 +181,8 @@ class CSVOptionsDialog:
     def on_accept(self):
         sep = self.sep_entry.get()
         has_header = self.has_header_var.get()
-        self.result = (sep, has_header)
+        # Con el target ya elegido, el modo streaming no vuelve a recorrer el archivo para elegirlo
+        self.result = (sep, has_header, self.streaming_var.get(), self.target_entry.get().strip())
         self.top.destroy()
 
 def create_styled_scrolledtext(parent, width=40, height=10):
@@ -256,7 +196,94 @@ def create_styled_scrolledtext(parent, width=40, height=10):
     scroll.pack(side="right", fill="y")
     return text_widget
 
-if __name__ == "__main__":
+class DatasetApp(app.DatasetApp):
+    csv_dialog = CSVOptionsDialog
+    filter_dialog = FilterDialog
+    multi_target_dialog = MultiTargetDialog
+    selection_dialog = SelectionDialog
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.root.title("Analizador de Datasets")
+        self.root.geometry("1024x600")
+        self.root.minsize(900, 500)
+        self.style = ttk.Style("morph")
+
+        # Grupo de botones de acción
+        action_frame = ttk.Frame(root)
+        action_frame.pack(pady=10)
+
+        ttk.Button(action_frame, text="Abrir CSV", command=self.load_csv).grid(row=0, column=0, padx=5)
+        ttk.Button(action_frame, text="Seleccionar Target", command=self.select_target).grid(row=0, column=1, padx=5)
+        ttk.Button(action_frame, text="Eliminar Fila", command=self.drop_row).grid(row=0, column=2, padx=5)
+        ttk.Button(action_frame, text="Eliminar Columna", command=self.drop_column).grid(row=0, column=3, padx=5)
+        ttk.Button(action_frame, text="Calcular FDR", command=self.compute_fdr, bootstyle=INFO).grid(row=1, column=0, padx=5, pady=5)
+        ttk.Button(action_frame, text="Coef. Pearson", command=self.compute_pearson_coef, bootstyle=INFO).grid(row=1, column=1, padx=5, pady=5)
+        ttk.Button(action_frame, text="Correlación Cruzada", command=self.compute_cross_correlation, bootstyle=INFO).grid(row=1, column=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Filtrar", command=self.filter_data).grid(row=1, column=3, padx=5, pady=5)
+        ttk.Button(action_frame, text="Estimación rápida", command=self.estimate, bootstyle=INFO).grid(row=1, column=4, columnspan=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="FDR varios targets", command=self.compute_multi_fdr, bootstyle=INFO).grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Información mutua", command=self.compute_mutual_information, bootstyle=INFO).grid(row=2, column=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Seleccionar características", command=self.select_features, bootstyle=INFO).grid(row=2, column=3, columnspan=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Guardar sesión", command=self.save_session).grid(row=3, column=0, columnspan=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Abrir sesión", command=self.open_session).grid(row=3, column=2, columnspan=2, padx=5, pady=5)
+        ttk.Button(action_frame, text="Deshacer", command=self.undo, bootstyle=SECONDARY).grid(row=0, column=4, padx=5)
+        ttk.Button(action_frame, text="Rehacer", command=self.redo, bootstyle=SECONDARY).grid(row=0, column=5, padx=5)
+
+        # Notebook de pestañas para visualización
+        notebook = ttk.Notebook(root)
+        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Dataset y targets se muestran en vistas virtualizadas; los resultados en texto
+        for part, name in TABS:
+            tab = ttk.Frame(notebook)
+            notebook.add(tab, text=name)
+            frame = ttk.Frame(tab, padding=10)
+            frame.pack(fill="both", expand=True)
+            if part in ("dataset", "targets"):
+                self.grids[part] = DataGrid(frame)
+                self.grids[part].pack(fill="both", expand=True)
+            else:
+                if part == "pearson":
+                    self.build_threshold_slider(frame)
+                self.text_widgets[part] = create_styled_scrolledtext(frame, width=120, height=20)
+                self.text_widgets[part].pack(fill="both", expand=True)
+
+        # Barra de estado de la tarea en segundo plano
+        status_frame = ttk.Frame(root)
+        status_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.status_var = tk.StringVar(value="Listo")
+        ttk.Label(status_frame, textvariable=self.status_var).pack(side=LEFT)
+        ttk.Button(status_frame, text="Cancelar", command=self.jobs.cancel, bootstyle=DANGER).pack(side=RIGHT, padx=5)
+        self.progress = ttk.Progressbar(status_frame, length=200, maximum=100)
+        self.progress.pack(side=RIGHT, padx=5)
+        ttk.Button(status_frame, text="cProfile", command=self.profile_next).pack(side=RIGHT, padx=5)
+        self.profile_var = tk.BooleanVar(value=PROFILER.enabled)
+        ttk.Checkbutton(status_frame, text="Medir tiempos", variable=self.profile_var,
+                        command=self.toggle_profiling).pack(side=RIGHT, padx=5)
+        # Tiempos de la última operación y de su redibujado
+        self.timing_var = tk.StringVar()
+        ttk.Label(root, textvariable=self.timing_var).pack(fill="x", padx=10, pady=(0, 5))
+
+    def build_threshold_slider(self, parent):
+        slider_frame = ttk.Frame(parent)
+        slider_frame.pack(fill="x", pady=(0, 5))
+        self.threshold_var = tk.DoubleVar(value=0.8)
+        self.threshold_text = tk.StringVar(value="0.80")
+        self.method_var = tk.StringVar(value="Pearson")
+        ttk.Label(slider_frame, text="Coeficiente:").pack(side=LEFT)
+        method_box = ttk.Combobox(slider_frame, textvariable=self.method_var, values=("Pearson", "Spearman"),
+                                  state="readonly", width=10)
+        method_box.pack(side=LEFT, padx=(5, 15))
+        method_box.bind("<<ComboboxSelected>>", self.on_method_change)
+        ttk.Label(slider_frame, text="Umbral |r|:").pack(side=LEFT)
+        ttk.Scale(slider_frame, from_=0.0, to=1.0, variable=self.threshold_var,
+                  command=self.on_threshold_change).pack(side=LEFT, fill="x", expand=True, padx=5)
+        ttk.Label(slider_frame, textvariable=self.threshold_text, width=5).pack(side=LEFT)
+
+def create_app():
     root = ttk.Window(themename="vapor")
-    app = DatasetApp(root)
-    root.mainloop()
+    return DatasetApp(root)
+
+if __name__ == "__main__":
+    create_app().root.mainloop()
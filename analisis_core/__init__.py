@@ -0,0 +1,55 @@
+# Motores de análisis independientes de la interfaz gráfica.
+#
+# Los nombres públicos se importan al usarlos por primera vez: las ventanas
+# cargan `jobs` y `profiling` al arrancar sin pagar numpy ni pandas, y
+# `from analisis_core import DatasetAnalysis` sigue funcionando igual.
+import importlib
+
+_MODULES = {
+    "analysis": ("DatasetAnalysis", "LoadedCSV", "parse_column"),
+    "fdr": (
+        "class_statistics",
+        "fisher_ratios",
+        "fdr_scores",
+        "rank_features",
+        "fdr_ranking",
+        "TargetFDR",
+        "multi_target_fdr",
+    ),
+    "csvcache": ("CSVCache",),
+    "filters": ("filter_positions", "match_columns", "parse_positions"),
+    "masked": ("MaskedDataset", "MaskedFrame"),
+    "pairwise": ("PairwiseStats", "pair_counts", "pairwise_correlation"),
+    "correlation": (
+        "CORRELATION_METHODS",
+        "CorrelationCache",
+        "correlation_matrix",
+        "cross_correlation_scores",
+        "max_partner_correlation",
+        "pearson_pairs",
+        "pearson_selection",
+    ),
+    "relevance": ("mutual_information", "rank_columns"),
+    "selection": ("SelectionStep", "redundancy_selection"),
+    "session": ("file_fingerprint", "restore_session", "same_file", "save_session"),
+    "sampling": ("Approximation", "CSVSampler", "SampleStats", "array_batches", "progressive"),
+    "store": ("compact_frame", "compact_target", "feature_matrix", "target_codes"),
+    "streaming": ("StreamingStats", "stream_csv"),
+    "tiled": ("TiledCorrelation", "correlation_columns", "tiled_correlation"),
+}
+_EXPORTS = {name: module for module, names in _MODULES.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,559 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .correlation import CORRELATION_METHODS, CorrelationCache, pearson_pairs, pearson_selection
+from .csvcache import CSVCache
+from .fdr import fdr_ranking, multi_target_fdr, rank_features
+from .parallel import DEFAULT_WORKERS
+from .filters import filter_positions
+from .masked import MaskedDataset, flatten_edits
+from .pairwise import pair_counts
+from .profiling import PROFILER, tracked
+from .relevance import mutual_information
+from .selection import redundancy_selection
+from .session import restore_session, save_session
+from .sampling import (BATCH_ROWS, CONFIDENCE, DEFAULT_SAMPLE_ROWS, REPLICATES, CSVSampler, SampleStats,
+                       array_batches, progressive)
+from .store import compact_frame, compact_target, feature_matrix, target_codes
+from .streaming import stream_csv
+from .tiled import correlation_columns, tiled_correlation
+
+# CSV leído por `DatasetAnalysis.read`, pendiente de `install`
+LoadedCSV = namedtuple("LoadedCSV", ["df", "stream", "source", "target"])
+
+# Partes del estado que la interfaz muestra por separado
+PARTS = ("dataset", "targets", "fdr", "pearson", "cross")
+
+
+def parse_column(df, column_input):
+    """Convierte la entrada del usuario (nombre o índice) en una columna existente."""
+    try:
+        column_key = int(column_input)
+    except ValueError:
+        column_key = column_input.strip()
+    if column_key not in df.columns:
+        raise KeyError(f"La columna '{column_key}' no existe.")
+    return column_key
+
+
+class DatasetAnalysis:
+    """Estado de un dataset y sus análisis, independiente de la interfaz gráfica.
+
+    Lo usan las dos ventanas Tk y la línea de comandos. El dataset es un
+    `MaskedDataset`: las eliminaciones y el target son ediciones de máscaras
+    que se pueden deshacer, y `df`/`targets` son vistas de la versión actual.
+    `data_version` aumenta con cada cambio del dataset y es la clave de la
+    caché de correlación;
+    `revisions` cuenta los cambios de cada parte de `PARTS` para que la interfaz
+    redibuje sólo lo que cambió. Al modificar el dataset se descartan los
+    resultados calculados sobre la versión anterior.
+
+    `approximation` guarda la última estimación por muestreo (`estimate`); la
+    interfaz la muestra en las partes que no tienen resultado exacto.
+    `multi_fdr` guarda (características, [TargetFDR]) del FDR con varios targets
+    y `mi_results` el ranking por información mutua con el target.
+    `feature_selection` es la última selección de `select_features`.
+    `result_options` guarda las opciones de los resultados que las tienen
+    (umbral de Pearson, intervalos de la información mutua, parámetros de la
+    selección) para recalcularlos igual al reabrir una sesión.
+    `correlation_method` elige entre Pearson y Spearman para la correlación
+    cruzada, el coeficiente máximo y los pares; cada método tiene su caché
+    (`corr_cache` y `rank_cache`), así que cambiar de uno a otro no recalcula
+    lo que ya estaba calculado.
+    """
+
+    def __init__(self, use_cache=True, workers=DEFAULT_WORKERS):
+        self.csv_cache = CSVCache() if use_cache else None
+        self.workers = workers
+        self.corr_cache = CorrelationCache(workers=workers)
+        self.rank_cache = CorrelationCache(workers=workers, method="spearman")
+        self.correlation_method = "pearson"
+        self.data_version = 0
+        self.revisions = dict.fromkeys(PARTS, 0)
+        self.reset()
+
+    def reset(self):
+        self.data = None
+        self.stream_base = None
+        self.source = None
+        self.result_options = {}
+        self.fdr_results = []
+        self.multi_fdr = None
+        self.mi_results = []
+        self.feature_selection = None
+        self.cross_correlation = None
+        self.pearson = None
+        self.approximation = None
+        self.corr_cache.clear()
+        self.rank_cache.clear()
+        self.data_version += 1
+        self._views = (None, None, None, None)
+        self._touch(*PARTS)
+
+    def _touch(self, *parts):
+        for part in parts:
+            self.revisions[part] += 1
+
+    def _data_changed(self, *parts):
+        self.data_version += 1
+        self.fdr_results = []
+        self.multi_fdr = None
+        self.mi_results = []
+        self.feature_selection = None
+        self.cross_correlation = None
+        self.pearson = None
+        self.approximation = None
+        self._touch("dataset", "fdr", "pearson", "cross", *parts)
+
+    def _current_views(self):
+        # Vistas de la versión actual: se recalculan una vez por cambio del dataset
+        if self._views[0] != self.data_version:
+            df = targets = stream = None
+            if self.data is not None:
+                df = self.data.features()
+                targets = self.data.target_series()
+                if targets is not None and self.stream_base is None:
+                    targets = compact_target(targets)
+            if self.stream_base is not None:
+                index = {c: i for i, c in enumerate(self.stream_base.columns)}
+                positions = [index[c] for c in df.columns]
+                stream = self.stream_base
+                if positions != list(range(len(stream.columns))):
+                    stream = stream.select_features(positions)
+            self._views = (self.data_version, df, targets, stream)
+        return self._views
+
+    @property
+    def df(self):
+        """Características activas como `MaskedFrame` (vista sin copia del dataset original)."""
+        return self._current_views()[1]
+
+    @property
+    def targets(self):
+        return self._current_views()[2]
+
+    @property
+    def stream(self):
+        """Estadísticos del modo streaming restringidos a las características activas."""
+        return self._current_views()[3]
+
+    @tracked("load_csv")
+    def read(self, file_path, sep=",", header=0, streaming=False, target=None, progress=None):
+        """Lee el CSV (entero o en streaming) sin tocar el estado; `install` lo aplica después.
+
+        Las ventanas llaman a `read` en el hilo de trabajo y a `install` en el de
+        Tk, así que un error o una cancelación dejan intacto el dataset anterior.
+        """
+        stream = None
+        if streaming:
+            with PROFILER.track("stream_csv"):
+                stream, df = stream_csv(file_path, sep=sep, header=header, target=target, progress=progress)
+        else:
+            if progress is not None:
+                progress(None, "Leyendo CSV")
+            if self.csv_cache is not None:
+                with PROFILER.track("read_csv_cache"):
+                    df, hit = self.csv_cache.read_csv(file_path, sep=sep, header=header)
+                PROFILER.annotate(cache_hit=hit)
+            else:
+                with PROFILER.track("read_csv"):
+                    df = compact_frame(pd.read_csv(file_path, sep=sep, header=header))
+            if target is not None and target not in df.columns:
+                raise KeyError(f"La columna '{target}' no existe.")
+        PROFILER.annotate(shape=df.shape)
+        if progress is not None:
+            # Punto de cancelación: una carga cancelada no llega a `install`
+            progress(1.0, "CSV leído")
+        return LoadedCSV(df, stream, (file_path, sep, header), target)
+
+    def install(self, loaded):
+        """Reemplaza el dataset actual por el `LoadedCSV` de `read`."""
+        self.reset()
+        streaming = loaded.stream is not None
+        self.data = MaskedDataset(loaded.df, target=loaded.target if streaming else None)
+        self.stream_base = loaded.stream
+        self.source = loaded.source
+        if loaded.target is not None and not streaming:
+            self.select_target(loaded.target)
+
+    def load(self, file_path, sep=",", header=0, streaming=False, target=None, progress=None):
+        """Lee el CSV y reemplaza el dataset actual (`read` seguido de `install`)."""
+        self.install(self.read(file_path, sep=sep, header=header, streaming=streaming, target=target,
+                               progress=progress))
+
+    @tracked("save_session")
+    def save_session(self, path):
+        """Guarda el dataset, su historial de ediciones y los resultados en `path` (ver `session`)."""
+        save_session(self, path)
+
+    @tracked("restore_session")
+    def restore_session(self, path, progress=None):
+        """Reabre una sesión guardada; devuelve True si los resultados no se recalcularon."""
+        return restore_session(self, path, progress)
+
+    # Las ediciones sólo cambian máscaras; la caché de correlación se actualiza
+    # con downdates/updates cuando es posible y si no se reconstruye al pedirla.
+    def _apply(self, edit):
+        for sub in flatten_edits([edit]):
+            self._apply_masks(sub)
+        self.fdr_results = []
+        self.multi_fdr = None
+        self.mi_results = []
+        self.feature_selection = None
+        self.cross_correlation = None
+        self.pearson = None
+        self.approximation = None
+        self._touch(*PARTS)
+
+    def _apply_masks(self, edit):
+        kind, positions, value = edit
+        if self.stream_base is None:
+            rows, columns = self.data.positions()
+            if kind == "rows" and 2 * len(positions) > len(rows):
+                # Cambiar más de la mitad de las filas: es más barato reconstruir la caché
+                pass
+            elif kind == "rows":
+                values = self.data.base.iloc[positions, columns].to_numpy(dtype=np.float64)
+                if np.isinf(values).any():
+                    # Un infinito no se puede restar de las sumas: la caché se reconstruye
+                    pass
+                elif value:
+                    self.corr_cache.add_rows(values, self.data_version)
+                else:
+                    self.corr_cache.drop_rows(values, self.data_version)
+            elif kind == "columns" and not value:
+                for cache in (self.corr_cache, self.rank_cache):
+                    cache.drop_columns(np.searchsorted(columns, positions), self.data_version)
+            elif kind == "target" and positions is None:
+                for cache in (self.corr_cache, self.rank_cache):
+                    cache.drop_columns(np.searchsorted(columns, value), self.data_version)
+        self.data.apply(edit)
+        self.data_version += 1
+
+    def _edit(self, edit):
+        self._apply(edit)
+        self.data.record(edit)
+
+    @tracked("undo")
+    def undo(self):
+        """Deshace la última edición del dataset. Devuelve False si no había ninguna."""
+        edit = self.data.pop_undo() if self.data is not None else None
+        if edit is None:
+            return False
+        self._apply(edit)
+        return True
+
+    @tracked("redo")
+    def redo(self):
+        edit = self.data.pop_redo() if self.data is not None else None
+        if edit is None:
+            return False
+        self._apply(edit)
+        return True
+
+    @property
+    def can_undo(self):
+        return self.data is not None and bool(self.data.undo_stack)
+
+    @property
+    def can_redo(self):
+        return self.data is not None and bool(self.data.redo_stack)
+
+    @tracked("select_target")
+    def select_target(self, column_key, progress=None):
+        if self.stream_base is not None:
+            # Las estadísticas por clase dependen del target: se vuelve a recorrer el archivo
+            file_path, sep, header = self.source
+            stream, preview = stream_csv(file_path, sep=sep, header=header, target=column_key, progress=progress)
+            self.data = MaskedDataset(preview, target=column_key)
+            self.stream_base = stream
+            self._data_changed("targets")
+            return
+        position = self.data.feature_position(column_key)
+        self._edit(("target", self.data.target, position))
+
+    @tracked("drop_row")
+    def drop_row(self, index):
+        self.drop_rows([index])
+
+    def drop_rows(self, indices):
+        """Elimina filas por posición en la vista activa (0..n-1)."""
+        if self.stream_base is not None:
+            raise ValueError("No se pueden eliminar filas en modo streaming.")
+        rows, _ = self.data.positions()
+        indices = np.asarray(indices, dtype=np.int64)
+        if np.any((indices < 0) | (indices >= len(rows))):
+            raise KeyError(f"Fila fuera de rango: {indices.tolist()}")
+        self._edit(("rows", rows[np.unique(indices)], False))
+
+    @tracked("drop_column")
+    def drop_column(self, column_key):
+        self._edit(("columns", np.array([self.data.feature_position(column_key)]), False))
+
+    @tracked("filter")
+    def filter(self, rows=(), columns=(), max_row_nan=None, max_column_nan=None, drop_constant=False,
+               bounds=None):
+        """Elimina en una sola edición filas y columnas elegidas y las que cumplen los criterios.
+
+        Las posiciones son las de la vista activa; los criterios son los de
+        `filter_positions` (con `bounds` por nombre de columna o para todas).
+        Devuelve (filas eliminadas, columnas eliminadas) y se deshace de una vez.
+        """
+        row_positions, column_positions = self.data.positions()
+        if isinstance(bounds, dict):
+            bounds = {self.df.columns.get_loc(c): b for c, b in bounds.items()}
+        if self.stream_base is not None:
+            if len(rows) or max_row_nan is not None or bounds or max_column_nan is not None:
+                raise ValueError("En modo streaming sólo se pueden filtrar columnas por nombre o sin variación.")
+            drop_rows = np.empty(0, dtype=np.int64)
+            drop_columns = np.asarray(columns, dtype=np.int64)
+            if drop_constant:
+                variances = self.stream.variances()
+                drop_columns = np.union1d(drop_columns, np.flatnonzero(~(variances > 0)))
+        else:
+            with PROFILER.track("predicates"):
+                drop_rows, drop_columns = filter_positions(
+                    feature_matrix(self.df), rows, columns, max_row_nan, max_column_nan, drop_constant, bounds)
+
+        edits = []
+        if len(drop_rows):
+            edits.append(("rows", row_positions[drop_rows], False))
+        if len(drop_columns):
+            edits.append(("columns", column_positions[drop_columns], False))
+        if edits:
+            self._edit(edits[0] if len(edits) == 1 else ("batch", edits, None))
+        return len(drop_rows), len(drop_columns)
+
+    def estimates(self, max_rows=DEFAULT_SAMPLE_ROWS, batch_rows=BATCH_ROWS, stratify=True,
+                  replicates=REPLICATES, confidence=CONFIDENCE, seed=None):
+        """Estimaciones cada vez más precisas desde una muestra de filas, una por lote.
+
+        En memoria se muestrean las filas activas (estratificadas por el target si
+        `stratify`); en modo streaming se leen bloques al azar del archivo, sin
+        recorrerlo. Cada `Approximation` queda en `approximation` y reemplaza a los
+        resultados exactos, que se descartan; interrumpir la iteración conserva la
+        última estimación.
+        """
+        if self.df is None:
+            raise ValueError("No hay ningún dataset cargado.")
+        stats = SampleStats(self.df.columns, replicates, confidence, seed=seed)
+        sampler = None
+        if self.stream_base is not None:
+            file_path, sep, header = self.source
+            target = None if self.data.target is None else self.data.base.columns[self.data.target]
+            sampler = CSVSampler(file_path, sep, header, target=target, columns=self.df.columns, seed=seed)
+            batches = sampler.batches(batch_rows, max_rows, replicates)
+        else:
+            y = None if self.targets is None else target_codes(self.targets)
+            stats.total_rows = self.df.shape[0]
+            batches = array_batches(feature_matrix(self.df), y, batch_rows, max_rows, stratify, seed)
+
+        self.fdr_results = []
+        self.multi_fdr = None
+        self.mi_results = []
+        self.feature_selection = None
+        self.cross_correlation = None
+        self.pearson = None
+        for approximation in progressive(stats, batches, sampler):
+            self.approximation = approximation
+            self._touch("fdr", "pearson", "cross")
+            yield approximation
+
+    @tracked("estimate")
+    def estimate(self, max_rows=DEFAULT_SAMPLE_ROWS, on_estimate=None, **options):
+        """Recorre `estimates` hasta el final; `on_estimate(aproximación)` recibe cada refinamiento."""
+        for approximation in self.estimates(max_rows, **options):
+            if on_estimate is not None:
+                on_estimate(approximation)
+        return self.approximation
+
+    @tracked("compute_fdr")
+    def compute_fdr(self):
+        if self.targets is None:
+            raise ValueError("No hay target seleccionado.")
+        if self.stream is not None:
+            self.fdr_results = self.stream.fdr_ranking()
+        else:
+            with PROFILER.track("feature_matrix"):
+                X, y = feature_matrix(self.df), target_codes(self.targets)
+            with PROFILER.track("fdr_ranking"):
+                self.fdr_results = fdr_ranking(X, y, self.df.columns, workers=self.workers)
+        self.multi_fdr = None
+        self._touch("fdr")
+        return self.fdr_results
+
+    @tracked("multi_fdr")
+    def compute_multi_fdr(self, targets, one_vs_rest=True, class_pairs=False):
+        """FDR frente a varias columnas target en una sola pasada por las características.
+
+        `targets` son nombres de columnas activas (características o el target
+        actual). Ninguna de ellas se puntúa como característica, pero el dataset
+        no cambia: el target seleccionado sigue siendo el mismo.
+        """
+        if self.stream is not None:
+            raise ValueError("El FDR con varios targets no está disponible en modo streaming.")
+        if not targets:
+            raise ValueError("No hay targets seleccionados.")
+        positions = [self.data.column_position(key) for key in targets]
+        rows, columns = self.data.positions()
+        features = self.data.frame(rows, np.setdiff1d(columns, positions))
+        labels = [compact_target(self.data.column_series(p)) for p in positions]
+        with PROFILER.track("feature_matrix"):
+            X = feature_matrix(features)
+        with PROFILER.track("multi_target_fdr"):
+            results = multi_target_fdr(X, [target_codes(y) for y in labels], names=list(targets),
+                                       one_vs_rest=one_vs_rest, class_pairs=class_pairs, workers=self.workers)
+        for i, y in enumerate(labels):
+            if isinstance(y.dtype, pd.CategoricalDtype):
+                # Las clases se calcularon sobre los códigos: se muestran las etiquetas
+                categories = np.asarray(y.cat.categories, dtype=object)
+                classes = [categories[c] if c >= 0 else np.nan for c in results[i].classes]
+                results[i] = results[i]._replace(classes=np.array(classes, dtype=object))
+        self.multi_fdr = (features.columns, results)
+        self.fdr_results = []
+        self._touch("fdr")
+        return self.multi_fdr
+
+    @tracked("mutual_information")
+    def compute_mutual_information(self, bins=None):
+        """Ranking [(característica, información mutua con el target)], con histogramas de `bins` intervalos."""
+        if self.targets is None:
+            raise ValueError("No hay target seleccionado.")
+        if self.stream is not None:
+            raise ValueError("La información mutua necesita todas las filas: no está disponible en modo streaming.")
+        with PROFILER.track("feature_matrix"):
+            X, y = feature_matrix(self.df), target_codes(self.targets)
+        with PROFILER.track("mutual_information"):
+            scores = mutual_information(X, y, bins=bins, workers=self.workers)
+        self.mi_results = rank_features(self.df.columns, scores)
+        self.result_options["mi"] = bins
+        self._touch("fdr")
+        return self.mi_results
+
+    @tracked("select_features")
+    def select_features(self, k, redundancy_weight=1.0, relevance="fdr", apply=False):
+        """Elige `k` características relevantes y poco redundantes entre sí (estilo mRMR).
+
+        La relevancia es el FDR (`relevance="fdr"`) o la información mutua
+        (`"mi"`) con el target, reutilizando el ranking si ya está calculado; la
+        redundancia es la |r| media, con el método de correlación elegido, con las
+        características ya elegidas. Devuelve y guarda en `feature_selection`
+        [(característica, relevancia, redundancia, puntaje)] en orden de
+        elección. Con `apply=True` elimina el resto de características en una
+        sola edición, que se deshace de una vez.
+        """
+        if self.targets is None:
+            raise ValueError("No hay target seleccionado.")
+        if relevance not in ("fdr", "mi"):
+            raise ValueError(f"Relevancia desconocida: {relevance}")
+        if k < 1:
+            raise ValueError("Hay que elegir al menos una característica.")
+        self._check_method()
+        if relevance == "fdr":
+            ranking = self.fdr_results or self.compute_fdr()
+        else:
+            ranking = self.mi_results or self.compute_mutual_information()
+        columns = list(self.df.columns)
+        scores = dict(ranking)
+        scores = np.array([scores[c] for c in columns], dtype=np.float64)
+
+        cache = self.active_cache
+        with PROFILER.track("correlation"):
+            if self.stream is not None:
+                corr = cache.from_stats(self.stream, self.data_version)
+            elif len(columns) > cache.wide_features:
+                # Sin matriz p×p: sólo se calculan las columnas de las características elegidas
+                corr = correlation_columns(cache.matrix(self.df), dtype=cache.dtype, memory_budget=cache.memory_budget)
+            else:
+                corr = cache.get(self.df, self.data_version)
+        with PROFILER.track("redundancy_selection"):
+            steps = redundancy_selection(scores, corr, k, redundancy_weight)
+        selection = [(columns[s.feature], s.relevance, s.redundancy, s.score) for s in steps]
+        if apply:
+            _, column_positions = self.data.positions()
+            drop = np.setdiff1d(np.arange(len(columns)), [s.feature for s in steps])
+            if len(drop):
+                self._edit(("columns", column_positions[drop], False))
+        self.feature_selection = selection
+        self.result_options["selection"] = (k, redundancy_weight, relevance)
+        self._touch("fdr")
+        return selection
+
+    @property
+    def active_cache(self):
+        """Caché de correlación del método elegido."""
+        return self.rank_cache if self.correlation_method == "spearman" else self.corr_cache
+
+    def set_correlation_method(self, method):
+        """Cambia entre "pearson" y "spearman"; descarta la correlación cruzada y el coeficiente mostrados."""
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Método de correlación desconocido: {method}")
+        if method == self.correlation_method:
+            return
+        self.correlation_method = method
+        self.cross_correlation = None
+        self.pearson = None
+        self._touch("pearson", "cross")
+
+    def _check_method(self):
+        if self.stream is not None and self.correlation_method == "spearman":
+            raise ValueError("Spearman necesita todas las filas: no está disponible en modo streaming.")
+
+    @tracked("correlation_summary")
+    def correlation_summary(self, progress=None):
+        """(correlación cruzada, máximo |r| por característica), desde la caché del método elegido."""
+        self._check_method()
+        return self.active_cache.summary(self.df, self.data_version, stats=self.stream, progress=progress)
+
+    @tracked("compute_cross_correlation")
+    def compute_cross_correlation(self, progress=None):
+        self.cross_correlation = self.correlation_summary(progress)[0]
+        self._touch("cross")
+        return self.cross_correlation
+
+    @tracked("compute_pearson_coef")
+    def compute_pearson(self, threshold, progress=None):
+        _, feature_max = self.correlation_summary(progress)
+        self.pearson = pearson_selection(None, self.df.columns, threshold, feature_max)
+        self.result_options["pearson"] = threshold
+        self._touch("pearson")
+        return self.pearson
+
+    @tracked("pearson_threshold")
+    def update_pearson(self, threshold):
+        """Recalcula Pearson con otro umbral si la caché ya tiene esta versión; si no, None."""
+        feature_max = self.active_cache.feature_max(self.data_version)
+        if self.df is None or feature_max is None:
+            return None
+        self.pearson = pearson_selection(None, self.df.columns, threshold, feature_max)
+        self.result_options["pearson"] = threshold
+        self._touch("pearson")
+        return self.pearson
+
+    @tracked("pearson_pairs")
+    def pearson_pairs(self, threshold, progress=None):
+        """Lista [(característica_a, característica_b, |r|, observaciones)] con |r| >= threshold.
+
+        Con NaN cada par se calcula sobre las filas donde ambas tienen valor;
+        `observaciones` es cuántas son.
+        """
+        self._check_method()
+        cache = self.active_cache
+        columns = list(self.df.columns)
+        if self.stream is None and self.df.shape[1] > cache.wide_features:
+            X = cache.matrix(self.df)
+            rows, cols, values = tiled_correlation(X, threshold=threshold, memory_budget=cache.memory_budget,
+                                                   dtype=cache.dtype, progress=progress,
+                                                   workers=self.workers).pairs
+            counts = pair_counts(X, rows, cols)
+        else:
+            if self.stream is not None:
+                corr = cache.from_stats(self.stream, self.data_version)
+            else:
+                corr = cache.get(self.df, self.data_version)
+            rows, cols, values = pearson_pairs(corr, threshold)
+            counts = cache.counts(self.data_version)[rows, cols]
+        order = np.argsort(-values, kind="stable")
+        return [(columns[rows[i]], columns[cols[i]], values[i], int(counts[i])) for i in order]
@@ -0,0 +1,250 @@
+"""Análisis por lotes sin interfaz gráfica.
+
+    python -m analisis_core datos.csv --target clase --threshold 0.9 --format json -o resultados.json
+
+Usa el mismo `DatasetAnalysis` que las ventanas Tk, así que los resultados
+coinciden con los de la aplicación interactiva.
+"""
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from .analysis import DatasetAnalysis, parse_column
+from .correlation import CORRELATION_METHODS
+from .fdr import rank_features
+from .parallel import DEFAULT_WORKERS
+from .profiling import PROFILER, format_record
+from .sampling import CONFIDENCE, CSVSampler, SampleStats, progressive
+from .streaming import read_columns
+
+ANALYSES = ("fdr", "cross", "pearson", "pairs", "mi")
+# Los que se ejecutan si no se indica --analyses
+DEFAULT_ANALYSES = ("fdr", "cross", "pearson", "pairs")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m analisis_core",
+        description="Calcula FDR, información mutua, correlación cruzada y coeficiente de Pearson o Spearman de un CSV, "
+                    "y elige subconjuntos de características poco redundantes.",
+    )
+    parser.add_argument("csv", help="archivo CSV de entrada")
+    parser.add_argument("--sep", default=",", help="separador de columnas (por defecto ',')")
+    parser.add_argument("--no-header", action="store_true", help="el archivo no tiene encabezado")
+    parser.add_argument("--target", help="nombre o índice de la columna target (necesario para FDR)")
+    parser.add_argument("--targets",
+                        help="varias columnas target separadas por comas: FDR frente a cada una en una sola pasada")
+    parser.add_argument("--one-vs-rest", action="store_true",
+                        help="añadir el FDR de cada clase contra el resto (salida fdr_ovr)")
+    parser.add_argument("--class-pairs", action="store_true",
+                        help="añadir el término de FDR de cada par de clases (salida fdr_pairs)")
+    parser.add_argument("--threshold", type=float, default=0.8, help="umbral |r| para Pearson (por defecto 0.8)")
+    parser.add_argument("--method", choices=CORRELATION_METHODS, default="pearson",
+                        help="coeficiente de cross, pearson y pairs (por defecto pearson)")
+    parser.add_argument("--bins", type=int, help="intervalos por característica para mi (por defecto regla de Sturges)")
+    parser.add_argument("--select", type=int, metavar="K",
+                        help="elegir K características relevantes y poco redundantes (salida selection, estilo mRMR)")
+    parser.add_argument("--relevance", choices=("fdr", "mi"), default="fdr",
+                        help="relevancia de --select: FDR o información mutua (por defecto fdr)")
+    parser.add_argument("--redundancy-weight", type=float, default=1.0,
+                        help="peso de la redundancia |r| media en --select (por defecto 1.0)")
+    parser.add_argument("--apply-selection", action="store_true",
+                        help="calcular cross, pearson y pairs sólo sobre las características de --select")
+    parser.add_argument("--analyses",
+                        help="análisis separados por comas: " + ", ".join(ANALYSES)
+                        + " (por defecto " + ", ".join(DEFAULT_ANALYSES) + ")")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv", help="formato de salida")
+    parser.add_argument("-o", "--output",
+                        help="archivo JSON, o prefijo de los CSV (PREFIJO_fdr.csv, ...); por defecto la salida estándar")
+    parser.add_argument("--streaming", action="store_true", help="leer el archivo por bloques (archivos grandes)")
+    parser.add_argument("--sample", type=int, metavar="FILAS",
+                        help="estimar desde una muestra aleatoria de FILAS filas, con intervalos de confianza")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE,
+                        help="nivel de los intervalos de --sample (por defecto 0.95)")
+    parser.add_argument("--seed", type=int, help="semilla del muestreo (resultados reproducibles)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="hilos de cálculo")
+    parser.add_argument("--no-cache", action="store_true", help="no usar la caché binaria de CSV")
+    parser.add_argument("--save-session", metavar="ARCHIVO",
+                        help="guardar el dataset, las ediciones y los resultados en una sesión (.npz) "
+                             "que las ventanas pueden reabrir sin recalcular")
+    parser.add_argument("--profile", action="store_true",
+                        help="mostrar en stderr tiempo, CPU, pico de memoria y etapas de cada operación")
+    parser.add_argument("--trace", help="añadir las mediciones de cada operación a este archivo JSON lines")
+    args = parser.parse_args(argv)
+
+    if args.targets is not None:
+        args.targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+    has_target = args.target is not None or bool(args.targets)
+    if args.analyses is None:
+        # Sin target no hay FDR; el resto de análisis no lo necesitan
+        args.analyses = [name for name in DEFAULT_ANALYSES if name != "fdr" or has_target]
+    else:
+        args.analyses = [name.strip() for name in args.analyses.split(",") if name.strip()]
+    unknown = [name for name in args.analyses if name not in ANALYSES]
+    if unknown:
+        parser.error(f"análisis desconocido: {', '.join(unknown)}")
+    if "fdr" in args.analyses and not has_target:
+        parser.error("el análisis fdr necesita --target o --targets")
+    if "mi" in args.analyses and args.target is None:
+        parser.error("el análisis mi necesita --target")
+    if args.sample is not None and ("mi" in args.analyses or args.method != "pearson"):
+        parser.error("mi y --method spearman necesitan todas las filas: no se pueden combinar con --sample")
+    if args.select is not None and args.target is None:
+        parser.error("--select necesita --target")
+    if args.select is not None and args.select < 1:
+        parser.error("--select debe ser al menos 1")
+    if args.apply_selection and args.select is None:
+        parser.error("--apply-selection necesita --select")
+    if args.sample is not None and args.save_session is not None:
+        parser.error("--save-session no se puede combinar con --sample")
+    if args.sample is not None and args.select is not None:
+        parser.error("--select no se puede combinar con --sample")
+    if args.sample is not None and (args.targets or args.one_vs_rest or args.class_pairs):
+        parser.error("--targets, --one-vs-rest y --class-pairs no se pueden combinar con --sample")
+    return args
+
+
+def run(args, progress=None):
+    """Ejecuta los análisis pedidos y devuelve {nombre: DataFrame}."""
+    if args.sample is not None:
+        return run_sample(args)
+    analysis = DatasetAnalysis(use_cache=not args.no_cache, workers=args.workers)
+    header = None if args.no_header else 0
+    # El target se resuelve con el encabezado y se pasa a la carga: en streaming
+    # las estadísticas por clase salen de la misma pasada por el archivo
+    columns = read_columns(args.csv, sep=args.sep, header=header)
+    targets = [parse_column(columns, name) for name in args.targets or []]
+    target = None if args.target is None else parse_column(columns, args.target)
+    analysis.load(args.csv, sep=args.sep, header=header, streaming=args.streaming, target=target,
+                  progress=progress)
+    analysis.set_correlation_method(args.method)
+
+    results = {}
+    if "fdr" in args.analyses:
+        if targets or args.one_vs_rest or args.class_pairs:
+            results.update(multi_fdr_frames(*analysis.compute_multi_fdr(
+                targets or [target], one_vs_rest=args.one_vs_rest, class_pairs=args.class_pairs)))
+        else:
+            results["fdr"] = pd.DataFrame(analysis.compute_fdr(), columns=["feature", "fdr"])
+    if "mi" in args.analyses:
+        results["mi"] = pd.DataFrame(analysis.compute_mutual_information(args.bins),
+                                     columns=["feature", "mutual_information"])
+    # Las demás columnas target tampoco son características para la correlación
+    for name in targets:
+        if name != target:
+            analysis.drop_column(name)
+    if args.select is not None:
+        results["selection"] = pd.DataFrame(
+            analysis.select_features(args.select, args.redundancy_weight, args.relevance, apply=args.apply_selection),
+            columns=["feature", "relevance", "redundancy", "score"])
+    if "cross" in args.analyses:
+        results["cross"] = pd.DataFrame({
+            "feature": analysis.df.columns,
+            "cross_correlation": analysis.compute_cross_correlation(progress),
+        })
+    if "pearson" in args.analyses:
+        results["pearson"] = pd.DataFrame(analysis.compute_pearson(args.threshold, progress),
+                                          columns=["feature", "max_abs_r"])
+    if "pairs" in args.analyses:
+        results["pairs"] = pd.DataFrame(analysis.pearson_pairs(args.threshold, progress),
+                                        columns=["feature_a", "feature_b", "abs_r", "n"])
+    if args.save_session is not None:
+        analysis.save_session(args.save_session)
+    return results
+
+
+def multi_fdr_frames(features, results):
+    """Tablas del FDR con varios targets: ranking de cada target, clase contra el resto y pares de clases."""
+    frames = {"fdr": pd.DataFrame([(result.target, feature, score) for result in results
+                                   for feature, score in rank_features(features, result.scores)],
+                                  columns=["target", "feature", "fdr"])}
+    if any(result.one_vs_rest is not None for result in results):
+        frames["fdr_ovr"] = pd.DataFrame([
+            (result.target, label, feature, score)
+            for result in results for label, scores in zip(result.classes, result.one_vs_rest)
+            for feature, score in rank_features(features, scores)
+        ], columns=["target", "class", "feature", "fdr"])
+    if any(result.pair_scores is not None for result in results):
+        frames["fdr_pairs"] = pd.DataFrame([
+            (result.target, result.classes[i], result.classes[j], feature, score)
+            for result in results for (i, j), scores in zip(result.pairs, result.pair_scores)
+            for feature, score in rank_features(features, scores)
+        ], columns=["target", "class_a", "class_b", "feature", "fdr"])
+    return frames
+
+
+def run_sample(args):
+    """Como `run`, pero desde bloques aleatorios del CSV y con columnas de intervalo.
+
+    No carga el archivo: el tiempo depende de `--sample`, no del tamaño del CSV.
+    """
+    header = None if args.no_header else 0
+    target = None
+    if args.target is not None:
+        target = parse_column(read_columns(args.csv, sep=args.sep, header=header), args.target)
+    sampler = CSVSampler(args.csv, sep=args.sep, header=header, target=target, seed=args.seed)
+    stats = SampleStats(sampler.columns, confidence=args.confidence, seed=args.seed)
+    for approximation in progressive(stats, sampler.batches(max_rows=args.sample), sampler):
+        print(f"Muestra: {approximation.describe()}", file=sys.stderr)
+
+    results = {}
+    if "fdr" in args.analyses:
+        results["fdr"] = pd.DataFrame(approximation.fdr, columns=["feature", "fdr", "fdr_low", "fdr_high",
+                                                                  "rank_best", "rank_worst"])
+    if "cross" in args.analyses:
+        scores, low, high = approximation.cross
+        results["cross"] = pd.DataFrame({"feature": approximation.columns, "cross_correlation": scores,
+                                         "cross_correlation_low": low, "cross_correlation_high": high})
+    pairs = approximation.pearson_pairs(args.threshold)
+    if "pearson" in args.analyses:
+        # Mayor |r| de cada característica entre los pares que pueden superar el umbral
+        best = {}
+        for a, b, value, low, high in pairs:
+            for feature in (a, b):
+                best.setdefault(feature, (feature, value, low, high))
+        results["pearson"] = pd.DataFrame(list(best.values()),
+                                          columns=["feature", "max_abs_r", "max_abs_r_low", "max_abs_r_high"])
+    if "pairs" in args.analyses:
+        results["pairs"] = pd.DataFrame(pairs, columns=["feature_a", "feature_b", "abs_r", "abs_r_low", "abs_r_high"])
+    return results
+
+
+def write_results(results, fmt, output=None):
+    if fmt == "json":
+        payload = {name: json.loads(frame.to_json(orient="records")) for name, frame in results.items()}
+        if output is None:
+            json.dump(payload, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(output, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False, indent=2)
+        return
+    for name, frame in results.items():
+        if output is None:
+            sys.stdout.write(f"# {name}\n")
+            frame.to_csv(sys.stdout, index=False)
+        else:
+            frame.to_csv(f"{output}_{name}.csv", index=False)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile or args.trace:
+        PROFILER.enabled = True
+    if args.trace:
+        PROFILER.trace_path = args.trace
+    try:
+        results = run(args)
+    except (OSError, ValueError, KeyError) as e:
+        message = e.args[0] if isinstance(e, KeyError) else e
+        print(f"Error: {message}", file=sys.stderr)
+        return 1
+    write_results(results, args.format, args.output)
+    if args.profile:
+        for record in PROFILER.last(len(PROFILER.records)):
+            print(format_record(record), file=sys.stderr)
+            for stage in record.get("stages", []):
+                print("    " + format_record(stage), file=sys.stderr)
+    return 0
@@ -0,0 +1,214 @@
+import numpy as np
+
+from .pairwise import PairwiseStats
+from .parallel import DEFAULT_WORKERS
+from .relevance import rank_columns
+from .store import feature_matrix
+from .tiled import DEFAULT_MEMORY_BUDGET, TiledCorrelation, tiled_correlation
+
+# A partir de este número de características no se guarda la matriz p×p completa
+WIDE_FEATURES = 4000
+# Filas por bloque al acumular co-momentos: acota la copia temporal en float64
+ROW_CHUNK = 65536
+# Coeficientes disponibles: Pearson sobre los valores o sobre sus rangos (Spearman)
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+def correlation_matrix(X):
+    return np.corrcoef(np.asarray(X, dtype=np.float64), rowvar=False)
+
+
+class CorrelationCache:
+    """Matriz de correlación compartida, ligada a una versión del dataset.
+
+    Guarda las sumas por pares del dataset (`PairwiseStats`, o el
+    `StreamingStats` del modo streaming, que las contiene) y la matriz derivada
+    de ellas. Eliminar una columna sólo recorta la fila y columna
+    correspondientes; eliminar filas aplica un downdate O(p²) a las sumas en
+    lugar de recalcular todo en O(n·p²). Si la versión pedida no coincide con la
+    guardada la caché se reconstruye desde los datos. Cada par se correlaciona
+    sobre sus filas completas y `counts` da las observaciones de cada par; sin
+    NaN el coste es el de la matriz densa.
+
+    Con más de `wide_features` columnas `summary` usa el motor por bloques y sólo
+    conserva los resultados por característica, nunca la matriz completa.
+
+    Con `method="spearman"` los mismos motores reciben los rangos de cada
+    columna (`rank_columns`, calculados una vez por versión). Eliminar filas
+    cambia los rangos, así que en ese caso no hay downdate y la caché se
+    reconstruye; eliminar columnas sí se aplica en O(p²). Con NaN los rangos no
+    se recalculan para las filas de cada par, así que el resultado aproxima el
+    Spearman por pares de pandas (ver `rank_columns`).
+    """
+
+    def __init__(self, wide_features=WIDE_FEATURES, memory_budget=DEFAULT_MEMORY_BUDGET, dtype=np.float64,
+                 workers=DEFAULT_WORKERS, method="pearson"):
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Método de correlación desconocido: {method}")
+        self.wide_features = wide_features
+        self.memory_budget = memory_budget
+        self.dtype = dtype
+        self.workers = workers
+        self.method = method
+        self.clear()
+
+    def _set_corr(self, corr):
+        self._corr = corr
+        self._feature_max = None
+        self._tiled = None
+
+    def matrix(self, df):
+        """Matriz que correlaciona este método: las características o sus rangos."""
+        X = feature_matrix(df)
+        return rank_columns(X) if self.method == "spearman" else X
+
+    def get(self, df, version):
+        if self.version != version or self.stats is None:
+            X = self.matrix(df)
+            self.stats = PairwiseStats(df.columns)
+            for r0 in range(0, X.shape[0], ROW_CHUNK):
+                self.stats.update(X[r0:r0 + ROW_CHUNK])
+            self.version = version
+            self._set_corr(None)
+        if self._corr is None:
+            self._set_corr(self.stats.correlation())
+        return self._corr
+
+    def from_stats(self, stats, version):
+        if self.version != version or self.stats is not stats:
+            self.stats = stats
+            self.version = version
+            self._set_corr(None)
+        if self._corr is None:
+            self._set_corr(stats.correlation())
+        return self._corr
+
+    def summary(self, df, version, stats=None, progress=None):
+        """(correlación cruzada, máximo |r| por característica) de la versión pedida."""
+        if stats is not None:
+            corr = self.from_stats(stats, version)
+        elif df.shape[1] > self.wide_features:
+            if self.version != version or self._tiled is None:
+                self.version = version
+                self.stats = None
+                self._set_corr(None)
+                self._tiled = tiled_correlation(self.matrix(df), memory_budget=self.memory_budget,
+                                                dtype=self.dtype, progress=progress, workers=self.workers)
+                self._feature_max = self._tiled.feature_max
+            return self._tiled.cross, self._feature_max
+        else:
+            corr = self.get(df, version)
+        return cross_correlation_scores(corr), self.feature_max(version)
+
+    def feature_max(self, version):
+        # Sólo consulta: None si los resultados de esta versión aún no se calcularon
+        if self.version != version:
+            return None
+        if self._feature_max is None and self._corr is not None:
+            self._feature_max = max_partner_correlation(self._corr)
+        return self._feature_max
+
+    def counts(self, version):
+        """Observaciones de cada par (matriz p×p) de la versión pedida, o None si no está en caché."""
+        if self.version != version or self.stats is None:
+            return None
+        return self.stats.counts.astype(np.int64)
+
+    def drop_columns(self, positions, version):
+        # `version` es la del dataset antes del cambio; queda en version + 1
+        if self.version != version or self.stats is None:
+            return
+        positions = np.atleast_1d(positions)
+        self.stats.drop_features(positions)
+        if self._corr is not None:
+            keep = np.setdiff1d(np.arange(self._corr.shape[0]), positions)
+            self._set_corr(self._corr[np.ix_(keep, keep)])
+        self.version = version + 1
+
+    def drop_rows(self, rows, version):
+        # Con rangos no hay downdate: la versión deja de coincidir y se reconstruye
+        if self.version != version or self.stats is None or self.method == "spearman":
+            return
+        self.stats.remove_rows(np.asarray(rows, dtype=np.float64).reshape(-1, len(self.stats.columns)))
+        self._set_corr(None)
+        self.version = version + 1
+
+    def add_rows(self, rows, version):
+        # Inverso de drop_rows (p. ej. al deshacer): merge de Chan con las filas restauradas
+        if self.version != version or self.stats is None or self.method == "spearman":
+            return
+        self.stats.update(np.asarray(rows, dtype=np.float64).reshape(-1, len(self.stats.columns)))
+        self._set_corr(None)
+        self.version = version + 1
+
+    def state(self, version):
+        """Arrays de la caché de la versión pedida (para guardarla en una sesión), o None."""
+        if self.version != version:
+            return None
+        state = {}
+        # En modo streaming la caché guarda el StreamingStats: sus sumas por pares bastan
+        pairs = getattr(self.stats, "pairs", self.stats)
+        if pairs is not None and pairs.shift is not None:
+            state.update(shift=pairs.shift, counts=pairs.counts, sums=pairs.sums,
+                         squares=pairs.squares, products=pairs.products)
+        if self._tiled is not None:
+            state.update(cross=self._tiled.cross, feature_max=self._tiled.feature_max)
+        return state or None
+
+    def restore(self, state, columns, version):
+        """Inverso de `state`: la caché queda lista para `version` sin recorrer los datos."""
+        self.clear()
+        if "products" in state:
+            self.stats = PairwiseStats(columns, shift=state["shift"])
+            for name in ("counts", "sums", "squares", "products"):
+                setattr(self.stats, name, state[name])
+        if self.stats is not None:
+            # Derivar la matriz de las sumas es O(p²): no recorre los datos
+            self._set_corr(self.stats.correlation())
+        if "cross" in state:
+            self._tiled = TiledCorrelation(state["cross"], state["feature_max"], None, None, None)
+            self._feature_max = self._tiled.feature_max
+        self.version = version
+
+    def clear(self):
+        self.version = None
+        self.stats = None
+        self._set_corr(None)
+
+
+def cross_correlation_scores(corr):
+    """Suma por característica de |r| con el resto de características."""
+    # np.abs devuelve una copia: la matriz cacheada no se modifica
+    corr = np.abs(corr)
+    np.fill_diagonal(corr, 0)
+    return np.sum(corr, axis=0)
+
+
+def max_partner_correlation(corr):
+    """Mayor |r| de cada característica con cualquier otra (-inf si no hay ninguna)."""
+    corr = np.abs(corr)
+    corr[np.isnan(corr)] = -np.inf
+    np.fill_diagonal(corr, -np.inf)
+    if corr.shape[1] == 0:
+        return np.empty(0)
+    return corr.max(axis=1)
+
+
+def pearson_pairs(corr, threshold):
+    """Pares (i, j, |r|) con i < j y |r| >= threshold, como arrays dispersos."""
+    mask = np.triu(np.abs(corr) >= threshold, k=1)
+    rows, cols = np.nonzero(mask)
+    return rows, cols, np.abs(corr[rows, cols])
+
+
+def pearson_selection(corr, columns, threshold, feature_max=None):
+    """Características con algún |r| >= threshold, con el mayor coeficiente encontrado.
+
+    `feature_max` permite reutilizar el máximo por característica ya calculado:
+    cada consulta con un umbral distinto cuesta entonces O(p log p).
+    """
+    if feature_max is None:
+        feature_max = max_partner_correlation(corr)
+    selected = np.flatnonzero(feature_max >= threshold)
+    order = selected[np.argsort(-feature_max[selected], kind="stable")]
+    return [(columns[i], feature_max[i]) for i in order]
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .store import FEATURE_DTYPE, compact_frame, numeric_block
+
+CACHE_FORMAT = 4
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "analisisdataset")
+DEFAULT_MAX_BYTES = 4 * 2 ** 30
+META_FILE = "meta.json"
+FEATURES_FILE = "features.npy"
+
+
+class CSVCache:
+    """Caché binaria columnar de CSV ya parseados.
+
+    Cada entrada es un directorio con un meta.json, las características del
+    bloque float de `compact_frame` en un único features.npy en orden Fortran
+    (columna tras columna), cada columna numérica de fuera del bloque (enteras
+    o float que no caben en él) en su propio .npy y, por cada columna
+    categórica, sus códigos enteros y sus categorías como texto unicode de
+    ancho fijo: nada se guarda con pickle, así que una entrada escrita con
+    otra versión de numpy o pandas se sigue pudiendo leer. La clave combina ruta, tamaño, fecha de modificación y
+    opciones de lectura, así que cualquier cambio en el archivo o en el
+    separador/encabezado invalida la entrada. features.npy se abre con mmap y pasa
+    a ser el bloque de características del DataFrame: un acierto no parsea ni
+    copia los datos. Una entrada que no se puede leer se borra y cuenta como
+    fallo. Cuando el total supera `max_bytes` se eliminan las entradas usadas
+    hace más tiempo.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.environ.get("ANALISIS_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("ANALISIS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+
+    def key(self, file_path, sep, header):
+        st = os.stat(file_path)
+        raw = json.dumps([os.path.abspath(file_path), st.st_size, st.st_mtime_ns, sep, header, CACHE_FORMAT])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def read_csv(self, file_path, sep=",", header=0):
+        """Devuelve (DataFrame compacto, acierto) leyendo de la caché si es posible."""
+        key = self.key(file_path, sep, header)
+        df = self.get(key)
+        if df is not None:
+            return df, True
+        df = compact_frame(pd.read_csv(file_path, sep=sep, header=header))
+        try:
+            self.put(key, df)
+        except (OSError, ValueError):
+            # Sin espacio, sin permisos o columnas que no se pueden guardar: la caché es opcional
+            pass
+        return df, False
+
+    def get(self, key):
+        entry = os.path.join(self.directory, key)
+        meta_path = os.path.join(entry, META_FILE)
+        try:
+            with open(meta_path, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            columns = meta["columns"]
+            # Vista ndarray sobre el mmap: sin copia ni subclase memmap
+            features = np.load(os.path.join(entry, FEATURES_FILE), mmap_mode="r").view(np.ndarray)
+            names = [c["name"] for c in columns if c["kind"] == "feature"]
+            df = pd.DataFrame(features, columns=names, copy=False)
+            for i, column in enumerate(columns):
+                if column["kind"] == "feature":
+                    continue
+                if column["kind"] == "column":
+                    df.insert(i, column["name"], np.load(os.path.join(entry, f"{i}.npy"), allow_pickle=False))
+                    continue
+                codes = np.load(os.path.join(entry, f"{i}.codes.npy"), allow_pickle=False)
+                categories = np.load(os.path.join(entry, f"{i}.npy"), allow_pickle=False)
+                values = pd.Categorical.from_codes(codes, categories=categories.astype(object),
+                                                   ordered=column["ordered"])
+                df.insert(i, column["name"], values)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada corrupta, incompleta o de un formato que no entendemos: se descarta
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        try:
+            os.utime(meta_path)  # marca de uso para la expulsión LRU
+        except OSError:
+            pass
+        return df
+
+    def put(self, key, df):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            columns = []
+            found = numeric_block(df)
+            in_block = np.zeros(df.shape[1], dtype=bool) if found is None else found[1] >= 0
+            features = list(np.flatnonzero(in_block))
+            for i, name in enumerate(df.columns):
+                name = name.item() if isinstance(name, np.generic) else name
+                dtype = df.dtypes.iloc[i]
+                if in_block[i]:
+                    columns.append({"name": name, "kind": "feature"})
+                    continue
+                if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+                    np.save(os.path.join(tmp, f"{i}.npy"), df.iloc[:, i].to_numpy(), allow_pickle=False)
+                    columns.append({"name": name, "kind": "column"})
+                    continue
+                values = pd.Categorical(df.iloc[:, i])
+                if pd.api.types.infer_dtype(values.categories, skipna=True) not in ("string", "empty"):
+                    raise ValueError(f"La columna {name!r} no es de texto; no se guarda en la caché.")
+                np.save(os.path.join(tmp, f"{i}.codes.npy"), values.codes)
+                np.save(os.path.join(tmp, f"{i}.npy"), values.categories.to_numpy().astype("U"))
+                columns.append({"name": name, "kind": "category", "ordered": bool(values.ordered)})
+            feature_dtype = found[0].dtype if features else FEATURE_DTYPE
+            block = np.asfortranarray(df.iloc[:, features].to_numpy(dtype=feature_dtype))
+            np.save(os.path.join(tmp, FEATURES_FILE), block)
+            with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as fh:
+                json.dump({"format": CACHE_FORMAT, "columns": columns}, fh)
+            entry = os.path.join(self.directory, key)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict()
+
+    def entries(self):
+        """[(ruta, bytes, último uso)] de las entradas completas de la caché."""
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            meta_path = os.path.join(entry, META_FILE)
+            if name.startswith(".") or not os.path.isfile(meta_path):
+                continue
+            size = sum(f.stat().st_size for f in os.scandir(entry) if f.is_file())
+            result.append((entry, size, os.stat(meta_path).st_mtime))
+        return result
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for entry, _, _ in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
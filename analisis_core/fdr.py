@@ -0,0 +1,266 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .pairwise import column_shift
+from .parallel import SharedArray, imap_blocks, resolve
+
+# Se suma a cada varianza de clase para evitar divisiones por cero
+VAR_EPS = 1e-8
+# Características por bloque de trabajo (igual en serie y en paralelo)
+FDR_BLOCK = 256
+
+# Resultado de `multi_target_fdr` para un target: `scores` (p,) es el FDR habitual;
+# `one_vs_rest` (clases × p) y `pair_scores` (pares × p, pares (i, j) con i < j) son opcionales
+TargetFDR = namedtuple("TargetFDR", ["target", "classes", "scores", "one_vs_rest", "pairs", "pair_scores"])
+
+
+def group_rows(y):
+    """Agrupa las filas por clase: (clases, conteos, orden, inicios).
+
+    `orden` ordena las filas por clase (None si ya lo están) e `inicios` marca
+    el comienzo de cada grupo en la matriz ordenada, listo para reduceat.
+    """
+    classes, codes = np.unique(np.asarray(y), return_inverse=True)
+    codes = codes.ravel()
+    counts = np.bincount(codes, minlength=len(classes))
+    order = None if np.all(codes[:-1] <= codes[1:]) else np.argsort(codes, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return classes, counts, order, starts
+
+
+def grouped_moments(X_sorted, counts, starts):
+    """Medias y varianzas por clase de una matriz con las filas ya agrupadas.
+
+    Los NaN no cuentan: cada clase y característica usa sólo sus valores
+    presentes (NaN si no tiene ninguno).
+    """
+    if X_sorted.shape[0] == 0:
+        # Sin filas no hay clases: reduceat no admite una matriz vacía
+        return np.zeros((0, X_sorted.shape[1])), np.zeros((0, X_sorted.shape[1]))
+    shift, missing_values = _shift(X_sorted)
+    shifted_means, variances = _moments(*_grouped_sums(X_sorted, counts, starts, shift, missing_values))
+    return shifted_means + shift, variances
+
+
+def _shift(X):
+    # Se desplaza por la media global para que sum(x²) - n·media² no pierda precisión
+    # (la de los valores presentes en las columnas con NaN); también dice si hay algún NaN
+    shift = X.mean(axis=0, dtype=np.float64)
+    incomplete = np.isnan(shift)
+    if incomplete.any():
+        shift[incomplete] = column_shift(X[:, incomplete])
+    return shift, bool(incomplete.any())
+
+
+def _grouped_sums(X_sorted, counts, starts, shift, missing_values):
+    # Valores presentes, sumas y sumas de cuadrados por clase de X - shift, con las filas
+    # agrupadas; se acumulan en float64 aunque la matriz sea float32
+    centered = X_sorted - shift
+    n = np.broadcast_to(counts[:, None].astype(np.float64), (len(counts), X_sorted.shape[1]))
+    if missing_values:
+        missing = np.isnan(centered)
+        centered[missing] = 0.0
+        n = np.add.reduceat(~missing, starts, axis=0, dtype=np.float64)
+    return n, np.add.reduceat(centered, starts, axis=0), np.add.reduceat(centered * centered, starts, axis=0)
+
+
+def class_statistics(X, y):
+    """Medias y varianzas por clase de todas las características en una sola pasada.
+
+    Devuelve (clases, conteos, medias, varianzas); medias y varianzas tienen forma
+    (n_clases, n_caracteristicas). La varianza es poblacional (ddof=0), igual que np.var.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    classes, counts, order, starts = group_rows(y)
+    X_sorted = X if order is None else X[order]
+    means, variances = grouped_moments(X_sorted, counts, starts)
+    return classes, counts, means, variances
+
+
+def fisher_ratios(means, variances, eps=VAR_EPS):
+    """Suma de (m_i - m_j)² / (v_i + v_j) sobre todos los pares de clases i != j."""
+    means = np.asarray(means, dtype=np.float64)
+    variances = np.asarray(variances, dtype=np.float64) + eps
+    fdr = np.zeros(means.shape[1])
+    # El término es simétrico: se recorre el triángulo superior y se duplica
+    for i in range(means.shape[0] - 1):
+        diff = means[i + 1:] - means[i]
+        fdr += np.sum(diff * diff / (variances[i + 1:] + variances[i]), axis=0)
+    return 2.0 * fdr
+
+
+def fdr_scores(X, y, workers=1, executor="thread", block_size=FDR_BLOCK):
+    """FDR de cada característica, repartiendo bloques de columnas entre workers.
+
+    Las filas se agrupan por clase una sola vez; cada bloque calcula sus momentos
+    y razones de Fisher de forma independiente. Con `executor="process"` la matriz
+    agrupada vive en memoria compartida y los procesos no reciben copias.
+    Una matriz float32 se usa tal cual, sin convertirla entera a float64.
+    """
+    X = np.asarray(X)
+    if X.dtype.kind != "f":
+        X = X.astype(np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    _, counts, order, starts = group_rows(y)
+    blocks = [(c0, min(c0 + block_size, X.shape[1])) for c0 in range(0, X.shape[1], block_size)]
+    if not blocks:
+        return np.zeros(0)
+
+    if executor == "process" and workers > 1:
+        with SharedArray(X.shape, X.dtype) as shared:
+            if order is None:
+                shared.array[...] = X
+            else:
+                np.take(X, order, axis=0, out=shared.array)
+            tasks = [(shared.handle, counts, starts, c0, c1) for c0, c1 in blocks]
+            return np.concatenate(list(imap_blocks(_fdr_block, tasks, workers, executor)))
+
+    X_sorted = X if order is None else X[order]
+    tasks = [(X_sorted, counts, starts, c0, c1) for c0, c1 in blocks]
+    return np.concatenate(list(imap_blocks(_fdr_block, tasks, workers, executor)))
+
+
+def _fdr_block(source, counts, starts, c0, c1):
+    means, variances = grouped_moments(resolve(source)[:, c0:c1], counts, starts)
+    return fisher_ratios(means, variances)
+
+
+def rank_features(feature_names, scores):
+    """Lista [(característica, puntaje)] ordenada de mayor a menor."""
+    order = np.argsort(-scores, kind="stable")
+    names = list(feature_names)
+    return [(names[i], scores[i]) for i in order]
+
+
+def fdr_ranking(X, y, feature_names, workers=1, executor="thread"):
+    return rank_features(feature_names, fdr_scores(X, y, workers, executor))
+
+
+def target_class_codes(targets):
+    """Código de clase de cada fila para cada target: (clases por target, códigos).
+
+    `códigos` es una matriz int32 (targets × filas) con códigos[t, r] = c si la
+    fila r es de la clase c del target t; ocupa 4 bytes por fila y target, sin
+    importar cuántas clases tenga cada uno.
+    """
+    classes, codes = zip(*(np.unique(np.asarray(y), return_inverse=True) for y in targets))
+    return list(classes), np.array([code.ravel() for code in codes], dtype=np.int32)
+
+
+def multi_target_fdr(X, targets, names=None, one_vs_rest=False, class_pairs=False, workers=1,
+                     executor="thread", block_size=FDR_BLOCK):
+    """FDR de cada característica frente a varios targets, bloque a bloque de columnas.
+
+    Cada bloque se lee y se centra una vez y recibe los códigos de clase int32
+    de los targets; las sumas por clase salen, target a target, de esos códigos
+    (`_class_sums`), así que la memoria de un bloque no depende del número total
+    de clases. Con `one_vs_rest` se añade el FDR de cada clase contra el resto,
+    cuyos momentos son los totales menos los de la clase; con `class_pairs`, el
+    término de Fisher de cada par de clases, cuya suma (por dos) es el FDR del
+    target. Con `executor="process"` X y los códigos de clase van en memoria
+    compartida. Devuelve una lista de `TargetFDR`.
+    """
+    X = np.asarray(X)
+    if X.dtype.kind != "f":
+        X = X.astype(np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    names = list(range(len(targets))) if names is None else list(names)
+    classes, codes = target_class_codes(targets)
+    sizes = [len(c) for c in classes]
+    blocks = [(c0, min(c0 + block_size, X.shape[1])) for c0 in range(0, X.shape[1], block_size)]
+    if executor == "process" and workers > 1 and blocks:
+        with SharedArray(X.shape, X.dtype) as shared, SharedArray(codes.shape, codes.dtype) as shared_codes:
+            shared.array[...] = X
+            shared_codes.array[...] = codes
+            tasks = [(shared.handle, shared_codes.handle, sizes, c0, c1, one_vs_rest, class_pairs)
+                     for c0, c1 in blocks]
+            parts = list(imap_blocks(_multi_fdr_block, tasks, workers, executor))
+    else:
+        tasks = [(X, codes, sizes, c0, c1, one_vs_rest, class_pairs) for c0, c1 in blocks]
+        parts = list(imap_blocks(_multi_fdr_block, tasks, workers, executor))
+
+    results = []
+    for t, name in enumerate(names):
+        k = len(classes[t])
+        pairs = [(i, j) for i in range(k - 1) for j in range(i + 1, k)] if class_pairs else None
+
+        def joined(index, rows):
+            return np.concatenate([part[t][index] for part in parts], axis=-1) if parts else np.zeros((rows, 0))
+
+        results.append(TargetFDR(
+            name, classes[t], joined(0, 1).reshape(-1),
+            joined(1, k) if one_vs_rest else None, pairs,
+            joined(2, len(pairs)) if class_pairs else None,
+        ))
+    return results
+
+
+def _multi_fdr_block(source, codes, sizes, c0, c1, one_vs_rest, class_pairs):
+    block = resolve(source)[:, c0:c1]
+    codes = resolve(codes)
+    if block.shape[0] == 0:
+        # Sin filas no hay clases: puntajes 0, como `grouped_moments`
+        p = block.shape[1]
+        return [(np.zeros(p), np.zeros((k, p)) if one_vs_rest else None,
+                 np.zeros((k * (k - 1) // 2, p)) if class_pairs else None) for k in sizes]
+    # Se centra una vez por bloque, con cada característica en una fila contigua:
+    # las sumas por clase no ordenan ni copian las filas por target
+    shift, missing_values = _shift(block)
+    centered = np.subtract(block.T, shift[:, None], dtype=np.float64)
+    present = None
+    if missing_values:
+        missing = np.isnan(centered)
+        centered[missing] = 0.0
+        present = ~missing
+    squared = centered * centered
+
+    results = []
+    for code, k in zip(codes, sizes):
+        if present is None:
+            group_sums, group_squares = _class_sums(code, k, centered, squared)
+            counts = np.bincount(code, minlength=k).astype(np.float64)
+            group_n = np.broadcast_to(counts[:, None], (k, block.shape[1]))
+        else:
+            group_sums, group_squares, group_n = _class_sums(code, k, centered, squared, present)
+        means, variances = _moments(group_n, group_sums, group_squares)
+        scores = fisher_ratios(means + shift, variances)
+        ovr = pair_terms = None
+        if one_vs_rest:
+            # El resto de cada clase: totales del target menos la clase
+            rest = _moments(group_n.sum(axis=0) - group_n, group_sums.sum(axis=0) - group_sums,
+                            group_squares.sum(axis=0) - group_squares)
+            ovr = 2.0 * (means - rest[0]) ** 2 / (variances + rest[1] + 2 * VAR_EPS)
+        if class_pairs:
+            i, j = np.triu_indices(k, k=1)
+            pair_terms = (means[i] - means[j]) ** 2 / (variances[i] + variances[j] + 2 * VAR_EPS)
+        results.append((scores, ovr, pair_terms))
+    return results
+
+
+def _class_sums(code, k, *values):
+    # Sumas por clase (clases × características) de cada matriz de `values`
+    # (características × filas). Con no más clases que características salen de un
+    # producto con las indicadoras del target (filas × k), que no ocupan más que el
+    # bloque; con más clases, de bincount por característica, sin memoria adicional
+    if k <= len(values[0]):
+        H = np.zeros((len(code), k))
+        H[np.arange(len(code)), code] = 1.0
+        return [(np.asarray(matrix, dtype=np.float64) @ H).T for matrix in values]
+    sums = [np.empty((k, len(matrix))) for matrix in values]
+    for matrix, result in zip(values, sums):
+        for feature, row in enumerate(matrix):
+            result[:, feature] = np.bincount(code, weights=row, minlength=k)
+    return sums
+
+
+def _moments(n, sums, squares):
+    # Medias (desplazadas) y varianzas poblacionales desde conteos y sumas por grupo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / n
+        variances = np.maximum(squares / n - means ** 2, 0.0)
+    return means, variances
@@ -0,0 +1,114 @@
+import re
+import warnings
+from fnmatch import fnmatchcase
+
+import numpy as np
+
+# Filas por bloque al evaluar los predicados: acota los temporales a O(bloque × p)
+ROW_CHUNK = 65536
+
+_RANGE = re.compile(r"^\s*(-?\d+)\s*(?:-|:|\.\.)\s*(-?\d+)\s*$")
+
+
+def parse_positions(text, size):
+    """Posiciones de una lista como '0-99, 150, 200:300' (rangos inclusivos) en [0, size)."""
+    positions = []
+    for token in text.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        match = _RANGE.match(token)
+        if match:
+            start, stop = int(match.group(1)), int(match.group(2))
+            if start > stop:
+                raise ValueError(f"Rango inválido: '{token}'")
+            positions.append(np.arange(start, stop + 1))
+        else:
+            try:
+                positions.append(np.array([int(token)]))
+            except ValueError:
+                raise ValueError(f"Posición inválida: '{token}'") from None
+    positions = np.unique(np.concatenate(positions)) if positions else np.empty(0, dtype=np.int64)
+    if len(positions) and (positions[0] < 0 or positions[-1] >= size):
+        raise ValueError(f"Posiciones fuera de rango (0-{size - 1})")
+    return positions
+
+
+def match_columns(columns, text):
+    """Posiciones de las columnas indicadas por índices, rangos, nombres o patrones ('temp_*')."""
+    names = [str(c) for c in columns]
+    selected = []
+    for token in text.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if _RANGE.match(token) or token.lstrip("-").isdigit():
+            # Un número también puede ser el nombre de una columna sin encabezado
+            if token in names:
+                selected.append(np.array([names.index(token)]))
+            else:
+                selected.append(parse_positions(token, len(names)))
+            continue
+        matches = [i for i, name in enumerate(names) if fnmatchcase(name, token)]
+        if not matches:
+            raise KeyError(f"Ninguna columna coincide con '{token}'.")
+        selected.append(np.array(matches))
+    return np.unique(np.concatenate(selected)) if selected else np.empty(0, dtype=np.int64)
+
+
+def filter_positions(X, rows=(), columns=(), max_row_nan=None, max_column_nan=None, drop_constant=False,
+                     bounds=None):
+    """Filas y columnas a eliminar de X (posiciones), evaluando todos los criterios en una pasada.
+
+    - `rows`, `columns`: posiciones elegidas explícitamente.
+    - `max_row_nan` / `max_column_nan`: se eliminan filas/columnas con una fracción de NaN mayor.
+    - `drop_constant`: elimina columnas sin variación (o sólo NaN).
+    - `bounds`: (mín, máx) para todas las columnas o {posición: (mín, máx)}; se eliminan las filas
+      con algún valor fuera del intervalo. None en un extremo lo deja abierto; los NaN no cuentan.
+
+    Las columnas se evalúan sobre todas las filas y las filas sobre todas las
+    columnas, de modo que el resultado no depende del orden de los criterios.
+    """
+    n, p = X.shape
+    drop_rows = np.zeros(n, dtype=bool)
+    drop_rows[np.asarray(rows, dtype=np.int64)] = True
+    drop_columns = np.zeros(p, dtype=bool)
+    drop_columns[np.asarray(columns, dtype=np.int64)] = True
+
+    if bounds is not None and not isinstance(bounds, dict):
+        bounds = dict.fromkeys(range(p), bounds)
+    need_columns = max_column_nan is not None or drop_constant
+    need_rows = max_row_nan is not None or bool(bounds)
+    if not (need_columns or need_rows) or n == 0:
+        return np.flatnonzero(drop_rows), np.flatnonzero(drop_columns)
+
+    nan_counts = np.zeros(p, dtype=np.int64)
+    low = np.full(p, np.inf)
+    high = np.full(p, -np.inf)
+    if bounds:
+        bound_columns = np.array(sorted(bounds), dtype=np.int64)
+        lower = np.array([-np.inf if bounds[c][0] is None else bounds[c][0] for c in bound_columns])
+        upper = np.array([np.inf if bounds[c][1] is None else bounds[c][1] for c in bound_columns])
+    with warnings.catch_warnings():
+        # nanmin/nanmax avisan con bloques de columnas sólo NaN; el resultado (NaN) se trata abajo
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for r0 in range(0, n, ROW_CHUNK):
+            chunk = X[r0:r0 + ROW_CHUNK]
+            missing = np.isnan(chunk)
+            if max_column_nan is not None:
+                nan_counts += missing.sum(axis=0)
+            if drop_constant:
+                np.fmin(low, np.nanmin(chunk, axis=0), out=low)
+                np.fmax(high, np.nanmax(chunk, axis=0), out=high)
+            if max_row_nan is not None:
+                drop_rows[r0:r0 + len(chunk)] |= missing.mean(axis=1) > max_row_nan
+            if bounds:
+                values = chunk[:, bound_columns]
+                drop_rows[r0:r0 + len(chunk)] |= np.any((values < lower) | (values > upper), axis=1)
+
+    if max_column_nan is not None:
+        drop_columns |= nan_counts / n > max_column_nan
+    if drop_constant:
+        # Sin valores (inf > -inf nunca se cumplió) o máximo igual al mínimo
+        drop_columns |= ~(high > low)
+    return np.flatnonzero(drop_rows), np.flatnonzero(drop_columns)
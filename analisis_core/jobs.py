@@ -0,0 +1,118 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Tarea en segundo plano. La función recibe el Job para informar progreso."""
+
+    def __init__(self, name, events, on_done, on_error):
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self._events = events
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def report(self, fraction=None, message=""):
+        # Se llama desde el hilo de trabajo; también es el punto de cancelación
+        self.check_cancelled()
+        self._events.put(("progress", self, fraction, message))
+
+
+class JobScheduler:
+    """Ejecuta una tarea a la vez fuera del hilo de Tk.
+
+    Los eventos del hilo de trabajo pasan por una cola que se vacía con
+    `root.after`, de modo que los callbacks (`on_done`, `on_error`, `on_progress`)
+    siempre corren en el hilo de la interfaz. Mientras hay una tarea en curso
+    `submit` devuelve None: quien llama decide cómo rechazar la operación.
+    """
+
+    def __init__(self, root, on_progress=None, poll_ms=POLL_MS):
+        self.root = root
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+        self.current = None
+        self._polling = False
+        self._events = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analisis-job")
+
+    @property
+    def busy(self):
+        return self.current is not None
+
+    def submit(self, name, func, on_done, on_error=None):
+        if self.busy:
+            return None
+        job = Job(name, self._events, on_done, on_error)
+        self.current = job
+        self._notify(job, None, "En curso")
+        self._executor.submit(self._run, job, func)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, job, func):
+        try:
+            result = func(job)
+            job.check_cancelled()
+        except BaseException as e:
+            self._events.put(("error", job, None, e))
+        else:
+            self._events.put(("done", job, result, None))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, job, value, extra = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._notify(job, value, extra)
+                continue
+
+            self.current = None
+            if kind == "done":
+                self._notify(job, 1.0, "Completado")
+                job.on_done(value)
+            elif isinstance(extra, JobCancelled):
+                self._notify(job, 0.0, "Cancelado")
+            else:
+                self._notify(job, 0.0, "Error")
+                if job.on_error is not None:
+                    job.on_error(extra)
+
+        if self.current is not None:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _notify(self, job, fraction, message):
+        if self.on_progress is not None:
+            self.on_progress(job, fraction, message)
@@ -0,0 +1,292 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .store import numeric_block
+
+# Ediciones que se pueden deshacer; las más antiguas pasan a ser definitivas
+UNDO_LIMIT = 100
+# Fracción de filas (o columnas) eliminadas de forma definitiva que dispara la compactación
+COMPACT_RATIO = 0.5
+
+
+class MaskedFrame:
+    """Vista de sólo lectura de `base` restringida a filas y columnas dadas.
+
+    Ofrece lo que usan el motor y la interfaz (`shape`, `columns`, `dtypes`,
+    `iloc[filas, columnas]` con cortes y `to_numpy`) sin copiar nada hasta que
+    se piden los valores. Las filas se numeran 0..n-1 en el orden activo, igual
+    que tras un `reset_index`.
+
+    Con `block` (ver `numeric_block`), `to_numpy` corta el bloque float de
+    `base` (el mmap de la caché de CSV) en lugar de pasar por pandas: es una
+    vista si las filas y columnas activas son equiespaciadas (p. ej. todas las
+    filas y las columnas sin el target) y una sola copia, que se conserva, si no.
+    Cada versión del dataset tiene su propio `MaskedFrame`.
+    """
+
+    def __init__(self, base, rows, columns, block=None):
+        self.base = base
+        self.rows = rows
+        self.column_positions = columns
+        self.block = block
+        self.iloc = _ILocIndexer(self)
+        self._values = None
+
+    @property
+    def shape(self):
+        return len(self.rows), len(self.column_positions)
+
+    @property
+    def columns(self):
+        return self.base.columns[self.column_positions]
+
+    @property
+    def dtypes(self):
+        return self.base.dtypes.iloc[self.column_positions]
+
+    def _full(self):
+        return len(self.rows) == self.base.shape[0] and len(self.column_positions) == self.base.shape[1]
+
+    def to_numpy(self, dtype=None, copy=False):
+        if self._full():
+            return self.base.to_numpy(dtype=dtype, copy=copy)
+        values = self._block_values()
+        if values is None:
+            return self.base.iloc[self.rows, self.column_positions].to_numpy(dtype=dtype)
+        if dtype is not None and values.dtype != dtype:
+            return values.astype(dtype)
+        return values.copy() if copy else values
+
+    def _block_values(self):
+        if self._values is None and self.block is not None and len(self.column_positions):
+            block, positions = self.block
+            columns = positions[self.column_positions]
+            if (columns < 0).any():
+                return None
+            rows = slice(None) if len(self.rows) == block.shape[0] else _as_slice(self.rows)
+            columns = _as_slice(columns)
+            if isinstance(rows, slice) or isinstance(columns, slice):
+                self._values = block[rows, columns]
+            else:
+                self._values = block[np.ix_(rows, columns)]
+        return self._values
+
+    def to_frame(self):
+        """DataFrame con los datos activos (copia salvo que no haya nada enmascarado)."""
+        if self._full():
+            return self.base
+        frame = self.base.iloc[self.rows, self.column_positions]
+        frame.index = pd.RangeIndex(len(self.rows))
+        return frame
+
+
+def _as_slice(positions):
+    """Corte equivalente a `positions` si son crecientes y equiespaciadas, o las mismas posiciones."""
+    if len(positions) == 1:
+        return slice(positions[0], positions[0] + 1)
+    step = positions[1] - positions[0] if len(positions) > 1 else 0
+    if step > 0 and np.all(np.diff(positions) == step):
+        return slice(positions[0], positions[-1] + 1, step)
+    return positions
+
+
+class _ILocIndexer:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def __getitem__(self, key):
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        frame = self.frame
+        window = frame.base.iloc[frame.rows[rows], frame.column_positions[columns]]
+        window.index = pd.RangeIndex(len(frame.rows))[rows]
+        return window
+
+
+class MaskedDataset:
+    """DataFrame original inmutable más máscaras de filas y columnas activas.
+
+    Eliminar o restaurar filas y columnas y cambiar el target son ediciones
+    `(tipo, posiciones, valor)` sobre las máscaras, en coordenadas de `base`:
+    cuestan O(k) y se pueden deshacer y rehacer. Una edición `("batch", [ediciones], None)`
+    agrupa varias que se deshacen juntas. Las ediciones que salen del
+    historial (más de `undo_limit`) son definitivas; cuando las filas o columnas
+    eliminadas de forma definitiva superan `compact_ratio`, `base` se compacta
+    una vez y las posiciones del historial se renumeran. `row_origin` y
+    `column_origin` dan la posición en el `base` original de cada fila y
+    columna del actual.
+    """
+
+    def __init__(self, base, target=None, undo_limit=UNDO_LIMIT, compact_ratio=COMPACT_RATIO):
+        self.base = base
+        self.row_mask = np.ones(base.shape[0], dtype=bool)
+        self.column_mask = np.ones(base.shape[1], dtype=bool)
+        self.target = None if target is None else base.columns.get_loc(target)
+        self.undo_limit = undo_limit
+        self.compact_ratio = compact_ratio
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.row_origin = np.arange(base.shape[0])
+        self.column_origin = np.arange(base.shape[1])
+        self._positions = None
+        self._block = None
+
+    def numeric_block(self):
+        """`numeric_block` de `base`, calculado una vez por cada `base` (cambia al compactar)."""
+        if self._block is None or self._block[0] is not self.base:
+            self._block = (self.base, numeric_block(self.base))
+        return self._block[1]
+
+    def frame(self, rows, columns):
+        return MaskedFrame(self.base, rows, columns, self.numeric_block())
+
+    # Posiciones activas, recalculadas sólo cuando cambian las máscaras
+    def positions(self):
+        if self._positions is None:
+            columns = self.column_mask.copy()
+            if self.target is not None:
+                columns[self.target] = False
+            self._positions = (np.flatnonzero(self.row_mask), np.flatnonzero(columns))
+        return self._positions
+
+    def features(self):
+        rows, columns = self.positions()
+        return self.frame(rows, columns)
+
+    def target_series(self):
+        if self.target is None:
+            return None
+        return self.column_series(self.target)
+
+    def column_series(self, position):
+        """Columna `position` de `base` restringida a las filas activas."""
+        rows, _ = self.positions()
+        series = self.base.iloc[:, position]
+        if len(rows) != len(series):
+            series = series.iloc[rows]
+        return series.reset_index(drop=True)
+
+    def active_columns(self):
+        """Nombres de las columnas activas, características y target, en el orden de `base`."""
+        return self.base.columns[self.column_mask]
+
+    def feature_position(self, column_key):
+        """Posición en `base` de una característica activa."""
+        position = self.base.columns.get_loc(column_key)
+        if not self.column_mask[position] or position == self.target:
+            raise KeyError(f"La columna '{column_key}' no existe.")
+        return position
+
+    def column_position(self, column_key):
+        """Posición en `base` de una columna activa, sea característica o el target."""
+        position = self.base.columns.get_loc(column_key)
+        if not self.column_mask[position]:
+            raise KeyError(f"La columna '{column_key}' no existe.")
+        return position
+
+    # Ediciones
+    def apply(self, edit):
+        kind, positions, value = edit
+        if kind == "batch":
+            for sub in positions:
+                self.apply(sub)
+            return
+        if kind == "rows":
+            self.row_mask[positions] = value
+        elif kind == "columns":
+            self.column_mask[positions] = value
+        else:
+            self.target = value
+        self._positions = None
+
+    @staticmethod
+    def inverse(edit):
+        kind, positions, value = edit
+        if kind == "batch":
+            return kind, [MaskedDataset.inverse(sub) for sub in reversed(positions)], None
+        if kind == "target":
+            return kind, value, positions
+        return kind, positions, not value
+
+    def record(self, edit):
+        self.undo_stack.append(edit)
+        self.redo_stack.clear()
+        if len(self.undo_stack) > self.undo_limit:
+            self.undo_stack.popleft()
+            self.compact()
+
+    def pop_undo(self):
+        """Edición que deshace la última, o None; pasa al historial de rehacer."""
+        if not self.undo_stack:
+            return None
+        edit = self.undo_stack.pop()
+        self.redo_stack.append(edit)
+        return self.inverse(edit)
+
+    def pop_redo(self):
+        if not self.redo_stack:
+            return None
+        edit = self.redo_stack.pop()
+        self.undo_stack.append(edit)
+        return edit
+
+    # Compactación
+    def _referenced(self, kind, size):
+        referenced = np.zeros(size, dtype=bool)
+        for edit_kind, positions, value in flatten_edits(list(self.undo_stack) + self.redo_stack):
+            if edit_kind == kind:
+                referenced[positions] = True
+            elif kind == "columns" and edit_kind == "target":
+                referenced[[p for p in (positions, value) if p is not None]] = True
+        return referenced
+
+    def compact(self):
+        """Descarta de `base` lo eliminado que ya no se puede restaurar. Devuelve True si compactó."""
+        drop_rows = ~self.row_mask & ~self._referenced("rows", len(self.row_mask))
+        drop_columns = ~self.column_mask & ~self._referenced("columns", len(self.column_mask))
+        compact_rows = drop_rows.sum() > self.compact_ratio * len(drop_rows)
+        compact_columns = drop_columns.sum() > self.compact_ratio * len(drop_columns)
+        if not (compact_rows or compact_columns):
+            return False
+
+        keep_rows = ~drop_rows if compact_rows else np.ones(len(drop_rows), dtype=bool)
+        keep_columns = ~drop_columns if compact_columns else np.ones(len(drop_columns), dtype=bool)
+        base = self.base
+        if compact_rows:
+            base = base.iloc[np.flatnonzero(keep_rows)]
+            base.index = pd.RangeIndex(base.shape[0])
+        if compact_columns:
+            base = base.iloc[:, np.flatnonzero(keep_columns)]
+        row_map = np.cumsum(keep_rows) - 1
+        column_map = np.cumsum(keep_columns) - 1
+
+        def remap(edit):
+            kind, positions, value = edit
+            if kind == "batch":
+                return kind, [remap(sub) for sub in positions], None
+            if kind == "rows":
+                return kind, row_map[positions], value
+            if kind == "columns":
+                return kind, column_map[positions], value
+            return kind, *(None if p is None else int(column_map[p]) for p in (positions, value))
+
+        self.undo_stack = deque(remap(edit) for edit in self.undo_stack)
+        self.redo_stack = [remap(edit) for edit in self.redo_stack]
+        self.base = base
+        self.row_mask = self.row_mask[keep_rows]
+        self.column_mask = self.column_mask[keep_columns]
+        self.row_origin = self.row_origin[keep_rows]
+        self.column_origin = self.column_origin[keep_columns]
+        if self.target is not None:
+            self.target = int(column_map[self.target])
+        self._positions = None
+        return True
+
+
+def flatten_edits(edits):
+    for edit in edits:
+        if edit[0] == "batch":
+            yield from flatten_edits(edit[1])
+        else:
+            yield edit
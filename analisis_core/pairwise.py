@@ -0,0 +1,195 @@
+import warnings
+
+import numpy as np
+
+# Bytes de la máscara temporal al contar observaciones de una lista de pares
+PAIR_MASK_BUDGET = 64 * 2 ** 20
+
+
+def column_shift(X):
+    # Media de cada columna ignorando NaN (0 si no tiene valores): centrar antes de
+    # acumular evita la cancelación de sum(x²) - n·media²
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        shift = np.nanmean(X, axis=0, dtype=np.float64)
+    return np.where(np.isnan(shift), 0.0, shift)
+
+
+class PairwiseStats:
+    """Sumas para la correlación por pares completos de una matriz con NaN.
+
+    Para cada par (i, j) sólo cuentan las filas donde ambas columnas tienen
+    valor. Con X0 = X centrada y con los NaN en 0 y M = máscara de presentes:
+
+        N = Mᵀ·M        (observaciones del par)
+        S = X0ᵀ·M       (S[i, j]: suma de x_i en las filas del par)
+        Q = (X0²)ᵀ·M    (suma de x_i² en las filas del par)
+        P = X0ᵀ·X0      (productos cruzados)
+
+    Son productos de matrices en lugar de un `dropna` por par. Las columnas sin
+    NaN en un bloque de filas no necesitan producto con la máscara (su columna de
+    N, S y Q son conteos y sumas por columna), así que con pocas columnas
+    incompletas el coste es cercano al de la matriz densa. Las sumas se pueden
+    sumar y restar por bloques de filas (`update`, `remove_rows`) y dos
+    instancias se combinan con `merge` aunque se hayan desplazado por medias
+    distintas: es la parte por pares de `StreamingStats`.
+    """
+
+    def __init__(self, columns, shift=None):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift = shift
+        self.counts = np.zeros((p, p))
+        self.sums = np.zeros((p, p))
+        self.squares = np.zeros((p, p))
+        self.products = np.zeros((p, p))
+
+    @property
+    def count(self):
+        # Filas con al menos un valor en la diagonal (compatibilidad con StreamingStats)
+        return int(self.counts.diagonal().max()) if len(self.columns) else 0
+
+    def _accumulate(self, X, sign):
+        X = np.asarray(X).reshape(-1, len(self.columns))
+        if self.shift is None:
+            self.shift = column_shift(X)
+        # Centrado y conversión a float64 en una sola pasada
+        X0 = np.subtract(X, self.shift, dtype=np.float64)
+        missing = np.isnan(X0)
+        incomplete = np.flatnonzero(missing.any(axis=0))
+        n = X0.shape[0]
+        present = np.full(len(self.columns), n)
+        if len(incomplete):
+            # Sólo se recorren las columnas con NaN
+            missing = missing[:, incomplete]
+            block = X0[:, incomplete]
+            block[missing] = 0.0
+            X0[:, incomplete] = block
+            present[incomplete] -= missing.sum(axis=0)
+
+        products = X0.T @ X0
+        sums = X0.sum(axis=0)
+        self.products += sign * products
+        # Columnas completas en este bloque: N, S y Q de su columna son totales por columna
+        # (la suma de cuadrados es la diagonal de los productos)
+        self.counts += sign * present[:, None]
+        self.sums += sign * sums[:, None]
+        self.squares += sign * np.diag(products)[:, None]
+        if len(incomplete):
+            mask = (~missing).astype(np.float64)
+            # Se reemplazan las columnas incompletas, que se sumaron como completas
+            pair_counts = np.broadcast_to(mask.sum(axis=0), (len(self.columns), len(incomplete))).copy()
+            pair_counts[incomplete] = mask.T @ mask
+            self.counts[:, incomplete] += sign * (pair_counts - present[:, None])
+            self.sums[:, incomplete] += sign * (X0.T @ mask - sums[:, None])
+            self.squares[:, incomplete] += sign * ((X0 * X0).T @ mask - np.diag(products)[:, None])
+        return self
+
+    def update(self, X, y=None):
+        return self._accumulate(X, 1.0)
+
+    def remove_rows(self, X, y=None):
+        return self._accumulate(X, -1.0)
+
+    def _aligned(self, other):
+        # Sumas de `other` expresadas con el desplazamiento de esta instancia:
+        # x - shift = (x - other.shift) + d
+        d = other.shift - self.shift
+        n, s = other.counts, other.sums
+        sums = s + d[:, None] * n
+        squares = other.squares + 2.0 * d[:, None] * s + (d * d)[:, None] * n
+        products = other.products + d[:, None] * s.T + s * d[None, :] + np.outer(d, d) * n
+        return n, sums, squares, products
+
+    def merge(self, other):
+        """Suma las filas acumuladas en `other` (con cualquier desplazamiento)."""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+            for name in ("counts", "sums", "squares", "products"):
+                setattr(self, name, getattr(other, name).copy())
+            return self
+        counts, sums, squares, products = self._aligned(other)
+        self.counts += counts
+        self.sums += sums
+        self.squares += squares
+        self.products += products
+        return self
+
+    def remove(self, other):
+        """Inverso de `merge`: descuenta las filas de `other`, ya incluidas en esta instancia."""
+        if other.shift is None or self.shift is None:
+            return self
+        counts, sums, squares, products = self._aligned(other)
+        self.counts -= counts
+        self.sums -= sums
+        self.squares -= squares
+        self.products -= products
+        return self
+
+    def select_features(self, positions):
+        """Copia restringida a las características `positions`, sin modificar esta instancia."""
+        positions = np.asarray(positions, dtype=np.int64)
+        selected = PairwiseStats([self.columns[i] for i in positions],
+                                 None if self.shift is None else self.shift[positions])
+        for name in ("counts", "sums", "squares", "products"):
+            setattr(selected, name, getattr(self, name)[np.ix_(positions, positions)])
+        return selected
+
+    def means(self):
+        """Media de cada columna sobre sus valores presentes (NaN si no tiene ninguno)."""
+        if self.shift is None:
+            return np.full(len(self.columns), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.shift + self.sums.diagonal() / self.counts.diagonal()
+
+    def variances(self):
+        """Varianza poblacional de cada columna sobre sus valores presentes (NaN si no tiene ninguno)."""
+        n = self.counts.diagonal()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.maximum(self.squares.diagonal() - self.sums.diagonal() ** 2 / n, 0.0) / n
+
+    def covariance(self, ddof=1):
+        """Covarianza de cada par sobre sus filas completas (NaN con `ddof` filas o menos)."""
+        n = self.counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = (self.products - self.sums * self.sums.T / n) / (n - ddof)
+        covariance[n <= ddof] = np.nan
+        return covariance
+
+    def drop_features(self, positions):
+        keep = np.setdiff1d(np.arange(len(self.columns)), np.atleast_1d(positions))
+        self.columns = [self.columns[i] for i in keep]
+        if self.shift is not None:
+            self.shift = self.shift[keep]
+        for name in ("counts", "sums", "squares", "products"):
+            setattr(self, name, getattr(self, name)[np.ix_(keep, keep)])
+
+    def correlation(self):
+        """Correlación de Pearson de cada par sobre sus filas completas (NaN con menos de 2)."""
+        n = self.counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = self.products - self.sums * self.sums.T / n
+            variance = np.maximum(self.squares - self.sums ** 2 / n, 0.0)
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr[n < 2] = np.nan
+        return corr
+
+
+def pairwise_correlation(X, chunk_rows=65536):
+    """(correlación, observaciones por par) de X ignorando los NaN de cada par."""
+    stats = PairwiseStats(range(X.shape[1]))
+    for r0 in range(0, X.shape[0], chunk_rows):
+        stats.update(X[r0:r0 + chunk_rows])
+    return stats.correlation(), stats.counts.astype(np.int64)
+
+
+def pair_counts(X, rows, cols):
+    """Filas en las que ambas columnas de cada par (rows[k], cols[k]) tienen valor."""
+    counts = np.empty(len(rows), dtype=np.int64)
+    chunk = max(PAIR_MASK_BUDGET // max(X.shape[0], 1), 1)
+    for k0 in range(0, len(rows), chunk):
+        a, b = rows[k0:k0 + chunk], cols[k0:k0 + chunk]
+        counts[k0:k0 + len(a)] = np.sum(~np.isnan(X[:, a]) & ~np.isnan(X[:, b]), axis=0)
+    return counts
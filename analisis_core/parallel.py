@@ -0,0 +1,81 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Bloques abiertos por nombre en este proceso (los hijos los reutilizan entre tareas)
+_ATTACHED = {}
+
+
+class SharedArray:
+    """Array en memoria compartida para pasar matrices grandes a procesos hijos.
+
+    Los hijos reciben sólo `handle` (nombre, forma, dtype y orden) y abren el
+    mismo bloque de memoria con `resolve`, sin copiar ni serializar la matriz.
+    """
+
+    def __init__(self, shape, dtype, order="C"):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.handle = (self._shm.name, tuple(shape), dtype.str, order)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, order=order)
+
+    def close(self):
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def resolve(source):
+    """Devuelve el ndarray de `source`, que puede ser un array o un `SharedArray.handle`."""
+    if isinstance(source, np.ndarray):
+        return source
+    name, shape, dtype, order = source
+    if name not in _ATTACHED:
+        shm = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = (shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, order=order))
+    return _ATTACHED[name][1]
+
+
+def imap_blocks(func, tasks, workers=None, executor="thread"):
+    """Ejecuta func(*task) para cada tarea y produce los resultados en orden.
+
+    Con `workers <= 1` se ejecuta en serie; si no, en un pool de hilos o de
+    procesos. El orden de los resultados no depende del número de workers, así
+    que quien los combina obtiene exactamente lo mismo que en serie. Se limita el
+    número de tareas en vuelo para acotar la memoria de los resultados parciales.
+    """
+    tasks = list(tasks)
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield func(*task)
+        return
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    workers = min(workers, len(tasks))
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(pool.submit(func, *task))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Si se abandona la iteración (p. ej. cancelación) no se esperan las pendientes
+            for future in pending:
+                future.cancel()
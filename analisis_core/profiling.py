@@ -0,0 +1,175 @@
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+# Últimos registros que se conservan en memoria para la barra de estado
+HISTORY = 50
+
+_NULL = nullcontext()
+
+
+class Profiler:
+    """Mide las operaciones de análisis: tiempo real, CPU, pico de memoria y forma.
+
+    `track(nombre, forma)` abre una operación; los `track` anidados en el mismo
+    hilo se guardan como etapas de la operación abierta. Cada operación
+    terminada queda en `records` y, si hay `trace_path`, se añade como una línea
+    JSON a ese archivo. `profile_next()` activa cProfile para la próxima
+    operación y guarda el .prof en `profile_dir`.
+
+    Desactivado, `track` devuelve un contexto vacío compartido: el coste es una
+    llamada y una comprobación de atributo.
+    """
+
+    def __init__(self, enabled=False, trace_path=None, profile_dir=None):
+        self.enabled = enabled or trace_path is not None
+        self.trace_path = trace_path
+        self.profile_dir = profile_dir
+        self.records = deque(maxlen=HISTORY)
+        self._profile_next = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tracing = 0
+
+    def track(self, name, shape=None):
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, shape)
+
+    def annotate(self, **fields):
+        """Añade campos (p. ej. `shape` o `source`) a la operación abierta en este hilo."""
+        if not self.enabled:
+            return
+        span = getattr(self._local, "current", None)
+        if span is not None:
+            span.fields.update(fields)
+
+    def profile_next(self):
+        self.enabled = True
+        self._profile_next = True
+
+    def last(self, count=1):
+        with self._lock:
+            return list(self.records)[-count:]
+
+    def _start_memory(self):
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = 1
+            elif self._tracing:
+                self._tracing += 1
+            elif hasattr(tracemalloc, "reset_peak"):
+                # Otro código ya rastrea la memoria (p. ej. el benchmark): sólo se reinicia el pico
+                tracemalloc.reset_peak()
+
+    def _stop_memory(self):
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            if self._tracing:
+                self._tracing -= 1
+                if self._tracing == 0:
+                    tracemalloc.stop()
+            return peak
+
+    def _finish(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self.trace_path is not None:
+                with open(self.trace_path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class _Span:
+    def __init__(self, profiler, name, shape):
+        self.profiler = profiler
+        self.name = name
+        self.shape = shape
+
+    def __enter__(self):
+        local = self.profiler._local
+        self.parent = getattr(local, "current", None)
+        local.current = self
+        self.stages = []
+        self.fields = {}
+        self.profile = None
+        if self.parent is None:
+            if self.profiler._profile_next:
+                self.profiler._profile_next = False
+                self.profile = cProfile.Profile()
+            self.profiler._start_memory()
+            if self.profile is not None:
+                self.profile.enable()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.profiler._local.current = self.parent
+        record = {"name": self.name, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+        if self.shape is not None:
+            record["shape"] = list(self.shape)
+        for key, value in self.fields.items():
+            record[key] = list(value) if isinstance(value, tuple) else value
+        if self.parent is not None:
+            self.parent.stages.append(record)
+            return False
+
+        if self.profile is not None:
+            self.profile.disable()
+        record["peak_bytes"] = self.profiler._stop_memory()
+        record["time"] = datetime.now().isoformat(timespec="milliseconds")
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.stages:
+            record["stages"] = self.stages
+        if self.profile is not None:
+            directory = self.profiler.profile_dir or os.getcwd()
+            path = os.path.join(directory, f"{self.name}-{datetime.now():%Y%m%d-%H%M%S}.prof")
+            self.profile.dump_stats(path)
+            record["profile"] = path
+        self.profiler._finish(record)
+        return False
+
+
+def tracked(name):
+    """Decorador de métodos de `DatasetAnalysis`: mide la llamada con la forma del dataset."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not PROFILER.enabled:
+                return method(self, *args, **kwargs)
+            with PROFILER.track(name, None if self.df is None else self.df.shape):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def format_record(record):
+    """Resumen de una línea, p. ej. 'compute_fdr 64.4 ms (CPU 60.1 ms, pico 76.5 MiB, 20000×200)'."""
+    details = [f"CPU {record['cpu_s'] * 1000:.1f} ms"]
+    if "peak_bytes" in record:
+        details.append(f"pico {record['peak_bytes'] / 2 ** 20:.1f} MiB")
+    if "shape" in record:
+        details.append("×".join(str(n) for n in record["shape"]))
+    summary = f"{record['name']} {record['wall_s'] * 1000:.1f} ms ({', '.join(details)})"
+    if "profile" in record:
+        summary += f" [cProfile: {record['profile']}]"
+    return summary
+
+
+# Perfilador compartido; ANALISIS_PROFILE=1 lo activa y ANALISIS_TRACE=ruta además escribe la traza
+PROFILER = Profiler(
+    enabled=os.environ.get("ANALISIS_PROFILE", "") not in ("", "0"),
+    trace_path=os.environ.get("ANALISIS_TRACE") or None,
+    profile_dir=os.environ.get("ANALISIS_PROFILE_DIR") or None,
+)
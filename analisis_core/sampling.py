@@ -0,0 +1,333 @@
+import io
+import os
+from itertools import islice
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .correlation import WIDE_FEATURES, cross_correlation_scores
+from .fdr import fisher_ratios
+from .streaming import StreamingStats
+
+# Filas que se muestrean por defecto antes de dar la estimación por terminada
+DEFAULT_SAMPLE_ROWS = 200_000
+# Filas por lote: tras cada lote se publica una estimación más precisa
+BATCH_ROWS = 20_000
+# Líneas consecutivas que se leen del CSV tras cada salto a una posición aleatoria
+BLOCK_ROWS = 1_000
+# Submuestras con las que se estima la variabilidad del FDR y del ranking
+REPLICATES = 8
+CONFIDENCE = 0.95
+# Tamaño del top del ranking cuya coincidencia entre submuestras mide la estabilidad
+STABILITY_TOP = 10
+
+
+def _t_quantile(p, dof):
+    # Cuantil de la t de Student por la expansión de Cornish-Fisher (error < 1 % con dof >= 3)
+    z = NormalDist().inv_cdf(p)
+    return z + (z ** 3 + z) / (4 * dof) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+
+
+def _ranks(scores):
+    # Posición 1..p de cada característica en el ranking de mayor a menor
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def _abs_bounds(low, high):
+    # Intervalo de |r| a partir del de r: si contiene el 0 el mínimo es 0
+    abs_low = np.where((low <= 0) & (high >= 0), 0.0, np.minimum(np.abs(low), np.abs(high)))
+    return abs_low, np.maximum(np.abs(low), np.abs(high))
+
+
+class SampleStats:
+    """Estadísticos de una muestra de filas repartida al azar en `replicates` submuestras.
+
+    Cada fila (o cada grupo, p. ej. un bloque de líneas consecutivas del CSV) va
+    a una submuestra; la muestra completa es la unión de todas (`merge` de
+    `StreamingStats`). Los NaN no se imputan: cada correlación usa las filas
+    donde el par tiene valor y cada momento por clase los valores presentes. La dispersión entre submuestras da el error estándar del
+    FDR y de la correlación cruzada y los rangos que ocupa cada característica
+    en el ranking. La memoria es O(replicates·p²), independiente de las filas.
+    """
+
+    def __init__(self, columns, replicates=REPLICATES, confidence=CONFIDENCE, total_rows=None, seed=None):
+        if len(columns) > WIDE_FEATURES:
+            raise ValueError(f"La estimación por muestreo admite hasta {WIDE_FEATURES} características.")
+        self.columns = list(columns)
+        self.parts = [StreamingStats(self.columns) for _ in range(replicates)]
+        self.confidence = confidence
+        self.total_rows = total_rows
+        self._rng = np.random.default_rng(seed)
+        # Submuestra que recibe el siguiente grupo: los grupos se reparten por turnos
+        self._next_part = 0
+
+    @property
+    def rows(self):
+        return sum(part.count for part in self.parts)
+
+    def update(self, X, y=None, groups=None):
+        """Añade filas; las que comparten `groups` van a la misma submuestra.
+
+        Los grupos se reparten en orden aleatorio y por turnos, así que con al
+        menos `replicates` grupos ninguna submuestra queda vacía.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        k = len(self.parts)
+        if groups is None:
+            assignment = self._rng.integers(k, size=X.shape[0])
+        else:
+            ids, inverse = np.unique(groups, return_inverse=True)
+            turns = (self._next_part + self._rng.permutation(len(ids))) % k
+            self._next_part = (self._next_part + len(ids)) % k
+            assignment = turns[inverse.ravel()]
+        for k, part in enumerate(self.parts):
+            selected = assignment == k
+            if selected.any():
+                part.update(X[selected], None if y is None else np.asarray(y)[selected])
+        return self
+
+    def pooled(self):
+        pooled = StreamingStats(self.columns)
+        for part in self.parts:
+            pooled.merge(part)
+        return pooled
+
+    def _spread(self, pooled_scores, replicate_scores):
+        # Intervalo t con el error estándar de la media de las submuestras
+        k = len(replicate_scores)
+        if k < 2:
+            nan = np.full(len(pooled_scores), np.nan)
+            return nan, nan
+        se = np.std(replicate_scores, axis=0, ddof=1) / np.sqrt(k)
+        half = _t_quantile(0.5 + self.confidence / 2, k - 1) * se
+        # FDR y suma de |r| no son negativos
+        return np.maximum(pooled_scores - half, 0.0), pooled_scores + half
+
+    def summary(self):
+        """`Approximation` con los resultados de la muestra actual."""
+        pooled = self.pooled()
+        n = pooled.count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.clip(pooled.correlation(), -1.0, 1.0)
+            # Intervalo de Fisher: atanh(r) es aproximadamente normal con varianza 1/(n-3),
+            # con n las filas donde ambas características tienen valor
+            half = NormalDist().inv_cdf(0.5 + self.confidence / 2) / np.sqrt(np.maximum(pooled.counts - 3, 1))
+            z = np.arctanh(r)
+            correlation = (r, np.tanh(z - half), np.tanh(z + half))
+
+        parts = [part for part in self.parts if part.count > 1]
+        cross = cross_correlation_scores(r)
+        cross = (cross,) + self._spread(cross, [cross_correlation_scores(part.correlation()) for part in parts])
+
+        fdr = stability = None
+        if pooled.class_moments:
+            _, _, means, variances = pooled.class_statistics()
+            scores = fisher_ratios(means, variances)
+            # Sólo sirven las submuestras que contienen todas las clases
+            parts = [part for part in parts if len(part.class_moments) == len(pooled.class_moments)]
+            replicate_scores = [fisher_ratios(*part.class_statistics()[2:]) for part in parts]
+            low, high = self._spread(scores, replicate_scores)
+            ranks = np.array([_ranks(s) for s in replicate_scores]) if parts else np.full((1, len(scores)), np.nan)
+            order = np.argsort(-scores, kind="stable")
+            fdr = [(self.columns[i], scores[i], low[i], high[i], ranks[:, i].min(), ranks[:, i].max())
+                   for i in order]
+            if parts:
+                top = min(STABILITY_TOP, len(scores))
+                pooled_top = set(order[:top])
+                stability = float(np.mean([len(pooled_top & set(np.argsort(-s, kind="stable")[:top])) / top
+                                           for s in replicate_scores]))
+        return Approximation(self.columns, n, self.total_rows, self.confidence, correlation, cross, fdr, stability)
+
+
+class Approximation:
+    """Resultados aproximados de una muestra. No cambia después de creado.
+
+    - `correlation`: (r, inferior, superior), matrices p×p con el intervalo de Fisher.
+    - `cross`: (suma de |r|, inferior, superior) por característica; la suma de
+      |r| tiende a sobrestimarse en muestras pequeñas.
+    - `fdr`: [(característica, FDR, inferior, superior, mejor rango, peor rango)]
+      ordenada por FDR, o None sin target.
+    - `stability`: fracción media del top del ranking que coincide entre las
+      submuestras y la muestra completa (1 = ranking estable).
+    """
+
+    def __init__(self, columns, rows, total_rows, confidence, correlation, cross, fdr, stability):
+        self.columns = columns
+        self.rows = rows
+        self.total_rows = total_rows
+        self.confidence = confidence
+        self.correlation = correlation
+        self.cross = cross
+        self.fdr = fdr
+        self.stability = stability
+
+    @property
+    def fraction(self):
+        if not self.total_rows:
+            return None
+        return min(self.rows / self.total_rows, 1.0)
+
+    def pearson_pairs(self, threshold):
+        """[(a, b, |r|, inferior, superior)] de los pares cuyo intervalo de |r| alcanza el umbral."""
+        r, low, high = self.correlation
+        abs_low, abs_high = _abs_bounds(low, high)
+        rows, cols = np.nonzero(np.triu(abs_high >= threshold, k=1))
+        values = np.abs(r[rows, cols])
+        order = np.argsort(-values, kind="stable")
+        return [(self.columns[rows[i]], self.columns[cols[i]], values[i],
+                 abs_low[rows[i], cols[i]], abs_high[rows[i], cols[i]]) for i in order]
+
+    def describe(self):
+        """Resumen de una línea, p. ej. '40000 de ~1000000 filas (4.0 %), ranking estable al 90 %'."""
+        text = f"{self.rows} filas"
+        if self.total_rows:
+            text = f"{self.rows} de ~{self.total_rows} filas ({self.fraction:.1%})"
+        if self.stability is not None:
+            text += f", ranking estable al {self.stability:.0%}"
+        return text
+
+
+def array_batches(X, y=None, batch_rows=BATCH_ROWS, max_rows=None, stratify=True, seed=None):
+    """Lotes (X, y, None) de filas elegidas al azar sin reemplazo.
+
+    Con `stratify` y un target, el orden intercala las clases: cualquier prefijo
+    tiene cada clase en la misma proporción que el dataset y todas aparecen
+    desde el primer lote, así que las primeras estimaciones ya ven las clases raras.
+    """
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+    order = rng.permutation(n)
+    if stratify and y is not None:
+        _, codes, counts = np.unique(np.asarray(y), return_inverse=True, return_counts=True)
+        codes = codes.ravel()
+        by_class = order[np.argsort(codes[order], kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        # Posición relativa de cada fila dentro de su clase: 0 para la primera de cada una
+        key = np.empty(n)
+        key[by_class] = (np.arange(n) - starts[codes[by_class]]) / counts[codes[by_class]]
+        order = by_class[np.argsort(key[by_class], kind="stable")]
+    limit = n if max_rows is None else min(n, max_rows)
+    for r0 in range(0, limit, batch_rows):
+        # Índices ordenados: la copia del lote recorre la matriz en orden
+        rows = np.sort(order[r0:min(r0 + batch_rows, limit)])
+        yield X[rows], None if y is None else np.asarray(y)[rows], None
+
+
+class CSVSampler:
+    """Muestra de un CSV leída desde posiciones de byte aleatorias, sin recorrer el archivo.
+
+    Cada bloque son `block_rows` líneas consecutivas desde el primer inicio de
+    línea tras un byte elegido al azar, así que el coste depende de las filas
+    muestreadas y no del tamaño del archivo. Las filas que siguen a líneas
+    largas tienen algo más de probabilidad, los bloques pueden solaparse
+    (muestreo con reemplazo) y no se admiten campos entre comillas con saltos
+    de línea. Si la muestra pedida cubre el archivo, se lee entero en orden.
+    `total_rows` estima las filas del archivo por el largo medio de las líneas.
+    Con muestras pequeñas los bloques se acortan a `max_rows / replicates`
+    líneas (redondeado hacia arriba) para que cada submuestra de `SampleStats`
+    reciba al menos uno.
+    """
+
+    def __init__(self, file_path, sep=",", header=0, target=None, columns=None, block_rows=BLOCK_ROWS, seed=None):
+        self.file_path = file_path
+        self.sep = sep
+        self.header = header
+        self.names = list(pd.read_csv(file_path, sep=sep, header=header, nrows=1).columns)
+        if target is not None and target not in self.names:
+            raise KeyError(f"La columna '{target}' no existe.")
+        self.target = target
+        self.columns = list(columns) if columns is not None else [c for c in self.names if c != target]
+        self.block_rows = block_rows
+        self.total_rows = None
+        self._rng = np.random.default_rng(seed)
+
+    def _frame_batch(self, frame, groups=None):
+        X = frame[self.columns].to_numpy(dtype=np.float64)
+        y = None if self.target is None else frame[self.target].to_numpy()
+        return X, y, groups
+
+    def batches(self, batch_rows=BATCH_ROWS, max_rows=DEFAULT_SAMPLE_ROWS, replicates=REPLICATES):
+        block_rows = max(1, min(self.block_rows, -(-max_rows // replicates)))
+        with open(self.file_path, "rb") as handle:
+            if self.header is not None:
+                for _ in range(self.header + 1):
+                    handle.readline()
+            start = handle.tell()
+            size = os.fstat(handle.fileno()).st_size
+            if size <= start:
+                raise ValueError("El archivo no contiene filas.")
+
+            blocks = [self._read_block(handle, start, size, block_rows)]
+            line_bytes = sum(len(line) for line in blocks[0])
+            line_count = len(blocks[0])
+            if not line_count:
+                # El bloque cayó en la última línea o en líneas vacías: se usa el comienzo de los datos
+                handle.seek(start)
+                blocks = [self._read_lines(handle, block_rows)]
+                line_bytes = sum(len(line) for line in blocks[0])
+                line_count = len(blocks[0])
+                if not line_count:
+                    raise ValueError("El archivo no contiene filas.")
+            self.total_rows = int((size - start) * line_count / line_bytes)
+            if max_rows >= self.total_rows:
+                yield from self._sequential(batch_rows, max_rows)
+                return
+
+            # El primer bloque también cuenta para `max_rows`
+            blocks[0] = blocks[0][:max_rows]
+            rows = len(blocks[0])
+            block_id = 1
+            while True:
+                if rows >= max_rows or sum(len(block) for block in blocks) >= batch_rows:
+                    text = b"".join(line for block in blocks for line in block)
+                    frame = pd.read_csv(io.BytesIO(text), sep=self.sep, header=None, names=self.names)
+                    groups = np.repeat(np.arange(block_id - len(blocks), block_id), [len(b) for b in blocks])
+                    self.total_rows = int((size - start) * line_count / line_bytes)
+                    yield self._frame_batch(frame, groups)
+                    blocks = []
+                    if rows >= max_rows:
+                        return
+                block = self._read_block(handle, start, size, block_rows)
+                if block:
+                    block = block[:max_rows - rows]
+                    blocks.append(block)
+                    rows += len(block)
+                    line_bytes += sum(len(line) for line in block)
+                    line_count += len(block)
+                    block_id += 1
+
+    def _read_block(self, handle, start, size, block_rows):
+        # Se retrocede un byte y se descarta el resto de esa línea: la siguiente empieza en o tras `offset`
+        offset = int(self._rng.integers(start, size))
+        if offset > start:
+            handle.seek(offset - 1)
+            handle.readline()
+        else:
+            handle.seek(start)
+        return self._read_lines(handle, block_rows)
+
+    def _read_lines(self, handle, block_rows):
+        # La última línea del archivo puede no terminar en salto de línea: se completa para poder unir bloques
+        return [line if line.endswith(b"\n") else line + b"\n"
+                for line in islice(handle, block_rows) if line.strip()]
+
+    def _sequential(self, batch_rows, max_rows):
+        # `total_rows` es una estimación: `nrows` garantiza el límite aunque el archivo sea más largo
+        for chunk in pd.read_csv(self.file_path, sep=self.sep, header=self.header, chunksize=batch_rows,
+                                 nrows=max_rows):
+            yield self._frame_batch(chunk)
+
+
+def progressive(stats, batches, sampler=None):
+    """Añade cada lote (X, y, grupos) a `stats` y devuelve una `Approximation` tras cada uno.
+
+    Con un `CSVSampler`, el total de filas se actualiza con su estimación.
+    """
+    for X, y, groups in batches:
+        stats.update(X, y, groups)
+        if sampler is not None:
+            stats.total_rows = sampler.total_rows
+        yield stats.summary()
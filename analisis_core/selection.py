@@ -0,0 +1,45 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Un paso de la selección: posición de la característica, su relevancia (FDR o
+# información mutua), la redundancia media |r| con las ya elegidas y el puntaje
+SelectionStep = namedtuple("SelectionStep", ["feature", "relevance", "redundancy", "score"])
+
+
+def redundancy_selection(relevance, correlation, k, weight=1.0):
+    """Elige `k` características de forma voraz, al estilo mRMR.
+
+    En cada paso gana la característica con mayor
+
+        relevancia / máxima relevancia - weight · media de |r| con las elegidas
+
+    La relevancia se divide por la mayor para que quede en [0, 1], la misma
+    escala que |r|. `correlation` es la matriz de correlación p×p o una función
+    j -> columna j (`correlation_columns` para datos anchos). La redundancia
+    no se recalcula en cada paso: se guarda la suma de |r| con las elegidas y
+    cada paso sólo le suma la columna de la nueva, O(p). Los NaN de la
+    correlación (columnas constantes) no suman redundancia; las características
+    sin relevancia (NaN) quedan para el final. Devuelve [SelectionStep] en el
+    orden de elección.
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    p = len(relevance)
+    k = min(int(k), p)
+    column = correlation if callable(correlation) else (lambda j: correlation[:, j])
+    top = np.nanmax(relevance) if p and not np.isnan(relevance).all() else 0.0
+    scaled = np.where(np.isnan(relevance), -np.inf, relevance / (top if top > 0 else 1.0))
+
+    redundancy = np.zeros(p)
+    candidates = np.ones(p, dtype=bool)
+    steps = []
+    for step in range(k):
+        mean = redundancy / step if step else redundancy
+        available = np.flatnonzero(candidates)
+        scores = scaled[available] - weight * mean[available]
+        j = int(available[np.argmax(scores)])
+        steps.append(SelectionStep(j, relevance[j], mean[j], scaled[j] - weight * mean[j]))
+        candidates[j] = False
+        if step + 1 < k:
+            redundancy += np.nan_to_num(np.abs(column(j)))
+    return steps
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .fdr import TargetFDR
+from .masked import MaskedDataset
+from .streaming import PREVIEW_ROWS, StreamingStats, read_columns
+
+SESSION_FORMAT = 2
+SESSION_EXTENSION = ".npz"
+META_KEY = "meta"
+# Bloque de lectura al calcular la huella del archivo
+DIGEST_BLOCK = 2 ** 20
+
+
+def file_digest(file_path):
+    """SHA-1 del contenido del archivo."""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as fh:
+        for block in iter(lambda: fh.read(DIGEST_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path):
+    st = os.stat(file_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": file_digest(file_path)}
+
+
+def same_file(fingerprint, file_path):
+    """True si el archivo no cambió desde que se tomó `fingerprint`.
+
+    Con el mismo tamaño y fecha no se lee el archivo; si sólo cambió la fecha
+    (una copia, un `touch`) decide el contenido.
+    """
+    st = os.stat(file_path)
+    if st.st_size != fingerprint["size"]:
+        return False
+    if st.st_mtime_ns == fingerprint["mtime_ns"]:
+        return True
+    return file_digest(file_path) == fingerprint["sha1"]
+
+
+def _plain(value):
+    # Escalares numpy a tipos de Python para el JSON
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _Arrays:
+    """Arrays de la sesión: el JSON de metadatos guarda sólo sus claves."""
+
+    def __init__(self, arrays=None):
+        self.arrays = {} if arrays is None else arrays
+
+    def add(self, array):
+        if array is None:
+            return None
+        key = f"a{len(self.arrays)}"
+        self.arrays[key] = np.asarray(array)
+        return key
+
+    def get(self, key):
+        return None if key is None else self.arrays[key]
+
+
+def _encode_edit(edit, arrays):
+    kind, positions, value = edit
+    if kind == "batch":
+        return {"kind": kind, "edits": [_encode_edit(sub, arrays) for sub in positions]}
+    if kind == "target":
+        return {"kind": kind, "from": _plain(positions), "to": _plain(value)}
+    return {"kind": kind, "positions": arrays.add(np.asarray(positions, dtype=np.int64)), "value": bool(value)}
+
+
+def _decode_edit(entry, arrays):
+    kind = entry["kind"]
+    if kind == "batch":
+        return kind, [_decode_edit(sub, arrays) for sub in entry["edits"]], None
+    if kind == "target":
+        return kind, entry["from"], entry["to"]
+    return kind, arrays.get(entry["positions"]), entry["value"]
+
+
+def _ranking(ranking, base, arrays, *fields):
+    # [(característica, valores...)] -> posiciones en `base` y un array por valor
+    entry = {"features": arrays.add(base.columns.get_indexer([row[0] for row in ranking]))}
+    for i, field in enumerate(fields, start=1):
+        entry[field] = arrays.add(np.array([row[i] for row in ranking], dtype=np.float64))
+    return entry
+
+
+def _unranking(entry, base, arrays, *fields):
+    names = list(base.columns[arrays.get(entry["features"])])
+    values = [arrays.get(entry[field]) for field in fields]
+    return [(name, *(column[i] for column in values)) for i, name in enumerate(names)]
+
+
+def save_session(analysis, path):
+    """Guarda en `path` (.npz comprimido) el dataset, su historial y los resultados de `analysis`.
+
+    No se copian los datos: se guardan la huella y las opciones de lectura del
+    CSV, las máscaras, el historial de deshacer/rehacer y los arrays de los
+    resultados y de la caché de correlación (o los estadísticos del modo
+    streaming). La estimación por muestreo no se guarda.
+    """
+    if analysis.data is None:
+        raise ValueError("No hay ningún dataset cargado.")
+    file_path, sep, header = analysis.source
+    data = analysis.data
+    base = data.base
+    arrays = _Arrays()
+    meta = {
+        "format": SESSION_FORMAT,
+        "source": {"path": os.path.abspath(file_path), "sep": sep, "header": header,
+                   "streaming": analysis.stream_base is not None},
+        "fingerprint": file_fingerprint(file_path),
+        "columns": [_plain(c) for c in base.columns],
+        "dataset": {
+            "row_origin": arrays.add(data.row_origin),
+            "column_origin": arrays.add(data.column_origin),
+            "row_mask": arrays.add(data.row_mask),
+            "column_mask": arrays.add(data.column_mask),
+            "target": _plain(data.target),
+            "undo": [_encode_edit(edit, arrays) for edit in data.undo_stack],
+            "redo": [_encode_edit(edit, arrays) for edit in data.redo_stack],
+        },
+        "correlation_method": analysis.correlation_method,
+        "options": {name: list(value) if isinstance(value, tuple) else value
+                    for name, value in analysis.result_options.items()},
+        "results": _encode_results(analysis, base, arrays),
+    }
+    if analysis.stream_base is not None:
+        meta["stream"] = _encode_stream(analysis.stream_base, arrays)
+    else:
+        meta["caches"] = {}
+        for cache in (analysis.corr_cache, analysis.rank_cache):
+            state = cache.state(analysis.data_version)
+            if state is not None:
+                meta["caches"][cache.method] = {name: arrays.add(value) for name, value in state.items()}
+
+    arrays.arrays[META_KEY] = np.array(json.dumps(meta))
+    # Se escribe sobre un temporal: un error no deja una sesión a medias
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        np.savez_compressed(fh, **arrays.arrays)
+    os.replace(tmp, path)
+
+
+def _encode_results(analysis, base, arrays):
+    results = {}
+    if analysis.fdr_results:
+        results["fdr"] = _ranking(analysis.fdr_results, base, arrays, "scores")
+    if analysis.mi_results:
+        results["mi"] = _ranking(analysis.mi_results, base, arrays, "scores")
+    if analysis.pearson is not None:
+        results["pearson"] = _ranking(analysis.pearson, base, arrays, "values")
+    if analysis.cross_correlation is not None:
+        results["cross"] = {"values": arrays.add(analysis.cross_correlation)}
+    if analysis.feature_selection:
+        results["selection"] = _ranking(analysis.feature_selection, base, arrays,
+                                        "relevance", "redundancy", "score")
+    if analysis.multi_fdr is not None:
+        features, targets = analysis.multi_fdr
+        results["multi_fdr"] = {
+            "features": arrays.add(base.columns.get_indexer(features)),
+            "targets": [{
+                "target": int(base.columns.get_loc(result.target)),
+                "classes": [_plain(c) for c in result.classes],
+                "scores": arrays.add(result.scores),
+                "one_vs_rest": arrays.add(result.one_vs_rest),
+                "pairs": None if result.pairs is None else [list(pair) for pair in result.pairs],
+                "pair_scores": arrays.add(result.pair_scores),
+            } for result in targets],
+        }
+    return results
+
+
+def _encode_stream(stream, arrays):
+    labels = sorted(stream.class_moments)
+    moments = [stream.class_moments[label] for label in labels]
+    pairs = stream.pairs
+    return {
+        "columns": [_plain(c) for c in stream.columns],
+        "count": int(stream.count),
+        "pairs": {name: arrays.add(getattr(pairs, name))
+                  for name in ("shift", "counts", "sums", "squares", "products")},
+        "classes": [_plain(label) for label in labels],
+        "class_counts": arrays.add(np.array([m[0] for m in moments])) if moments else None,
+        "class_means": arrays.add(np.array([m[1] for m in moments])) if moments else None,
+        "class_m2": arrays.add(np.array([m[2] for m in moments])) if moments else None,
+    }
+
+
+def _decode_stream(entry, arrays):
+    stream = StreamingStats(entry["columns"])
+    stream.count = entry["count"]
+    for name, key in entry["pairs"].items():
+        setattr(stream.pairs, name, arrays.get(key))
+    for i, label in enumerate(entry["classes"]):
+        stream.class_moments[label] = [arrays.get(entry[key])[i] for key in ("class_counts", "class_means", "class_m2")]
+    return stream
+
+
+def read_session(path):
+    """(metadatos, arrays) de una sesión guardada."""
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    meta = json.loads(str(arrays.pop(META_KEY)))
+    if meta.get("format") != SESSION_FORMAT:
+        raise ValueError("Formato de sesión no compatible.")
+    return meta, _Arrays(arrays)
+
+
+def restore_session(analysis, path, progress=None):
+    """Reabre en `analysis` una sesión de `save_session`.
+
+    Si el CSV no cambió, el dataset, el historial, los resultados y la caché de
+    correlación vuelven tal cual, sin recalcular nada (en modo streaming sólo se
+    leen las filas de vista previa). Si cambió, se vuelve a leer y, si tiene las
+    mismas columnas y suficientes filas, se reaplica el historial y se recalculan
+    los resultados que había con sus opciones; si no, queda el archivo recién
+    leído. Devuelve True si no hubo que recalcular.
+    """
+    meta, arrays = read_session(path)
+    source = meta["source"]
+    file_path, sep, header = source["path"], source["sep"], source["header"]
+    unchanged = same_file(meta["fingerprint"], file_path)
+    dataset = meta["dataset"]
+
+    if source["streaming"] and unchanged:
+        # La vista previa tiene las columnas acumuladas y el target, no las de texto
+        stream = _decode_stream(meta["stream"], arrays)
+        keep = set(stream.columns)
+        if dataset["target"] is not None:
+            keep.add(meta["columns"][dataset["target"]])
+        preview = pd.read_csv(file_path, sep=sep, header=header, nrows=PREVIEW_ROWS)
+        analysis.reset()
+        analysis.data = MaskedDataset(preview[[c for c in preview.columns if c in keep]])
+        analysis.source = (file_path, sep, header)
+        analysis.stream_base = stream
+    else:
+        target = None
+        if source["streaming"] and dataset["target"] is not None:
+            # Las estadísticas por clase se recalculan al leer el archivo con su target
+            columns = read_columns(file_path, sep=sep, header=header).columns
+            target = meta["columns"][dataset["target"]]
+            target = target if target in columns else None
+        analysis.load(file_path, sep=sep, header=header, streaming=source["streaming"], target=target,
+                      progress=progress)
+
+    data = _restore_dataset(analysis.data.base, dataset, meta["columns"], arrays)
+    if data is not None:
+        analysis.data = data
+    analysis.set_correlation_method(meta["correlation_method"])
+    analysis.result_options = {name: tuple(value) if isinstance(value, list) else value
+                               for name, value in meta["options"].items()}
+    analysis._data_changed("targets")
+    if unchanged:
+        _restore_results(analysis, meta, arrays)
+        return True
+    if data is not None:
+        _recompute_results(analysis, meta)
+    return False
+
+
+def _restore_dataset(base, dataset, columns, arrays):
+    """`MaskedDataset` con las máscaras y el historial guardados sobre el `base` recién leído.
+
+    `columns` son los nombres de las columnas del `base` guardado. None si el
+    archivo ya no tiene esas columnas en esas posiciones o le faltan filas.
+    """
+    row_origin, column_origin = arrays.get(dataset["row_origin"]), arrays.get(dataset["column_origin"])
+    if len(column_origin) and column_origin.max() >= base.shape[1]:
+        return None
+    if list(base.columns[column_origin]) != columns or (len(row_origin) and row_origin.max() >= base.shape[0]):
+        return None
+    if len(row_origin) != base.shape[0]:
+        # El dataset guardado ya estaba compactado
+        base = base.iloc[row_origin]
+        base.index = pd.RangeIndex(base.shape[0])
+    if len(column_origin) != base.shape[1]:
+        base = base.iloc[:, column_origin]
+    data = MaskedDataset(base)
+    data.row_origin = row_origin
+    data.column_origin = column_origin
+    data.row_mask = arrays.get(dataset["row_mask"]).copy()
+    data.column_mask = arrays.get(dataset["column_mask"]).copy()
+    data.target = dataset["target"]
+    data.undo_stack = deque(_decode_edit(entry, arrays) for entry in dataset["undo"])
+    data.redo_stack = [_decode_edit(entry, arrays) for entry in dataset["redo"]]
+    return data
+
+
+def _restore_results(analysis, meta, arrays):
+    base = analysis.data.base
+    results = meta["results"]
+    if "fdr" in results:
+        analysis.fdr_results = _unranking(results["fdr"], base, arrays, "scores")
+    if "mi" in results:
+        analysis.mi_results = _unranking(results["mi"], base, arrays, "scores")
+    if "pearson" in results:
+        analysis.pearson = _unranking(results["pearson"], base, arrays, "values")
+    if "cross" in results:
+        analysis.cross_correlation = arrays.get(results["cross"]["values"])
+    if "selection" in results:
+        analysis.feature_selection = _unranking(results["selection"], base, arrays,
+                                                "relevance", "redundancy", "score")
+    if "multi_fdr" in results:
+        entry = results["multi_fdr"]
+        analysis.multi_fdr = (base.columns[arrays.get(entry["features"])], [TargetFDR(
+            base.columns[target["target"]], np.array(target["classes"], dtype=object),
+            arrays.get(target["scores"]), arrays.get(target["one_vs_rest"]),
+            None if target["pairs"] is None else [tuple(pair) for pair in target["pairs"]],
+            arrays.get(target["pair_scores"]),
+        ) for target in entry["targets"]])
+    columns = analysis.df.columns
+    for cache in (analysis.corr_cache, analysis.rank_cache):
+        state = meta.get("caches", {}).get(cache.method)
+        if state is not None:
+            cache.restore({name: arrays.get(key) for name, key in state.items()}, columns, analysis.data_version)
+    analysis._touch("fdr", "pearson", "cross")
+
+
+def _recompute_results(analysis, meta):
+    # Mismos análisis y opciones que tenía la sesión, sobre los datos nuevos
+    results, options = meta["results"], analysis.result_options
+    if "multi_fdr" in results:
+        base = analysis.data.base
+        targets = [t for t in results["multi_fdr"]["targets"] if t["target"] < len(base.columns)]
+        if targets:
+            analysis.compute_multi_fdr([base.columns[t["target"]] for t in targets],
+                                       one_vs_rest=targets[0]["one_vs_rest"] is not None,
+                                       class_pairs=targets[0]["pair_scores"] is not None)
+    if analysis.targets is not None:
+        if "fdr" in results:
+            analysis.compute_fdr()
+        if "mi" in results:
+            analysis.compute_mutual_information(options.get("mi"))
+    if "cross" in results:
+        analysis.compute_cross_correlation()
+    if "pearson" in results and "pearson" in options:
+        analysis.compute_pearson(options["pearson"])
+    if "selection" in results and "selection" in options and analysis.targets is not None:
+        k, weight, relevance = options["selection"]
+        analysis.select_features(k, weight, relevance)
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+FEATURE_DTYPE = np.float32
+
+
+def compact_frame(df, dtype=FEATURE_DTYPE):
+    """Reduce los tipos del DataFrame recién leído.
+
+    Las columnas float pasan a un único bloque `dtype` contiguo en orden Fortran
+    (una columna tras otra), que pandas guarda sin copiar; `feature_matrix`
+    devuelve después ese bloque sin copiarlo. Sólo entra en el bloque una
+    columna que `dtype` conserva: sin desbordarse y con sus valores enteros
+    exactos (p. ej. identificadores de más de 2^24 con NaN, que llegan como
+    float64); si no, se queda fuera, con su tipo. Las columnas enteras tampoco
+    entran: se reducen al entero más pequeño que las contiene, así que no
+    pierden precisión y las etiquetas siguen siendo enteras. El resto de
+    columnas pasan a `category`.
+    """
+    in_block, others = [], {}
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if pd.api.types.is_bool_dtype(column.dtype):
+            others[i] = column
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            others[i] = pd.to_numeric(column, downcast="integer")
+        elif pd.api.types.is_float_dtype(column.dtype) and isinstance(column.dtype, np.dtype):
+            if _fits_dtype(column.to_numpy(), dtype):
+                in_block.append(i)
+            else:
+                others[i] = column
+        elif pd.api.types.is_numeric_dtype(column.dtype):
+            others[i] = column
+        else:
+            others[i] = column.astype("category")
+    values = np.empty((df.shape[0], len(in_block)), dtype=dtype, order="F")
+    for k, i in enumerate(in_block):
+        values[:, k] = df.iloc[:, i].to_numpy()
+    compact = pd.DataFrame(values, columns=df.columns[in_block], index=df.index, copy=False)
+    for i, column in others.items():
+        compact.insert(i, df.columns[i], column)
+    return compact
+
+
+def _fits_dtype(values, dtype):
+    # True si pasar los valores float `values` a `dtype` no desborda ni cambia ningún entero
+    if np.dtype(dtype).itemsize >= values.dtype.itemsize:
+        return True
+    cast = values.astype(dtype)
+    with np.errstate(invalid="ignore"):
+        finite = np.isfinite(values)
+        if np.isinf(cast[finite]).any():
+            return False
+        integral = values[finite]
+        integral = integral[np.mod(integral, 1) == 0]
+    return bool(np.all(integral.astype(dtype).astype(values.dtype) == integral))
+
+
+def numeric_block(df):
+    """Bloque float sobre el que pandas guarda las columnas numéricas de `df`, sin copiarlo.
+
+    Devuelve (bloque, posiciones): `bloque` es la matriz filas × columnas que
+    arma `compact_frame` (o el mmap de `CSVCache`) y `posiciones[i]` la columna
+    del bloque de la columna i de `df`, o -1 si no está en él (columnas enteras,
+    de texto o float guardadas aparte). Se llega al bloque por el `base` de la
+    vista de una columna, se toma el que tiene más columnas y se comprueba la
+    dirección de cada una; None si ninguna columna float está en un bloque.
+    """
+    numeric = [i for i, dtype in enumerate(df.dtypes) if isinstance(dtype, np.dtype) and dtype.kind == "f"]
+    columns = [df.iloc[:, i].to_numpy() for i in numeric]
+    blocks = [block for block in (_column_block(column, df.shape[0]) for column in columns) if block is not None]
+    if not blocks:
+        return None
+    block = max(blocks, key=lambda b: b.shape[1])
+
+    start = block.__array_interface__["data"][0]
+    positions = np.full(df.shape[1], -1, dtype=np.int64)
+    for i, column in zip(numeric, columns):
+        if column.dtype != block.dtype or column.strides != block.strides[:1]:
+            continue
+        k, rest = divmod(column.__array_interface__["data"][0] - start, block.strides[1])
+        if not rest and 0 <= k < block.shape[1]:
+            positions[i] = k
+    return block, positions
+
+
+def _column_block(column, rows):
+    # Matriz filas × columnas de la que `column` es una vista, o None
+    block = column
+    while block.ndim < 2 and isinstance(block.base, np.ndarray):
+        block = block.base
+    if block.ndim != 2:
+        return None
+    if block.shape[0] != rows:
+        block = block.T
+    if block.shape[0] != rows or block.strides[0] != column.strides[0]:
+        return None
+    return block
+
+
+def feature_matrix(df):
+    """Matriz (filas × características) del DataFrame, sin copia si es un solo bloque float."""
+    dtypes = set(df.dtypes)
+    if len(dtypes) == 1 and np.dtype(next(iter(dtypes))).kind == "f":
+        return df.to_numpy(copy=False)
+    return df.to_numpy(dtype=np.float64)
+
+
+def compact_target(series):
+    """Target con el tipo más pequeño: enteros reducidos si las etiquetas son enteras, si no `category`."""
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy()
+        if not np.isnan(values).any() and np.all(np.mod(values, 1) == 0):
+            return pd.to_numeric(series.astype(np.int64), downcast="integer")
+        return series
+    return series.astype("category")
+
+
+def target_codes(series):
+    """Etiquetas del target como array; los `category` se pasan como códigos enteros."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy()
+    return series.to_numpy()
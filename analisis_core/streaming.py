@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .fdr import fisher_ratios, group_rows, grouped_moments, rank_features
+from .pairwise import PairwiseStats
+
+DEFAULT_CHUNKSIZE = 100_000
+PREVIEW_ROWS = 200
+
+
+class StreamingStats:
+    """Estadísticos suficientes y combinables de una matriz de características con NaN.
+
+    Guarda las filas vistas, las sumas por pares de `PairwiseStats` (cada par se
+    correlaciona sobre sus filas completas) y, por clase, los valores presentes,
+    la media y el M2 de cada característica. Dos instancias se combinan con
+    `merge` (fórmulas de Chan et al., característica por característica con sus
+    propios conteos), así que un archivo se puede procesar por bloques con
+    memoria O(p²) independiente del número de filas.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = 0
+        self.pairs = PairwiseStats(self.columns)
+        # etiqueta -> [valores presentes, medias, M2], vectores por característica (media y M2 en 0 sin valores)
+        self.class_moments = {}
+
+    @classmethod
+    def from_batch(cls, X, columns, y=None):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(columns))
+        stats = cls(columns)
+        stats.count = X.shape[0]
+        if stats.count == 0:
+            return stats
+        stats.pairs.update(X)
+        if y is not None:
+            classes, counts, order, starts = group_rows(y)
+            X_sorted = X if order is None else X[order]
+            means, variances = grouped_moments(X_sorted, counts, starts)
+            present = np.add.reduceat(~np.isnan(X_sorted), starts, axis=0, dtype=np.float64)
+            for c, n, m, v in zip(classes.tolist(), present, means, variances):
+                stats.class_moments[c] = [n, np.where(n > 0, m, 0.0), np.where(n > 0, v * n, 0.0)]
+        return stats
+
+    def update(self, X, y=None):
+        self.merge(StreamingStats.from_batch(X, self.columns, y))
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.pairs.merge(other.pairs)
+        for c, (nb, mb, m2b) in other.class_moments.items():
+            if c not in self.class_moments:
+                self.class_moments[c] = [nb.copy(), mb.copy(), m2b.copy()]
+                continue
+            na, ma, m2a = self.class_moments[c]
+            n = na + nb
+            delta = mb - ma
+            weight = nb / np.maximum(n, 1.0)
+            self.class_moments[c] = [n, ma + delta * weight, m2a + m2b + delta * delta * na * weight]
+        return self
+
+    def remove(self, other):
+        """Inverso de `merge`: descuenta un bloque de filas ya incluido (downdate)."""
+        if other.count == 0:
+            return self
+        if self.count - other.count <= 0:
+            self.__init__(self.columns)
+            return self
+        self.count -= other.count
+        self.pairs.remove(other.pairs)
+        for c, (nb, mb, m2b) in other.class_moments.items():
+            n_total, m_total, m2_total = self.class_moments[c]
+            na = n_total - nb
+            if not (na > 0).any():
+                del self.class_moments[c]
+                continue
+            present = na > 0
+            ma = np.where(present, (n_total * m_total - nb * mb) / np.maximum(na, 1.0), 0.0)
+            delta = mb - ma
+            m2a = m2_total - m2b - delta * delta * na * nb / np.maximum(n_total, 1.0)
+            self.class_moments[c] = [na, ma, np.where(present, np.maximum(m2a, 0.0), 0.0)]
+        return self
+
+    def remove_rows(self, X, y=None):
+        return self.remove(StreamingStats.from_batch(X, self.columns, y))
+
+    def drop_features(self, positions):
+        keep = np.setdiff1d(np.arange(len(self.columns)), np.atleast_1d(positions))
+        self.columns = [self.columns[i] for i in keep]
+        self.pairs.drop_features(positions)
+        for moments in self.class_moments.values():
+            for i in range(3):
+                moments[i] = moments[i][keep]
+
+    def select_features(self, positions):
+        """Copia restringida a las características `positions`, sin modificar esta instancia."""
+        positions = np.asarray(positions, dtype=np.int64)
+        selected = StreamingStats([self.columns[i] for i in positions])
+        selected.count = self.count
+        selected.pairs = self.pairs.select_features(positions)
+        selected.class_moments = {label: [n[positions], mean[positions], m2[positions]]
+                                  for label, (n, mean, m2) in self.class_moments.items()}
+        return selected
+
+    @property
+    def mean(self):
+        return self.pairs.means()
+
+    @property
+    def counts(self):
+        """Observaciones de cada par de características (matriz p×p)."""
+        return self.pairs.counts
+
+    def variances(self):
+        return self.pairs.variances()
+
+    def covariance(self, ddof=1):
+        return self.pairs.covariance(ddof)
+
+    def correlation(self):
+        return self.pairs.correlation()
+
+    def class_statistics(self):
+        """(clases, valores presentes, medias, varianzas); las tres últimas son clases × características."""
+        classes = sorted(self.class_moments)
+        counts = np.array([self.class_moments[c][0] for c in classes])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, np.array([self.class_moments[c][1] for c in classes]), np.nan)
+            variances = np.array([self.class_moments[c][2] for c in classes]) / counts
+        return np.array(classes), counts, means, variances
+
+    def fdr_ranking(self):
+        if not self.class_moments:
+            raise ValueError("No hay target seleccionado en el modo streaming.")
+        _, _, means, variances = self.class_statistics()
+        return rank_features(self.columns, fisher_ratios(means, variances))
+
+
+def stream_csv(file_path, sep=",", header=0, target=None, chunksize=DEFAULT_CHUNKSIZE,
+               preview_rows=PREVIEW_ROWS, progress=None):
+    """Recorre el CSV por bloques sin materializar el DataFrame completo.
+
+    Devuelve (stats, preview); preview son las primeras filas del archivo (incluido
+    el target) para mostrarlas en la interfaz. Sólo se acumulan las columnas
+    numéricas del primer bloque (ver `streamed_columns`); las de texto, salvo el
+    target, no aparecen en ninguno de los dos. `progress(fraccion)` se llama tras
+    cada bloque con la fracción aproximada del archivo ya leída.
+    """
+    stats = None
+    preview = None
+    with open(file_path, "rb") as handle:
+        size = max(os.fstat(handle.fileno()).st_size, 1)
+        for chunk in pd.read_csv(handle, sep=sep, header=header, chunksize=chunksize):
+            stats, preview = _consume_chunk(chunk, stats, preview, target, preview_rows)
+            if progress is not None:
+                progress(min(handle.tell() / size, 1.0))
+
+    if stats is None:
+        raise ValueError("El archivo no contiene filas.")
+    return stats, preview
+
+
+def read_columns(file_path, sep=",", header=0):
+    """DataFrame vacío con las columnas del CSV: resuelve el target sin leer las filas."""
+    return pd.read_csv(file_path, sep=sep, header=header, nrows=0)
+
+
+def streamed_columns(frame, target=None):
+    """Columnas de `frame` que se guardan en modo streaming: las numéricas y el target, en su orden."""
+    return [c for c, dtype in frame.dtypes.items() if c == target or pd.api.types.is_numeric_dtype(dtype)]
+
+
+def _consume_chunk(chunk, stats, preview, target, preview_rows):
+    if stats is None:
+        if target is not None and target not in chunk.columns:
+            raise KeyError(f"La columna '{target}' no existe.")
+        keep = streamed_columns(chunk, target)
+        stats = StreamingStats([c for c in keep if c != target])
+        preview = chunk[keep].head(preview_rows).reset_index(drop=True)
+    y = None if target is None else chunk[target].to_numpy()
+    X = chunk[stats.columns]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in X.dtypes):
+        # Una columna numérica en el primer bloque puede traer texto después: ese valor cuenta como NaN
+        X = X.apply(pd.to_numeric, errors="coerce")
+    stats.update(X.to_numpy(dtype=np.float64), y)
+    return stats, preview
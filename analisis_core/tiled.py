@@ -0,0 +1,375 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .pairwise import column_shift
+from .parallel import SharedArray, imap_blocks, resolve
+
+# Memoria máxima para los bloques de correlación temporales (bytes)
+DEFAULT_MEMORY_BUDGET = 256 * 2 ** 20
+# Filas (o valores faltantes) por paso al corregir los pares con NaN de un bloque
+MASK_ROWS = 8192
+# Por debajo de 1/SPARSE_FACTOR de NaN en sus filas, las correcciones se suman fila a fila
+SPARSE_FACTOR = 16
+
+TiledCorrelation = namedtuple(
+    "TiledCorrelation", ["cross", "feature_max", "pairs", "top_k_index", "top_k_value"]
+)
+
+
+def standardized_columns(X, dtype=np.float64, out=None):
+    """Columnas centradas y de norma 1: Z[:, i] · Z[:, j] es la correlación r_ij.
+
+    Se guarda en orden Fortran para que cada bloque de columnas sea contiguo.
+    Las columnas constantes quedan en NaN, igual que en np.corrcoef. En las
+    columnas con NaN la media y la norma son las de sus valores presentes y
+    los NaN quedan en 0, así que no aportan a ningún producto. Los motores por
+    bloques no llaman a esta función: estandarizan sólo las columnas de cada
+    bloque con `column_scales`.
+    """
+    scales = column_scales(X)
+    Z = standardized_block(X, scales, 0, X.shape[1], dtype)
+    if out is None:
+        return Z
+    out[...] = Z
+    return out
+
+
+def column_scales(X, block_columns=None):
+    """(medias, normas, con NaN) de cada columna de X, para estandarizar un bloque con `standardized_block`.
+
+    Se recorre X por bloques de `block_columns` columnas, así que la memoria
+    temporal es de n × `block_columns` valores float64 y no de una copia de X.
+    """
+    n, p = X.shape
+    if block_columns is None:
+        block_columns = p
+    means, norms = np.zeros(p), np.zeros(p)
+    incomplete = np.zeros(p, dtype=bool)
+    for c0 in range(0, p, max(block_columns, 1)):
+        c1 = min(c0 + block_columns, p)
+        block = np.array(X[:, c0:c1], dtype=np.float64, order="F")
+        shift = block.mean(axis=0)
+        missing = np.flatnonzero(np.isnan(shift))
+        if len(missing):
+            shift[missing] = column_shift(block[:, missing])
+        block -= shift
+        for c in missing:
+            column = block[:, c]
+            column[np.isnan(column)] = 0.0
+        means[c0:c1], norms[c0:c1] = shift, np.sqrt(np.einsum("ij,ij->j", block, block))
+        incomplete[c0 + missing] = True
+        del block  # que no coexista con el bloque siguiente
+    return means, norms, incomplete
+
+
+def standardized_block(X, scales, c0, c1, dtype=np.float64):
+    """Columnas c0..c1 de X estandarizadas como en `standardized_columns`, desde sus `column_scales`."""
+    means, norms, incomplete = scales
+    Z = np.array(X[:, c0:c1], dtype=dtype, order="F")
+    Z -= means[c0:c1].astype(dtype)
+    for c in np.flatnonzero(incomplete[c0:c1]):
+        column = Z[:, c]
+        column[np.isnan(column)] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z /= norms[c0:c1].astype(dtype)
+    return Z
+
+
+def missing_mask(X):
+    """(presentes, posiciones): máscara n×k de las k columnas con NaN y, por columna, su índice en ella o -1."""
+    incomplete = np.flatnonzero(np.isnan(X.sum(axis=0)))
+    positions = np.full(X.shape[1], -1, dtype=np.intp)
+    positions[incomplete] = np.arange(len(incomplete))
+    return ~np.isnan(X[:, incomplete]), positions
+
+
+def correlation_columns(X, dtype=np.float64, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Función j -> correlación de cada característica con la j-ésima, sin la matriz p×p.
+
+    Si X estandarizada cabe en `memory_budget` se estandariza una sola vez y
+    cada columna cuesta un producto n×p; si no, cada llamada la recorre por
+    bloques de columnas que caben en el presupuesto y estandariza cada bloque
+    al usarlo. Con NaN cada par se corrige a sus filas completas, como en
+    `tiled_correlation`.
+    """
+    X = np.asarray(X)
+    n, p = X.shape
+    b = max(1, min(p, memory_budget // max(n * np.dtype(dtype).itemsize, 1)))
+    scales = column_scales(X, max(1, memory_budget // max(8 * n, 1)))
+    present, positions = missing_mask(X)
+    Z = standardized_block(X, scales, 0, p, dtype) if b == p else None
+
+    def block(c0, c1):
+        return Z[:, c0:c1] if Z is not None else standardized_block(X, scales, c0, c1, dtype)
+
+    def column(j):
+        Zj = block(j, j + 1)
+        result = np.empty(p)
+        for c0 in range(0, p, b):
+            c1 = min(c0 + b, p)
+            Zc = block(c0, c1)
+            products = (Zc.T @ Zj).astype(np.float64, copy=False)
+            if present.shape[1]:
+                products = _pairwise_block(Zc, Zj, present, positions, slice(c0, c1), slice(j, j + 1), products)
+            result[c0:c1] = products[:, 0]
+        return result
+
+    return column
+
+
+def tile_size(n_features, memory_budget=DEFAULT_MEMORY_BUDGET, itemsize=8, n_rows=0):
+    # Cada bloque b×b necesita el producto, su valor absoluto y una máscara, y sus
+    # dos bloques de columnas estandarizadas n×b: 3·b² + 2·n·b valores
+    values = memory_budget / itemsize
+    b = int((np.sqrt(n_rows * n_rows + 3 * values) - n_rows) / 3)
+    return min(max(b, 1), max(n_features, 1))
+
+
+def tiled_correlation(X, threshold=None, top_k=0, memory_budget=DEFAULT_MEMORY_BUDGET,
+                      dtype=np.float64, progress=None, workers=1, executor="thread"):
+    """Correlación por bloques de características sin materializar la matriz p×p.
+
+    Cada bloque Z_i.T @ Z_j se reduce en el momento a: suma de |r| por
+    característica (correlación cruzada), máximo |r| por característica, pares
+    con |r| >= threshold (si se pide) y los `top_k` socios más correlacionados.
+    `dtype=np.float32` reduce a la mitad la memoria y el tiempo de los productos.
+
+    Los bloques se reparten entre `workers` hilos o procesos; `memory_budget` es
+    por worker. Si X estandarizada ocupa hasta la mitad del presupuesto se
+    estandariza una vez y los bloques usan la otra mitad; si no, cada bloque
+    estandariza sus columnas al empezar y el presupuesto incluye esas columnas,
+    así que nunca hay una copia estandarizada de X que no quepa en él. Los
+    parciales se combinan siempre en el mismo orden, así que el resultado es
+    idéntico al de la ejecución en serie.
+
+    Con NaN, los pares en los que alguna columna tiene NaN se corrigen a la
+    correlación sobre sus filas completas (ver `PairwiseStats`); los productos
+    extra sólo abarcan esas filas y columnas del bloque.
+    """
+    X = np.asarray(X)
+    n, p = X.shape
+    itemsize = np.dtype(dtype).itemsize
+    whole = n * p * itemsize <= memory_budget // 2
+    b = tile_size(p, memory_budget // 2, itemsize) if whole else tile_size(p, memory_budget, itemsize, n)
+    starts = list(range(0, p, b))
+    tiles = [(i0, min(i0 + b, p), j0, min(j0 + b, p)) for t, i0 in enumerate(starts) for j0 in starts[t:]]
+    top_k = min(top_k, max(p - 1, 0))
+    scales = column_scales(X, max(1, memory_budget // max(8 * n, 1)))
+    present, positions = missing_mask(X)
+    if not present.shape[1]:
+        present = positions = None
+    # Con X ya estandarizada los bloques no necesitan las escalas
+    source, block_scales = (standardized_block(X, scales, 0, p, dtype), None) if whole else (X, scales)
+
+    if executor == "process" and workers > 1:
+        with SharedArray(source.shape, source.dtype, order="F") as shared, \
+                SharedArray(() if present is None else present.shape, bool, order="F") as shared_mask:
+            shared.array[...] = source
+            mask = None
+            if present is not None:
+                shared_mask.array[...] = present
+                mask = shared_mask.handle
+            tasks = [(shared.handle, block_scales, dtype, mask, positions) + tile + (threshold, top_k)
+                     for tile in tiles]
+            return _combine_tiles(imap_blocks(_reduce_tile, tasks, workers, executor), tiles, p, threshold, top_k,
+                                  progress)
+
+    tasks = [(source, block_scales, dtype, present, positions) + tile + (threshold, top_k) for tile in tiles]
+    return _combine_tiles(imap_blocks(_reduce_tile, tasks, workers, executor), tiles, p, threshold, top_k, progress)
+
+
+def _missing_sums(missing, Z, rows, other=None):
+    """Σ z y Σ z² de cada columna de Z sobre las filas donde falta cada columna de `missing`.
+
+    `rows` son las filas con algún True en `missing`. Con `other` (otra máscara
+    de faltantes) también cuenta en cuántas de esas filas falta cada columna de
+    `other`. Con pocos NaN se suman sólo las filas de cada columna faltante
+    (coste O(NaN · columnas)); si no, son productos de matrices sobre esas filas.
+    Las filas se leen de Z.T, contigua por columna, que es mucho más rápido que
+    indexar filas de una matriz en orden Fortran.
+    """
+    sums = np.zeros((missing.shape[1], Z.shape[1]))
+    squares = np.zeros_like(sums)
+    common = None if other is None else np.zeros((missing.shape[1], other.shape[1]))
+    n_missing = int(missing.sum())
+    if n_missing * SPARSE_FACTOR < len(rows) * missing.shape[1]:
+        columns, row_index = np.nonzero(missing.T)
+        for e0 in range(0, n_missing, MASK_ROWS):
+            a, k = columns[e0:e0 + MASK_ROWS], row_index[e0:e0 + MASK_ROWS]
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(a)) + 1))
+            values = np.take(Z.T, k, axis=1)
+            sums[a[starts]] += np.add.reduceat(values, starts, axis=1, dtype=np.float64).T
+            squares[a[starts]] += np.add.reduceat(values * values, starts, axis=1, dtype=np.float64).T
+            if other is not None:
+                common[a[starts]] += np.add.reduceat(np.take(other.T, k, axis=1), starts, axis=1,
+                                                     dtype=np.float64).T
+        return sums, squares, common
+    for r0 in range(0, len(rows), MASK_ROWS):
+        r = rows[r0:r0 + MASK_ROWS]
+        U = missing[r].astype(np.float64)
+        values = np.take(Z.T, r, axis=1).astype(np.float64)
+        sums += U.T @ values.T
+        squares += U.T @ (values * values).T
+        if other is not None:
+            common += U.T @ other[r].astype(np.float64)
+    return sums, squares, common
+
+
+def _pair_correlation(products, count, sums_a, squares_a, sums_b, squares_b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - sums_a * sums_b / count
+        variance_a = np.maximum(squares_a - sums_a ** 2 / count, 0.0)
+        variance_b = np.maximum(squares_b - sums_b ** 2 / count, 0.0)
+        corr = covariance / np.sqrt(variance_a * variance_b)
+    corr[count < 2] = np.nan
+    return corr
+
+
+def _pairwise_block(Za, Zb, present, positions, rows, cols, products):
+    """Corrige `products` (Za.T @ Zb) a la correlación sobre las filas completas de cada par.
+
+    Za y Zb son las columnas estandarizadas `rows` y `cols`. Como sus NaN están
+    en 0, para cada par basta restar de los totales de columna lo que aportan
+    las filas donde falta la otra columna:
+
+        N_ab = n - faltan_a - faltan_b + faltan_ambas
+        S_a|b = Σ z_a - Σ_{falta b} z_a        Q_a|b = Σ z_a² - Σ_{falta b} z_a²
+
+    Sólo cambian las filas y columnas del bloque con NaN, y las correcciones
+    sólo recorren las filas donde falta algún valor.
+    """
+    n = Za.shape[0]
+    sum_a, sum_b = Za.sum(axis=0, dtype=np.float64), Zb.sum(axis=0, dtype=np.float64)
+    sq_a = np.einsum("ij,ij->j", Za, Za, dtype=np.float64)
+    sq_b = np.einsum("ij,ij->j", Zb, Zb, dtype=np.float64)
+    inc_a, inc_b = np.flatnonzero(positions[rows] >= 0), np.flatnonzero(positions[cols] >= 0)
+    missing_a = ~present[:, positions[rows][inc_a]]
+    missing_b = ~present[:, positions[cols][inc_b]]
+    lost_a = np.zeros(len(sum_a))
+    lost_a[inc_a] = missing_a.sum(axis=0)
+    lost_b = np.zeros(len(sum_b))
+    lost_b[inc_b] = missing_b.sum(axis=0)
+    rows_a = np.flatnonzero(missing_a.any(axis=1))
+    rows_b = np.flatnonzero(missing_b.any(axis=1))
+    # from_a[j, i]: Σ z_a(i) en las filas donde falta la columna inc_b[j]
+    from_a, sq_from_a, _ = _missing_sums(missing_b, Za, rows_b)
+
+    block = products.copy()
+    if len(inc_a):
+        # Filas del bloque con NaN contra todas las columnas
+        from_b, sq_from_b, common = _missing_sums(missing_a, Zb, rows_a, other=missing_b)
+        count = n - lost_a[inc_a, None] - lost_b[None, :]
+        count[:, inc_b] += common
+        sums_a = np.repeat(sum_a[inc_a, None], len(sum_b), axis=1)
+        squares_a = np.repeat(sq_a[inc_a, None], len(sum_b), axis=1)
+        sums_a[:, inc_b] -= from_a[:, inc_a].T
+        squares_a[:, inc_b] -= sq_from_a[:, inc_a].T
+        block[inc_a] = _pair_correlation(products[inc_a], count, sums_a, squares_a,
+                                         sum_b - from_b, sq_b - sq_from_b)
+    complete_a = np.flatnonzero(positions[rows] < 0)
+    if len(inc_b) and len(complete_a):
+        # Filas completas contra las columnas con NaN: sólo se corrige la fila
+        cells = np.ix_(complete_a, inc_b)
+        count = np.broadcast_to(n - lost_b[inc_b], (len(complete_a), len(inc_b)))
+        block[cells] = _pair_correlation(products[cells], count,
+                                         sum_a[complete_a, None] - from_a[:, complete_a].T,
+                                         sq_a[complete_a, None] - sq_from_a[:, complete_a].T,
+                                         sum_b[inc_b], sq_b[inc_b])
+    return block
+
+
+def _reduce_tile(source, scales, dtype, mask_source, positions, i0, i1, j0, j1, threshold, top_k):
+    """Parciales de un bloque: sumas, máximos, pares y candidatos top-k por fila y columna."""
+    X = resolve(source)
+    if scales is None:
+        Za, Zb = X[:, i0:i1], X[:, j0:j1]
+    else:
+        Za = standardized_block(X, scales, i0, i1, dtype)
+        Zb = Za if i0 == j0 else standardized_block(X, scales, j0, j1, dtype)
+    block = (Za.T @ Zb).astype(np.float64, copy=False)
+    if mask_source is not None:
+        rows, cols = slice(i0, i1), slice(j0, j1)
+        if (positions[rows] >= 0).any() or (positions[cols] >= 0).any():
+            block = _pairwise_block(Za, Zb, resolve(mask_source), positions, rows, cols, block)
+    block = np.abs(block)
+    diagonal = i0 == j0
+    if diagonal:
+        np.fill_diagonal(block, 0.0)
+
+    # Para máximos y top-k se excluyen la diagonal y los NaN
+    ranked = np.where(np.isnan(block), -np.inf, block)
+    if diagonal:
+        np.fill_diagonal(ranked, -np.inf)
+
+    pairs = None
+    if threshold is not None:
+        mask = block >= threshold
+        if diagonal:
+            mask = np.triu(mask, k=1)
+        rows, cols = np.nonzero(mask)
+        pairs = (rows + i0, cols + j0, block[rows, cols])
+
+    rows_part = (block.sum(axis=1), ranked.max(axis=1), _tile_top_k(ranked, j0, top_k))
+    cols_part = None
+    if not diagonal:
+        cols_part = (block.sum(axis=0), ranked.max(axis=0), _tile_top_k(ranked.T, i0, top_k))
+    return rows_part, cols_part, pairs
+
+
+def _tile_top_k(values, offset, k):
+    if not k:
+        return None
+    index = np.broadcast_to(np.arange(offset, offset + values.shape[1]), values.shape)
+    if values.shape[1] > k:
+        keep = np.argpartition(-values, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(values, keep, axis=1), np.take_along_axis(index, keep, axis=1)
+    return values, index
+
+
+def _combine_tiles(partials, tiles, p, threshold, top_k, progress):
+    cross = np.zeros(p)
+    feature_max = np.full(p, -np.inf)
+    pair_rows, pair_cols, pair_values = [], [], []
+    top_value = np.full((p, top_k), -np.inf)
+    top_index = np.full((p, top_k), -1, dtype=np.intp)
+
+    for done, ((i0, i1, j0, j1), (rows_part, cols_part, pairs)) in enumerate(zip(tiles, partials), start=1):
+        for span, part in ((slice(i0, i1), rows_part), (slice(j0, j1), cols_part)):
+            if part is None:
+                continue
+            sums, maxima, candidates = part
+            cross[span] += sums
+            np.maximum(feature_max[span], maxima, out=feature_max[span])
+            if candidates is not None:
+                _merge_top_k(top_value, top_index, span, candidates, top_k)
+        if pairs is not None:
+            pair_rows.append(pairs[0])
+            pair_cols.append(pairs[1])
+            pair_values.append(pairs[2])
+        if progress is not None:
+            progress(done / len(tiles))
+
+    pairs = None
+    if threshold is not None:
+        pairs = (
+            np.concatenate(pair_rows) if pair_rows else np.empty(0, dtype=np.intp),
+            np.concatenate(pair_cols) if pair_cols else np.empty(0, dtype=np.intp),
+            np.concatenate(pair_values) if pair_values else np.empty(0),
+        )
+    if top_k:
+        order = np.argsort(-top_value, axis=1, kind="stable")
+        top_value = np.take_along_axis(top_value, order, axis=1)
+        top_index = np.take_along_axis(top_index, order, axis=1)
+    return TiledCorrelation(cross, feature_max, pairs, top_index, top_value)
+
+
+def _merge_top_k(top_value, top_index, rows, candidates, k):
+    values = np.concatenate([top_value[rows], candidates[0]], axis=1)
+    index = np.concatenate([top_index[rows], candidates[1]], axis=1)
+    if values.shape[1] > k:
+        keep = np.argpartition(-values, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(values, keep, axis=1)
+        index = np.take_along_axis(index, keep, axis=1)
+    top_value[rows] = values
+    top_index[rows] = index
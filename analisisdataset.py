@@ -1,21 +1,192 @@
 import tkinter as tk
-from tkinter import filedialog, simpledialog, messagebox
-import pandas as pd
+from tkinter import messagebox, ttk
 from tkinter.scrolledtext import ScrolledText
-import numpy as np
-import json
+import app
+from analisis_core.profiling import PROFILER
+from widgets import DataGrid
+
+class FilterDialog:
+    FIELDS = [
+        ("rows", "Filas (p. ej. 0-99, 150):"),
+        ("columns", "Columnas (índices, nombres o patrones como temp_*):"),
+        ("max_row_nan", "Máx. fracción de NaN por fila (0-1):"),
+        ("max_column_nan", "Máx. fracción de NaN por columna (0-1):"),
+        ("low", "Valor mínimo permitido:"),
+        ("high", "Valor máximo permitido:"),
+    ]
+
+    def __init__(self, parent):
+        self.top = tk.Toplevel(parent)
+        self.top.title("Filtrar filas y columnas")
+        self.result = None
+
+        self.entries = {}
+        for key, label in self.FIELDS:
+            tk.Label(self.top, text=label).pack(padx=10, pady=(10, 0), anchor="w")
+            self.entries[key] = tk.Entry(self.top, width=40)
+            self.entries[key].pack(padx=10, pady=2, fill="x")
+
+        self.constant_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.top, text="Eliminar columnas sin variación", variable=self.constant_var).pack(pady=5)
+
+        btn_frame = tk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="Aceptar", command=self.on_accept).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Cancelar", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
+        try:
+            numbers = {key: float(values[key]) if values[key] else None
+                       for key in ("max_row_nan", "max_column_nan", "low", "high")}
+        except ValueError as e:
+            messagebox.showerror("Error", f"Valor numérico inválido: {e}", parent=self.top)
+            return
+        bounds = None
+        if numbers["low"] is not None or numbers["high"] is not None:
+            bounds = (numbers["low"], numbers["high"])
+        options = {
+            "max_row_nan": numbers["max_row_nan"],
+            "max_column_nan": numbers["max_column_nan"],
+            "drop_constant": self.constant_var.get(),
+            "bounds": bounds,
+        }
+        self.result = (values["rows"], values["columns"], options)
+        self.top.destroy()
+
+class MultiTargetDialog:
+    def __init__(self, parent, targets=""):
+        self.top = tk.Toplevel(parent)
+        self.top.title("FDR con varios targets")
+        self.result = None
+
+        tk.Label(self.top, text="Columnas target (índices, nombres o patrones como clase_*):").pack(padx=10, pady=(10, 0), anchor="w")
+        self.targets_entry = tk.Entry(self.top, width=40)
+        self.targets_entry.insert(0, targets)
+        self.targets_entry.pack(padx=10, pady=2, fill="x")
+
+        self.one_vs_rest_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(self.top, text="Cada clase contra el resto", variable=self.one_vs_rest_var).pack(pady=5)
+        self.class_pairs_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.top, text="Desglose por pares de clases", variable=self.class_pairs_var).pack(pady=5)
+
+        btn_frame = tk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="Aceptar", command=self.on_accept).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Cancelar", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        text = self.targets_entry.get().strip()
+        if not text:
+            messagebox.showerror("Error", "Indique al menos una columna target.", parent=self.top)
+            return
+        self.result = (text, self.one_vs_rest_var.get(), self.class_pairs_var.get())
+        self.top.destroy()
+
+class SelectionDialog:
+    def __init__(self, parent, k=10):
+        self.top = tk.Toplevel(parent)
+        self.top.title("Seleccionar características")
+        self.result = None
+
+        tk.Label(self.top, text="Características a elegir:").pack(padx=10, pady=(10, 0), anchor="w")
+        self.k_entry = tk.Entry(self.top)
+        self.k_entry.insert(0, str(k))
+        self.k_entry.pack(padx=10, pady=2, fill="x")
+
+        tk.Label(self.top, text="Peso de la redundancia (0 = sólo relevancia):").pack(padx=10, pady=(10, 0), anchor="w")
+        self.weight_entry = tk.Entry(self.top)
+        self.weight_entry.insert(0, "1.0")
+        self.weight_entry.pack(padx=10, pady=2, fill="x")
+
+        tk.Label(self.top, text="Relevancia:").pack(padx=10, pady=(10, 0), anchor="w")
+        self.relevance_var = tk.StringVar(value="FDR")
+        ttk.Combobox(self.top, textvariable=self.relevance_var, values=("FDR", "Información mutua"),
+                     state="readonly").pack(padx=10, pady=2, fill="x")
+
+        self.apply_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.top, text="Conservar sólo las elegidas (se puede deshacer)", variable=self.apply_var).pack(pady=5)
+
+        btn_frame = tk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="Aceptar", command=self.on_accept).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Cancelar", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        try:
+            k = int(self.k_entry.get())
+            weight = float(self.weight_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Indique un número de características y un peso válidos.", parent=self.top)
+            return
+        if k < 1:
+            messagebox.showerror("Error", "Hay que elegir al menos una característica.", parent=self.top)
+            return
+        relevance = "mi" if self.relevance_var.get() == "Información mutua" else "fdr"
+        self.result = (k, weight, relevance, self.apply_var.get())
+        self.top.destroy()
+
+class CSVOptionsDialog:
+    def __init__(self, parent):
+        self.top = tk.Toplevel(parent)
+        self.top.title("Opciones de carga CSV")
+        self.result = None
+
+        tk.Label(self.top, text="Separador:").pack(padx=10, pady=(10, 0))
+        self.sep_entry = tk.Entry(self.top)
+        self.sep_entry.insert(0, ",")
+        self.sep_entry.pack(padx=10, pady=5)
+
+        self.has_header_var = tk.BooleanVar(value=True)
+        self.header_check = tk.Checkbutton(self.top, text="El archivo tiene encabezado", variable=self.has_header_var)
+        self.header_check.pack(pady=5)
+
+        self.streaming_var = tk.BooleanVar(value=False)
+        self.streaming_check = tk.Checkbutton(self.top, text="Modo streaming (archivos grandes)", variable=self.streaming_var)
+        self.streaming_check.pack(pady=5)
+
+        tk.Label(self.top, text="Columna target (opcional, nombre o índice):").pack(padx=10, pady=(10, 0))
+        self.target_entry = tk.Entry(self.top)
+        self.target_entry.pack(padx=10, pady=5)
+
+        btn_frame = tk.Frame(self.top)
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="Aceptar", command=self.on_accept).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Cancelar", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.top.grab_set()
+        parent.wait_window(self.top)
+
+    def on_accept(self):
+        sep = self.sep_entry.get()
+        has_header = self.has_header_var.get()
+        # Con el target ya elegido, el modo streaming no vuelve a recorrer el archivo para elegirlo
+        self.result = (sep, has_header, self.streaming_var.get(), self.target_entry.get().strip())
+        self.top.destroy()
+
+class DatasetApp(app.DatasetApp):
+    csv_dialog = CSVOptionsDialog
+    filter_dialog = FilterDialog
+    multi_target_dialog = MultiTargetDialog
+    selection_dialog = SelectionDialog
 
-class DatasetApp:
     def __init__(self, root):
-        self.root = root
+        super().__init__(root)
         self.root.title("Analisis DataSet")
 
-        self.df = None
-        self.targets = None
-        self.fdr_results = {}
-        self.cross_correlation = None
-        self.pearson = None
-
         # Frame para los botones
         button_frame = tk.Frame(root)
         button_frame.pack(pady=10)
@@ -41,6 +212,33 @@ class DatasetApp:
         self.cross_button = tk.Button(button_frame, text="Calcular Correlación Cruzada", command=self.compute_cross_correlation)
         self.cross_button.grid(row=1, column=2, padx=5)
 
+        self.filter_button = tk.Button(button_frame, text="Filtrar Filas/Columnas", command=self.filter_data)
+        self.filter_button.grid(row=1, column=3, padx=5)
+
+        self.estimate_button = tk.Button(button_frame, text="Estimación Rápida", command=self.estimate)
+        self.estimate_button.grid(row=1, column=4, columnspan=2, padx=5)
+
+        self.multi_fdr_button = tk.Button(button_frame, text="FDR Varios Targets", command=self.compute_multi_fdr)
+        self.multi_fdr_button.grid(row=2, column=0, columnspan=2, padx=5)
+
+        self.mi_button = tk.Button(button_frame, text="Información Mutua", command=self.compute_mutual_information)
+        self.mi_button.grid(row=2, column=2, padx=5)
+
+        self.selection_button = tk.Button(button_frame, text="Seleccionar Características", command=self.select_features)
+        self.selection_button.grid(row=2, column=3, columnspan=2, padx=5)
+
+        self.save_session_button = tk.Button(button_frame, text="Guardar Sesión", command=self.save_session)
+        self.save_session_button.grid(row=3, column=0, columnspan=2, padx=5)
+
+        self.open_session_button = tk.Button(button_frame, text="Abrir Sesión", command=self.open_session)
+        self.open_session_button.grid(row=3, column=2, columnspan=2, padx=5)
+
+        self.undo_button = tk.Button(button_frame, text="Deshacer ↩️", command=self.undo)
+        self.undo_button.grid(row=0, column=4, padx=5)
+
+        self.redo_button = tk.Button(button_frame, text="Rehacer ↪️", command=self.redo)
+        self.redo_button.grid(row=0, column=5, padx=5)
+
         # Frame para visualización de datos
         text_frame = tk.Frame(root)
         text_frame.pack(pady=10)
@@ -48,269 +246,73 @@ class DatasetApp:
         # Dataset
         dataset_frame = tk.LabelFrame(text_frame, text="Dataset (Características)")
         dataset_frame.grid(row=0, column=0, padx=10)
-        self.text = ScrolledText(dataset_frame, width=100, height=10)
-        self.text.pack()
+        self.grids["dataset"] = DataGrid(dataset_frame, visible_rows=10)
+        self.grids["dataset"].pack(fill=tk.BOTH, expand=True)
 
         # Targets
         target_frame = tk.LabelFrame(text_frame, text="Targets Seleccionados")
         target_frame.grid(row=1, column=0, padx=10)
-        self.text_targets = ScrolledText(target_frame, width=40, height=10)
-        self.text_targets.pack()
+        self.grids["targets"] = DataGrid(target_frame, visible_rows=10, visible_columns=2)
+        self.grids["targets"].pack(fill=tk.BOTH, expand=True)
 
         # FDR Results
         fdr_frame = tk.LabelFrame(text_frame, text="Resultados del FDR")
         fdr_frame.grid(row=1, column=1, padx=10)
-        self.text_fdr_results = ScrolledText(fdr_frame, width=40, height=10)
-        self.text_fdr_results.pack()
+        self.text_widgets["fdr"] = ScrolledText(fdr_frame, width=40, height=10)
+        self.text_widgets["fdr"].pack()
 
         # Pearson Results
         pearson_frame = tk.LabelFrame(text_frame, text="Resultados de Pearson")
         pearson_frame.grid(row=2, column=0, padx=10)
-        self.text_pearson_results = ScrolledText(pearson_frame, width=40, height = 10)
-        self.text_pearson_results.pack()
+        self.build_threshold_slider(pearson_frame)
+        self.text_widgets["pearson"] = ScrolledText(pearson_frame, width=40, height = 10)
+        self.text_widgets["pearson"].pack()
 
         #Cross Correlation Results
         cross_frame = tk.LabelFrame(text_frame, text="Resultados de Correlación Cruzada")
         cross_frame.grid(row=2,column=1,padx=10)
-        self.text_cross_results = ScrolledText(cross_frame, width=40, height=10)
-        self.text_cross_results.pack()
-
-    def load_csv(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
-        if file_path:
-            dialog = CSVOptionsDialog(self.root)
-            if dialog.result:
-                sep, has_header = dialog.result
-                try:
-                    header = 0 if has_header else None
-                    self.resetAll()
-                    self.df = pd.read_csv(file_path, sep=sep, header=header)
-                    self.display_dataframe()
-                except Exception as e:
-                    messagebox.showerror("Error", f"No se pudo abrir el archivo: {e}")
-
-    def select_target(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "No hay ningún DataFrame cargado.")
-            return
-
-        try:
-            column_input = simpledialog.askstring("Seleccionar target", "Nombre o índice de la columna target:")
-
-            if column_input is None or column_input.strip() == "":
-                return  # El usuario canceló
-
-            # Intentar convertir a entero
-            try:
-                column_key = int(column_input)
-            except ValueError:
-                column_key = column_input.strip()
-
-            if column_key not in self.df.columns:
-                messagebox.showerror("Error", f"La columna '{column_key}' no existe en el DataFrame.")
-                return
-
-            self.targets = self.df[column_key]
-            self.df.drop(column_key, axis=1, inplace=True)
-            self.display_dataframe()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al seleccionar el target: {e}")
-
-    def display_dataframe(self):
-        if self.df is not None:
-            self.text.delete("1.0", tk.END)
-            self.text.insert(tk.END, self.df.to_string())
-        if self.targets is not None:
-            self.text_targets.delete("1.0", tk.END)
-            self.text_targets.insert(tk.END, self.targets.to_string())
-        else:
-            self.text_targets.delete("1.0", tk.END)
-            self.text_fdr_results.delete("1.0", tk.END)
-            self.text_cross_results.delete("1.0", tk.END)
-            self.text_pearson_results.delete("1.0", tk.END)
-        if self.fdr_results:
-            self.text_fdr_results.delete("1.0", tk.END)
-            df_fdr = pd.DataFrame(self.fdr_results, columns=["Característica", "FDR"])
-            df_fdr["FDR"] = df_fdr["FDR"].round(4)
-            self.text_fdr_results.insert(tk.END, df_fdr.to_string())
-        if self.pearson:
-            self.text_pearson_results.delete("1.0", tk.END)
-            df_pearson = pd.DataFrame(self.pearson, columns=["Característica", "Pearson"])
-            df_pearson["Pearson"] = df_pearson["Pearson"].round(4)
-            self.text_pearson_results.insert(tk.END, df_pearson.drop_duplicates().to_string())
-        else:
-            self.text_pearson_results.delete("1.0", tk.END)
-        if self.cross_correlation is not None:
-            self.text_cross_results.delete("1.0", tk.END)
-            df_cross = pd.DataFrame({
-                "Característica": self.df.columns,
-                "Correlación Cruzada": np.round(self.cross_correlation, 4)
-            })
-            self.text_cross_results.insert(tk.END, df_cross.to_string(index=False))
-        else:
-            self.text_cross_results.delete("1.0", tk.END)
-
-    def drop_row(self):
-        if self.df is None:
-            return
-        try:
-            index = simpledialog.askinteger("Eliminar Fila", "Índice de la fila a eliminar:")
-            if index is not None or index.strip() != "":
-                self.df.drop(index, axis=0, inplace=True)
-                self.df.reset_index(drop=True, inplace=True)
-                if self.targets is not None:
-                    self.targets.drop(index, axis=0, inplace=True)
-                    self.targets.reset_index(drop=True, inplace=True)
-                self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar la fila: {e}")
-
-    def drop_column(self):
-        if self.df is None:
-            return
-        try:
-            column_input = simpledialog.askstring("Seleccionar target", "Nombre o índice de la columna target:")
-
-            if column_input is None or column_input.strip() == "":
-                return  # El usuario canceló
-
-            # Intentar convertir a entero
-            try:
-                column_key = int(column_input)
-            except ValueError:
-                column_key = column_input.strip()
-
-            if column_key not in self.df.columns:
-                messagebox.showerror("Error", f"La columna '{column_key}' no existe en el DataFrame.")
-                return
-            
-            self.df.drop(column_key, axis=1, inplace=True)
-            self.display_dataframe()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar la columna: {e}")
-
-    def compute_fdr(self):
-        if self.df is None or self.targets is None:
-            messagebox.showwarning("Advertencia", "Dataset o targets no inicializados.")
-            return
-        try: 
-            classes = np.unique(self.targets)
-            n_classes = len(classes)
-            n_features = self.df.shape[1]
-            fdr_values = np.zeros(n_features)
-
-            for f in range(n_features):
-                fdr_f = 0.0
-                means = []
-                variances = []
-                for c in classes:
-                    X_c = self.df.loc[self.targets == c].iloc[:, f]
-                    means.append(np.mean(X_c))
-                    variances.append(np.var(X_c) + 1e-8)
-
-                for i in range(n_classes):
-                    for j in range(n_classes):
-                        if i != j:
-                            numerator = (means[i] - means[j]) ** 2
-                            denominator = variances[i] + variances[j]
-                            fdr_f += numerator / denominator
-
-                fdr_values[f] = fdr_f
-
-            feature_names = self.df.columns.tolist()
-            self.fdr_results = sorted(zip(feature_names, fdr_values), key=lambda x: x[1], reverse=True)
-            self.display_dataframe()
- 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al calcular FDR: {e}")            
-
-    def compute_cross_correlation(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "DataSet no inicializado")
-            return
-        try:
-            corr = np.abs(np.corrcoef(self.df,rowvar=False))
-            np.fill_diagonal(corr,0)
-            self.cross_correlation = np.sum(corr,axis=0)
-            self.display_dataframe()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo calcular la correlación cruzada: {e}")
-
-    def compute_pearson_coef(self):
-        if self.df is None:
-            messagebox.showwarning("Advertencia", "DataSet no inicializado")
-            return
-        try:
-            coef = simpledialog.askfloat("Coeficiente de Pearson", "Ingrese el coeficiente de Pearson")
-            if coef is None:
-                return
-
-            corr = np.abs(np.corrcoef(self.df, rowvar=False))
-            columns = self.df.columns
-            selected_pairs = []
-
-            for i in range(corr.shape[0]):
-                for j in range(i + 1, corr.shape[1]):
-                    if corr[i, j] >= coef:
-                        selected_pairs.append((columns[i], corr[i, j]))
-                        selected_pairs.append((columns[j], corr[i, j]))
-
-            # Eliminar duplicados manteniendo el mayor coeficiente encontrado por característica
-            pearson_dict = {}
-            for name, value in selected_pairs:
-                if name not in pearson_dict or pearson_dict[name] < value:
-                    pearson_dict[name] = value
-
-            # Convertir a lista ordenada
-            self.pearson = sorted(pearson_dict.items(), key=lambda x: x[1], reverse=True)
-
-            self.display_dataframe()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo calcular Pearson: {e}")
-
-    def resetAll(self):
-        self.df = None
-        self.targets = None
-        self.fdr_results = {}
-        self.pearson = None
-        self.cross_correlation = None
-        return
-
-class CSVOptionsDialog:
-    def __init__(self, parent):
-        self.top = tk.Toplevel(parent)
-        self.top.title("Opciones de carga CSV")
-        self.result = None
-
-        tk.Label(self.top, text="Separador:").pack(padx=10, pady=(10, 0))
-        self.sep_entry = tk.Entry(self.top)
-        self.sep_entry.insert(0, ",")
-        self.sep_entry.pack(padx=10, pady=5)
-
-        self.has_header_var = tk.BooleanVar(value=True)
-        self.header_check = tk.Checkbutton(self.top, text="El archivo tiene encabezado", variable=self.has_header_var)
-        self.header_check.pack(pady=5)
-
-        btn_frame = tk.Frame(self.top)
-        btn_frame.pack(pady=10)
-
-        tk.Button(btn_frame, text="Aceptar", command=self.on_accept).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_frame, text="Cancelar", command=self.top.destroy).pack(side=tk.LEFT, padx=5)
-
-        self.top.grab_set()
-        parent.wait_window(self.top)
-
-    def on_accept(self):
-        sep = self.sep_entry.get()
-        has_header = self.has_header_var.get()
-        self.result = (sep, has_header)
-        self.top.destroy()
+        self.text_widgets["cross"] = ScrolledText(cross_frame, width=40, height=10)
+        self.text_widgets["cross"].pack()
+
+        # Barra de estado de la tarea en segundo plano
+        status_frame = tk.Frame(root)
+        status_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.status_var = tk.StringVar(value="Listo")
+        tk.Label(status_frame, textvariable=self.status_var).pack(side=tk.LEFT)
+        self.cancel_button = tk.Button(status_frame, text="Cancelar", command=self.jobs.cancel)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.progress = ttk.Progressbar(status_frame, length=200, maximum=100)
+        self.progress.pack(side=tk.RIGHT, padx=5)
+        self.cprofile_button = tk.Button(status_frame, text="cProfile", command=self.profile_next)
+        self.cprofile_button.pack(side=tk.RIGHT, padx=5)
+        self.profile_var = tk.BooleanVar(value=PROFILER.enabled)
+        tk.Checkbutton(status_frame, text="Medir tiempos", variable=self.profile_var,
+                       command=self.toggle_profiling).pack(side=tk.RIGHT, padx=5)
+        # Tiempos de la última operación y de su redibujado
+        self.timing_var = tk.StringVar()
+        tk.Label(root, textvariable=self.timing_var, anchor="w").pack(fill=tk.X, padx=10, pady=(0, 5))
+
+    def build_threshold_slider(self, parent):
+        slider_frame = tk.Frame(parent)
+        slider_frame.pack(fill=tk.X)
+        self.threshold_var = tk.DoubleVar(value=0.8)
+        self.threshold_text = tk.StringVar(value="0.80")
+        self.method_var = tk.StringVar(value="Pearson")
+        tk.Label(slider_frame, text="Coeficiente:").pack(side=tk.LEFT)
+        method_box = ttk.Combobox(slider_frame, textvariable=self.method_var, values=("Pearson", "Spearman"),
+                                  state="readonly", width=10)
+        method_box.pack(side=tk.LEFT, padx=(5, 15))
+        method_box.bind("<<ComboboxSelected>>", self.on_method_change)
+        tk.Label(slider_frame, text="Umbral |r|:").pack(side=tk.LEFT)
+        ttk.Scale(slider_frame, from_=0.0, to=1.0, variable=self.threshold_var,
+                  command=self.on_threshold_change).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        tk.Label(slider_frame, textvariable=self.threshold_text, width=5).pack(side=tk.LEFT)
+
+
+def create_app():
+    root = tk.Tk()
+    return DatasetApp(root)
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = DatasetApp(root)
-    root.mainloop()
+    create_app().root.mainloop()
@@ -0,0 +1,441 @@
+import importlib
+import threading
+from tkinter import filedialog, messagebox, simpledialog
+
+from analisis_core.jobs import JobScheduler
+from analisis_core.profiling import PROFILER, format_record
+from widgets import RenderQueue, approximation_text, multi_fdr_text, ranking_text, selection_text
+
+# Tarea cuyos avances traen resultados parciales que se muestran al momento
+ESTIMATE_JOB = "Estimación rápida"
+# Módulos pesados que se importan en segundo plano una vez dibujada la ventana
+PRELOAD_MODULES = ("numpy", "pandas", "analisis_core.analysis")
+# Espera (ms) antes de precargarlos, para que Tk pinte la ventana primero
+PRELOAD_DELAY = 100
+
+
+class DatasetApp:
+    """Lógica común de las dos ventanas (analisis.py y analisisdataset.py).
+
+    Cada ventana construye sus widgets tras llamar a este `__init__` y deja en
+    `grids` las vistas "dataset" y "targets", en `text_widgets` los textos
+    "fdr", "pearson" y "cross", y crea `status_var`, `progress`, `profile_var`,
+    `timing_var` y el deslizador de `build_threshold_slider` (`threshold_var`,
+    `threshold_text`, `method_var`). Los diálogos de cada toolkit se dan como
+    atributos de clase.
+
+    Arrancar no importa numpy, pandas ni los motores: `analysis` se crea con la
+    primera carga o análisis y, mientras tanto, `preload` los importa en un hilo.
+    """
+
+    csv_dialog = None
+    filter_dialog = None
+    multi_target_dialog = None
+    selection_dialog = None
+
+    def __init__(self, root):
+        self.root = root
+        self._analysis = None
+        self._analysis_lock = threading.Lock()
+        self.preloader = None
+        self.grids = {}
+        self.text_widgets = {}
+
+        # Las cargas y análisis corren en segundo plano, una tarea a la vez
+        self.jobs = JobScheduler(root, on_progress=self.on_job_progress)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+
+        # Cada panel se redibuja sólo cuando cambia su parte del análisis
+        self.renderer = RenderQueue(root, {
+            "dataset": self.render_dataset,
+            "targets": self.render_targets,
+            "fdr": self.render_fdr,
+            "pearson": self.render_pearson,
+            "cross": self.render_cross,
+        }, lambda part: self.analysis.revisions[part], on_render=self.show_timings)
+        self.root.after(PRELOAD_DELAY, self.preload)
+
+    @property
+    def analysis(self):
+        # Estado del dataset y análisis, compartido con la línea de comandos. Se crea
+        # en el hilo que lo pide primero, que suele ser el de la tarea de carga
+        if self._analysis is None:
+            with self._analysis_lock:
+                if self._analysis is None:
+                    from analisis_core.analysis import DatasetAnalysis
+
+                    self._analysis = DatasetAnalysis()
+        return self._analysis
+
+    def preload(self):
+        self.preloader = threading.Thread(target=preload_modules, name="analisis-preload", daemon=True)
+        self.preloader.start()
+
+    def preloaded(self):
+        return self.preloader is not None and not self.preloader.is_alive()
+
+    def load_csv(self):
+        if self.is_busy():
+            return
+        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if file_path:
+            dialog = self.csv_dialog(self.root)
+            if dialog.result:
+                sep, has_header, streaming, target_input = dialog.result
+                header = 0 if has_header else None
+
+                def read(job):
+                    target = None
+                    if target_input:
+                        from analisis_core.analysis import parse_column
+                        from analisis_core.streaming import read_columns
+
+                        target = parse_column(read_columns(file_path, sep=sep, header=header), target_input)
+                    return self.analysis.read(file_path, sep=sep, header=header, streaming=streaming, target=target,
+                                              progress=job.report)
+
+                def done(loaded):
+                    # El dataset nuevo se instala en el hilo de Tk y sólo si la carga no se canceló
+                    self.analysis.install(loaded)
+                    self.display_dataframe()
+
+                self.run_job("Abrir CSV", read, done, "No se pudo abrir el archivo")
+
+    def save_session(self):
+        if self.analysis.df is None:
+            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+            return
+        if self.is_busy():
+            return
+        from analisis_core.session import SESSION_EXTENSION
+
+        path = filedialog.asksaveasfilename(defaultextension=SESSION_EXTENSION,
+                                            filetypes=[("Sesión", "*" + SESSION_EXTENSION)])
+        if path:
+            # La huella del CSV lee el archivo entero: se calcula en segundo plano
+            self.run_job("Guardar sesión", lambda job: self.analysis.save_session(path),
+                         lambda result: self.status_var.set("Sesión guardada"), "No se pudo guardar la sesión")
+
+    def open_session(self):
+        if self.is_busy():
+            return
+        from analisis_core.session import SESSION_EXTENSION
+
+        path = filedialog.askopenfilename(filetypes=[("Sesión", "*" + SESSION_EXTENSION)])
+        if not path:
+            return
+
+        def done(unchanged):
+            self.status_var.set("Sesión restaurada" if unchanged
+                                else "Sesión restaurada: el CSV cambió desde que se guardó")
+            self.display_dataframe()
+
+        self.run_job("Abrir sesión", lambda job: self.analysis.restore_session(path, job.report),
+                     done, "No se pudo abrir la sesión")
+
+    def select_target(self):
+        if self.is_busy():
+            return
+        if self.analysis.df is None:
+            messagebox.showwarning("Advertencia", "No hay ningún DataFrame cargado.")
+            return
+        from analisis_core.analysis import parse_column
+
+        try:
+            column_input = simpledialog.askstring("Seleccionar target", "Nombre o índice de la columna target:")
+            if column_input is None or column_input.strip() == "":
+                return
+            column_key = parse_column(self.analysis.df, column_input)
+            if self.analysis.stream is not None:
+                # En streaming se vuelve a recorrer el archivo en segundo plano
+                self.run_job("Seleccionar target", lambda job: self.analysis.select_target(column_key, job.report),
+                             lambda result: self.display_dataframe(), "Error al seleccionar el target")
+                return
+            self.analysis.select_target(column_key)
+            self.display_dataframe()
+        except KeyError as e:
+            messagebox.showerror("Error", e.args[0])
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al seleccionar el target: {e}")
+
+    def drop_row(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        if self.analysis.stream is not None:
+            messagebox.showwarning("Advertencia", "No se pueden eliminar filas en modo streaming.")
+            return
+        try:
+            index = simpledialog.askinteger("Eliminar Fila", "Índice de la fila a eliminar:")
+            if index is not None:
+                self.analysis.drop_row(index)
+                self.display_dataframe()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo eliminar la fila: {e}")
+
+    def drop_column(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        from analisis_core.analysis import parse_column
+
+        try:
+            column_input = simpledialog.askstring("Eliminar Columna", "Nombre o índice de la columna:")
+            if column_input is None or column_input.strip() == "":
+                return
+            self.analysis.drop_column(parse_column(self.analysis.df, column_input))
+            self.display_dataframe()
+        except KeyError as e:
+            messagebox.showerror("Error", e.args[0])
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo eliminar la columna: {e}")
+
+    def filter_data(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        dialog = self.filter_dialog(self.root)
+        if dialog.result is None:
+            return
+        from analisis_core.filters import match_columns, parse_positions
+
+        rows_text, columns_text, options = dialog.result
+        try:
+            rows = parse_positions(rows_text, self.analysis.df.shape[0])
+            columns = match_columns(self.analysis.df.columns, columns_text)
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Error", e.args[0])
+            return
+
+        def done(result):
+            removed_rows, removed_columns = result
+            self.status_var.set(f"Filtrar: {removed_rows} filas y {removed_columns} columnas eliminadas")
+            self.display_dataframe()
+
+        # Todas las eliminaciones son una sola edición: un redibujado y un solo "Deshacer"
+        self.run_job("Filtrar", lambda job: self.analysis.filter(rows, columns, **options),
+                     done, "No se pudo filtrar")
+
+    def undo(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        # Las eliminaciones y el target son ediciones de máscaras: deshacer no recarga el CSV
+        if self.analysis.undo():
+            self.display_dataframe()
+
+    def redo(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        if self.analysis.redo():
+            self.display_dataframe()
+
+    def compute_fdr(self):
+        if self.analysis.df is None or self.analysis.targets is None:
+            messagebox.showwarning("Advertencia", "Dataset o targets no inicializados.")
+            return
+        self.run_job("Calcular FDR", lambda job: self.analysis.compute_fdr(),
+                     lambda result: self.display_dataframe(), "Error al calcular FDR")
+
+    def compute_multi_fdr(self):
+        if self.analysis.df is None or self.is_busy():
+            return
+        from analisis_core.filters import match_columns
+
+        data = self.analysis.data
+        columns = data.active_columns()
+        current = "" if data.target is None else str(data.base.columns[data.target])
+        dialog = self.multi_target_dialog(self.root, current)
+        if dialog.result is None:
+            return
+        text, one_vs_rest, class_pairs = dialog.result
+        try:
+            targets = [columns[i] for i in match_columns(columns, text)]
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Error", e.args[0])
+            return
+        # Una sola pasada por las características para todos los targets
+        self.run_job("FDR varios targets", lambda job: self.analysis.compute_multi_fdr(
+            targets, one_vs_rest=one_vs_rest, class_pairs=class_pairs
+        ), lambda result: self.display_dataframe(), "Error al calcular FDR")
+
+    def compute_mutual_information(self):
+        if self.analysis.df is None or self.analysis.targets is None:
+            messagebox.showwarning("Advertencia", "Dataset o targets no inicializados.")
+            return
+        self.run_job("Información mutua", lambda job: self.analysis.compute_mutual_information(),
+                     lambda result: self.display_dataframe(), "Error al calcular la información mutua")
+
+    def select_features(self):
+        if self.analysis.df is None or self.analysis.targets is None:
+            messagebox.showwarning("Advertencia", "Dataset o targets no inicializados.")
+            return
+        if self.is_busy():
+            return
+        dialog = self.selection_dialog(self.root, min(10, self.analysis.df.shape[1]))
+        if dialog.result is None:
+            return
+        k, weight, relevance, apply = dialog.result
+        # Con "conservar" el resto de columnas se elimina en una sola edición
+        self.run_job("Seleccionar características", lambda job: self.analysis.select_features(
+            k, weight, relevance, apply=apply
+        ), lambda result: self.display_dataframe(), "No se pudo seleccionar características")
+
+    def compute_cross_correlation(self):
+        if self.analysis.df is None:
+            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+            return
+        self.run_job("Correlación cruzada", lambda job: self.analysis.compute_cross_correlation(job.report),
+                     lambda result: self.display_dataframe(), "No se pudo calcular la correlación cruzada")
+
+    def compute_pearson_coef(self):
+        if self.analysis.df is None:
+            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+            return
+        if self.is_busy():
+            return
+        coef = self.threshold_var.get()
+        self.run_job("Coef. Pearson", lambda job: self.analysis.compute_pearson(coef, job.report),
+                     lambda result: self.display_dataframe(), "No se pudo calcular Pearson")
+
+    def estimate(self):
+        if self.analysis.df is None:
+            messagebox.showwarning("Advertencia", "DataSet no inicializado")
+            return
+        if self.is_busy():
+            return
+        from analisis_core.sampling import DEFAULT_SAMPLE_ROWS
+
+        rows = simpledialog.askinteger("Estimación rápida", "Filas de la muestra:",
+                                       initialvalue=DEFAULT_SAMPLE_ROWS, minvalue=100)
+        if rows is None:
+            return
+        # Cancelar detiene el muestreo y deja a la vista la última estimación
+        self.run_job(ESTIMATE_JOB, lambda job: self.analysis.estimate(
+            rows, on_estimate=lambda approximation: job.report(approximation.fraction, approximation.describe())
+        ), lambda result: self.display_dataframe(), "No se pudo estimar")
+
+    def on_threshold_change(self, value):
+        self.threshold_text.set(f"{float(value):.2f}")
+        if self._analysis is None:
+            # Sin datos cargados el umbral sólo se recuerda para el próximo cálculo
+            return
+        if self.analysis.pearson is None and self.analysis.approximation is not None:
+            self.renderer.schedule("pearson")
+        if self.analysis.pearson is None or self.jobs.busy:
+            return
+        # Con la matriz ya cacheada cada umbral se resuelve sin recorrerla de nuevo
+        if self.analysis.update_pearson(float(value)) is not None:
+            self.display_dataframe()
+
+    def on_method_change(self, event=None):
+        if self.is_busy():
+            self.method_var.set(self.analysis.correlation_method.capitalize())
+            return
+        # Cada método tiene su caché: volver a uno ya calculado no recorre los datos
+        self.analysis.set_correlation_method(self.method_var.get().lower())
+        self.display_dataframe()
+
+    def display_dataframe(self):
+        # Se agrupan los pedidos del mismo ciclo de Tk y se redibuja sólo lo que cambió
+        self.renderer.schedule()
+
+    def render_dataset(self):
+        if self.analysis.df is None:
+            self.grids["dataset"].clear()
+        else:
+            self.grids["dataset"].set_data(self.analysis.df)
+
+    def render_targets(self):
+        if self.analysis.targets is None:
+            self.grids["targets"].clear()
+        else:
+            self.grids["targets"].set_data(self.analysis.targets)
+
+    def render_fdr(self):
+        content = ""
+        if self.analysis.fdr_results:
+            content = ranking_text(self.analysis.fdr_results, "FDR")
+        elif self.analysis.multi_fdr is not None:
+            content = multi_fdr_text(*self.analysis.multi_fdr)
+        elif self.analysis.approximation is not None:
+            content = approximation_text(self.analysis.approximation, "fdr")
+        if self.analysis.mi_results:
+            content = (content + "\n\n" if content else "") + ranking_text(self.analysis.mi_results,
+                                                                           "Información mutua")
+        if self.analysis.feature_selection:
+            content = (content + "\n\n" if content else "") + selection_text(self.analysis.feature_selection)
+        self.set_text("fdr", content)
+
+    def render_pearson(self):
+        content = ""
+        if self.analysis.pearson:
+            content = ranking_text(self.analysis.pearson, self.analysis.correlation_method.capitalize(), unique=True)
+        elif self.analysis.approximation is not None:
+            content = approximation_text(self.analysis.approximation, "pearson", self.threshold_var.get())
+        self.set_text("pearson", content)
+
+    def render_cross(self):
+        content = ""
+        if self.analysis.cross_correlation is not None:
+            content = ranking_text(list(zip(self.analysis.df.columns, self.analysis.cross_correlation)),
+                                   "Correlación Cruzada")
+        elif self.analysis.approximation is not None:
+            content = approximation_text(self.analysis.approximation, "cross")
+        self.set_text("cross", content)
+
+    def set_text(self, part, content):
+        widget = self.text_widgets[part]
+        widget.delete("1.0", "end")
+        widget.insert("end", content)
+
+    def is_busy(self):
+        if self.jobs.busy:
+            messagebox.showwarning("Advertencia", "Hay una tarea en curso. Espere a que termine o cancélela.")
+            return True
+        return False
+
+    def run_job(self, name, task, on_done, error_message):
+        def on_error(e):
+            messagebox.showerror("Error", f"{error_message}: {e}")
+
+        if self.jobs.submit(name, task, on_done, on_error) is None:
+            self.is_busy()
+
+    def on_job_progress(self, job, fraction, message):
+        self.status_var.set(f"{job.name}: {message}")
+        if job.name == ESTIMATE_JOB:
+            # Cada refinamiento de la estimación se muestra en cuanto está listo
+            self.display_dataframe()
+        if fraction is None:
+            self.progress.configure(mode="indeterminate")
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.configure(mode="determinate", value=fraction * 100)
+
+    def toggle_profiling(self):
+        PROFILER.enabled = self.profile_var.get()
+        if not PROFILER.enabled:
+            self.timing_var.set("")
+
+    def profile_next(self):
+        # cProfile sólo para la próxima operación; el .prof queda en el directorio actual
+        PROFILER.profile_next()
+        self.profile_var.set(True)
+        self.timing_var.set("cProfile activo para la próxima operación")
+
+    def show_timings(self, panels=None):
+        if PROFILER.enabled:
+            self.timing_var.set("  |  ".join(format_record(record) for record in PROFILER.last(2)))
+
+    def on_close(self):
+        self.jobs.shutdown()
+        self.root.destroy()
+
+
+def preload_modules(modules=PRELOAD_MODULES):
+    # Si alguno falta, el error se muestra al usarlo, no en este hilo
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            return
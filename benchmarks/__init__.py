@@ -0,0 +1 @@
+# Benchmarks reproducibles de las operaciones de análisis sobre datasets sintéticos.
@@ -0,0 +1,81 @@
+"""Ejecuta el benchmark y opcionalmente lo compara con una ejecución anterior.
+
+    python -m benchmarks -o base.json
+    python -m benchmarks -o nuevo.json --compare base.json --threshold 0.2
+    python -m benchmarks --startup -o arranque.json
+
+Termina con código 1 si alguna operación es más lenta que en la base por
+encima del umbral.
+"""
+import argparse
+import json
+import sys
+
+from .startup import run_startup
+from .suite import CLASSES, FEATURES, NAN_RATIOS, OPERATIONS, ROWS, WORKERS, compare, run_suite
+
+
+def int_list(value):
+    return tuple(int(v) for v in value.split(","))
+
+
+def float_list(value):
+    return tuple(float(v) for v in value.split(","))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int_list, default=ROWS, help="filas, separadas por comas")
+    parser.add_argument("--features", type=int_list, default=FEATURES, help="características, separadas por comas")
+    parser.add_argument("--classes", type=int_list, default=CLASSES, help="clases, separadas por comas")
+    parser.add_argument("--nan", type=float_list, default=NAN_RATIOS, help="fracción de NaN, separadas por comas")
+    parser.add_argument("--workers", type=int_list, default=WORKERS,
+                        help="workers (1 = en serie), separados por comas")
+    parser.add_argument("--operations", default=",".join(OPERATIONS),
+                        help="operaciones separadas por comas: " + ", ".join(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por operación (se guarda la mínima)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="grid mínimo para una comprobación rápida")
+    parser.add_argument("--startup", action="store_true",
+                        help="mide el arranque de las dos ventanas en lugar de las operaciones")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="archivo JSON de resultados")
+    parser.add_argument("--compare", metavar="BASE", help="resultados anteriores con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="aumento relativo de tiempo que cuenta como regresión (por defecto 0.25)")
+    parser.add_argument("--min-seconds", type=float, default=0.001,
+                        help="diferencia mínima en segundos para considerar una regresión")
+    args = parser.parse_args(argv)
+
+    operations = [name.strip() for name in args.operations.split(",") if name.strip()]
+    unknown = [name for name in operations if name not in OPERATIONS]
+    if unknown:
+        parser.error(f"operación desconocida: {', '.join(unknown)}")
+    if args.quick:
+        args.rows, args.features, args.classes, args.nan = ROWS[:1], FEATURES[:1], CLASSES[:1], NAN_RATIOS[:1]
+        args.workers = WORKERS[:1]
+
+    if args.startup:
+        current = run_startup(repeat=args.repeat)
+    else:
+        current = run_suite(args.rows, args.features, args.classes, args.nan, operations, args.repeat, args.seed,
+                            workers=args.workers)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(current, fh, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.compare is None:
+        return 0
+    with open(args.compare, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    rows = compare(baseline, current, args.threshold, args.min_seconds)
+    regressions = 0
+    for case, operation, old, new, change, regression in rows:
+        mark = "REGRESIÓN" if regression else ""
+        print(f"{case:<28} {operation:<26} {old * 1000:10.2f} -> {new * 1000:10.2f} ms {change:+8.1%} {mark}")
+        regressions += regression
+    print(f"{regressions} regresiones sobre {len(rows)} mediciones comparadas")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
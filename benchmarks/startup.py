@@ -0,0 +1,82 @@
+"""Tiempo de arranque de las dos ventanas, cada una en un intérprete nuevo.
+
+Para cada lanzador se mide, desde que empieza el script del proceso hijo:
+
+- `startup_import`: importar el módulo del lanzador;
+- `startup_window`: crear la ventana y dibujarla con un primer `update()`;
+- `startup_ready`: terminar la precarga en segundo plano de numpy, pandas y los motores;
+
+y, desde el proceso padre, `startup_process`: lanzar el intérprete, dibujar la
+ventana, precargar y cerrar. El registro de `startup_window` lista qué módulos
+pesados ya estaban importados al dibujarse la ventana (debería estar vacío).
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .suite import Skipped, environment
+
+LAUNCHERS = ("analisis", "analisisdataset")
+HEAVY_MODULES = ("numpy", "pandas", "analisis_core.analysis")
+# Raíz del repositorio: los lanzadores se importan desde ahí
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT = 120
+
+_CHILD = """
+import time
+start = time.perf_counter()
+import importlib, json, sys
+launcher = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+app = launcher.create_app()
+app.root.update()
+shown = time.perf_counter()
+heavy = [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+while not app.preloaded():
+    app.root.update()
+    time.sleep(0.001)
+ready = time.perf_counter()
+app.on_close()
+print(json.dumps({"import": imported - start, "window": shown - start, "ready": ready - start, "heavy": heavy}))
+"""
+
+
+def measure_launcher(launcher, timeout=TIMEOUT):
+    """Tiempos de un arranque de `launcher`; Skipped si no hay pantalla o falta el toolkit."""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-c", _CHILD, launcher, json.dumps(HEAVY_MODULES)],
+                             cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise Skipped(lines[-1] if lines else f"código {process.returncode}")
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    timings["process"] = elapsed
+    return timings
+
+
+def run_startup(launchers=LAUNCHERS, repeat=3, log=print):
+    """Mide `repeat` arranques de cada lanzador y guarda el mínimo de cada etapa."""
+    results = []
+    for launcher in launchers:
+        base = {"case": launcher, "launcher": launcher}
+        try:
+            runs = [measure_launcher(launcher) for _ in range(repeat)]
+        except Skipped as e:
+            results.append(dict(base, operation="startup", skipped=str(e)))
+            log(f"{launcher:<28} {'startup':<26} omitido ({e})")
+            continue
+        heavy = sorted(set().union(*(run["heavy"] for run in runs)))
+        for stage in ("import", "window", "ready", "process"):
+            times = [run[stage] for run in runs]
+            record = dict(base, operation=f"startup_{stage}", seconds=min(times),
+                          mean_seconds=sum(times) / len(times), repeat=repeat)
+            if stage == "window":
+                record["heavy_modules"] = heavy
+            results.append(record)
+            log(f"{launcher:<28} {record['operation']:<26} {min(times) * 1000:10.2f} ms")
+        if heavy:
+            log(f"{launcher:<28} módulos pesados al dibujar la ventana: {', '.join(heavy)}")
+    return {"meta": environment(), "results": results}
@@ -0,0 +1,245 @@
+import itertools
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from analisis_core import CSVCache, DatasetAnalysis
+from analisis_core.parallel import DEFAULT_WORKERS
+
+from .synthetic import TARGET, write_dataset
+
+ROWS = (1_000, 20_000)
+FEATURES = (20, 200)
+CLASSES = (2, 5)
+NAN_RATIOS = (0.0, 0.01)
+# En serie, dos workers y todos los núcleos (sin repetir si la máquina tiene uno o dos)
+WORKERS = tuple(sorted({1, 2, DEFAULT_WORKERS}))
+PEARSON_THRESHOLD = 0.8
+# Características que elige la selección voraz (select_features)
+SELECTED_FEATURES = 10
+
+
+class Case:
+    """Un dataset sintético del grid, con un número de workers, y el estado compartido por sus operaciones.
+
+    Los casos que sólo difieren en `workers` comparten el CSV y la caché.
+    """
+
+    def __init__(self, rows, features, classes, nan_ratio, workers, workdir, seed=0):
+        self.rows = rows
+        self.features = features
+        self.classes = classes
+        self.nan_ratio = nan_ratio
+        self.workers = workers
+        dataset = f"r{rows}_f{features}_c{classes}_nan{nan_ratio:g}"
+        self.name = f"{dataset}_w{workers}"
+        self.path = os.path.join(workdir, dataset + ".csv")
+        if not os.path.exists(self.path):
+            write_dataset(self.path, rows, features, classes, nan_ratio, seed)
+        self.csv_cache = CSVCache(directory=os.path.join(workdir, "cache"))
+        self.csv_cache.read_csv(self.path)
+        self.analysis = DatasetAnalysis(use_cache=False, workers=workers)
+        self.analysis.load(self.path, target=TARGET)
+
+
+def _fresh_analysis(case, cached=False):
+    analysis = DatasetAnalysis(use_cache=False, workers=case.workers)
+    if cached:
+        analysis.csv_cache = case.csv_cache
+    return analysis
+
+
+def _cold_correlation(case):
+    case.analysis.corr_cache.clear()
+    case.analysis.set_correlation_method("pearson")
+    return case.analysis
+
+
+def _cold_ranks(case):
+    case.analysis.rank_cache.clear()
+    case.analysis.set_correlation_method("spearman")
+    return case.analysis
+
+
+def _warm_correlation(case):
+    # El deslizador de umbral parte de una matriz ya cacheada
+    case.analysis.set_correlation_method("pearson")
+    case.analysis.compute_pearson(PEARSON_THRESHOLD)
+    return case.analysis
+
+
+def _ranked_correlation(case):
+    # La selección parte del ranking FDR y de la matriz ya calculados: se mide sólo la parte voraz
+    analysis = _warm_correlation(case)
+    if not analysis.fdr_results:
+        analysis.compute_fdr()
+    return analysis
+
+
+def _saved_session(case):
+    # Sesión con FDR, correlación y Pearson ya calculados; se mide reabrirla (CSV en caché)
+    analysis = _ranked_correlation(case)
+    path = os.path.splitext(case.path)[0] + ".session.npz"
+    analysis.save_session(path)
+    return _fresh_analysis(case, cached=True), path
+
+
+class Skipped(Exception):
+    pass
+
+
+# Cada operación es (preparación, medición): la preparación no se mide y
+# devuelve lo que recibe la función medida.
+OPERATIONS = {
+    "load_csv": (lambda case: _fresh_analysis(case),
+                 lambda case, analysis: analysis.load(case.path)),
+    "load_csv_cached": (lambda case: _fresh_analysis(case, cached=True),
+                        lambda case, analysis: analysis.load(case.path)),
+    "load_csv_streaming": (lambda case: _fresh_analysis(case),
+                           lambda case, analysis: analysis.load(case.path, streaming=True, target=TARGET)),
+    "compute_fdr": (lambda case: case.analysis,
+                    lambda case, analysis: analysis.compute_fdr()),
+    "compute_multi_fdr": (lambda case: case.analysis,
+                          lambda case, analysis: analysis.compute_multi_fdr([TARGET], one_vs_rest=True,
+                                                                             class_pairs=True)),
+    "compute_cross_correlation": (_cold_correlation,
+                                  lambda case, analysis: analysis.compute_cross_correlation()),
+    "compute_spearman": (_cold_ranks,
+                         lambda case, analysis: analysis.compute_cross_correlation()),
+    "mutual_information": (lambda case: case.analysis,
+                           lambda case, analysis: analysis.compute_mutual_information()),
+    "compute_pearson_coef": (_cold_correlation,
+                             lambda case, analysis: analysis.compute_pearson(PEARSON_THRESHOLD)),
+    "pearson_threshold": (_warm_correlation,
+                          lambda case, analysis: analysis.update_pearson(PEARSON_THRESHOLD + 0.1)),
+    "select_features": (_ranked_correlation,
+                        lambda case, analysis: analysis.select_features(SELECTED_FEATURES)),
+    "restore_session": (_saved_session,
+                        lambda case, prepared: prepared[0].restore_session(prepared[1])),
+    "estimate_sample": (lambda case: case.analysis,
+                        lambda case, analysis: analysis.estimate(max_rows=case.rows // 4, seed=0)),
+    "display_dataframe": (lambda case: _display_grid(),
+                          lambda case, grid: _render(grid, case.analysis)),
+}
+
+# Operaciones que no reparten trabajo entre workers: se miden sólo con el primer valor de `workers`
+SERIAL_OPERATIONS = {"load_csv", "load_csv_cached", "load_csv_streaming", "pearson_threshold",
+                     "display_dataframe"}
+
+_GRID = []
+
+
+def _display_grid():
+    """DataGrid en una ventana oculta, o None si no hay pantalla para Tk."""
+    if not _GRID:
+        try:
+            import tkinter as tk
+
+            from widgets import DataGrid
+
+            root = tk.Tk()
+            root.withdraw()
+            grid = DataGrid(root)
+            grid.pack()
+            _GRID.append(grid)
+        except Exception:
+            _GRID.append(None)
+    return _GRID[0]
+
+
+def _render(grid, analysis):
+    if grid is None:
+        raise Skipped("sin pantalla para Tk")
+    grid.set_data(analysis.df)
+    grid.update_idletasks()
+
+
+def measure(case, setup, func, repeat):
+    """Tiempos de `repeat` ejecuciones y pico de memoria de una ejecución aparte.
+
+    El pico se mide con tracemalloc (numpy y pandas registran ahí sus buffers)
+    en una ejecución separada para que el rastreo no altere los tiempos.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup(case)
+        start = time.perf_counter()
+        func(case, state)
+        times.append(time.perf_counter() - start)
+    state = setup(case)
+    tracemalloc.start()
+    try:
+        func(case, state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run_suite(rows=ROWS, features=FEATURES, classes=CLASSES, nan_ratios=NAN_RATIOS,
+              operations=None, repeat=3, seed=0, log=print, workers=WORKERS):
+    operations = list(operations or OPERATIONS)
+    workdir = tempfile.mkdtemp(prefix="analisis-bench-")
+    results = []
+    try:
+        for grid_point in itertools.product(rows, features, classes, nan_ratios, workers):
+            case = Case(*grid_point, workdir=workdir, seed=seed)
+            for name in operations:
+                if name in SERIAL_OPERATIONS and case.workers != workers[0]:
+                    continue
+                setup, func = OPERATIONS[name]
+                record = {
+                    "case": case.name, "operation": name, "rows": case.rows, "features": case.features,
+                    "classes": case.classes, "nan_ratio": case.nan_ratio, "workers": case.workers,
+                }
+                try:
+                    times, peak = measure(case, setup, func, repeat)
+                except Skipped as e:
+                    record["skipped"] = str(e)
+                    log(f"{case.name:<32} {name:<26} omitido ({e})")
+                else:
+                    record.update(seconds=min(times), mean_seconds=float(np.mean(times)), repeat=repeat,
+                                  peak_bytes=peak)
+                    log(f"{case.name:<32} {name:<26} {min(times) * 1000:10.2f} ms {peak / 2 ** 20:10.1f} MiB")
+                results.append(record)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"meta": environment(), "results": results}
+
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline, current, threshold=0.25, min_seconds=0.001):
+    """Compara dos ejecuciones: [(caso, operación, antes, ahora, cambio relativo, regresión)].
+
+    Hay regresión si el tiempo crece más de `threshold` (0.25 = 25 %) y la
+    diferencia absoluta supera `min_seconds`, para no marcar ruido en
+    operaciones de microsegundos.
+    """
+    before = {(r["case"], r["operation"]): r for r in baseline["results"] if "seconds" in r}
+    rows = []
+    for record in current["results"]:
+        key = (record["case"], record["operation"])
+        if "seconds" not in record or key not in before:
+            continue
+        old, new = before[key]["seconds"], record["seconds"]
+        change = (new - old) / old if old > 0 else 0.0
+        regression = change > threshold and new - old > min_seconds
+        rows.append((key[0], key[1], old, new, change, regression))
+    return rows
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+TARGET = "target"
+
+
+def make_classification(rows, features, classes, nan_ratio=0.0, informative=0.2, redundant=0.1, seed=0):
+    """DataFrame sintético de clasificación con `features` columnas y la columna `target`.
+
+    Una fracción `informative` de las características tiene una media distinta
+    por clase (FDR alto), otra fracción `redundant` son combinaciones lineales
+    con ruido de las informativas (pares con Pearson alto) y el resto es ruido.
+    `nan_ratio` es la fracción de celdas de características reemplazadas por NaN.
+    Con la misma semilla el resultado es idéntico.
+    """
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, classes, rows)
+    X = rng.standard_normal((rows, features))
+
+    n_informative = max(1, int(features * informative))
+    centers = rng.normal(scale=2.0, size=(classes, n_informative))
+    X[:, :n_informative] += centers[y]
+
+    n_redundant = min(int(features * redundant), features - n_informative)
+    if n_redundant:
+        sources = rng.integers(0, n_informative, n_redundant)
+        scale = rng.uniform(0.5, 2.0, n_redundant)
+        noise = rng.normal(scale=0.1, size=(rows, n_redundant))
+        X[:, n_informative:n_informative + n_redundant] = X[:, sources] * scale + noise
+
+    if nan_ratio > 0:
+        X[rng.random(X.shape) < nan_ratio] = np.nan
+
+    df = pd.DataFrame(X, columns=[f"f{i}" for i in range(features)])
+    df[TARGET] = y
+    return df
+
+
+def write_dataset(path, rows, features, classes, nan_ratio=0.0, seed=0):
+    make_classification(rows, features, classes, nan_ratio, seed=seed).to_csv(path, index=False)
+    return path
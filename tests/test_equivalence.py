@@ -0,0 +1,137 @@
+"""Los motores NaN-aware frente a la referencia de pandas, con datos aleatorios con NaN."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_core.fdr import VAR_EPS, class_statistics, fdr_scores, multi_target_fdr
+from analisis_core.pairwise import PairwiseStats, pair_counts, pairwise_correlation
+from analisis_core.relevance import rank_columns
+from analisis_core.tiled import correlation_columns, tiled_correlation
+from analisis_core.streaming import StreamingStats
+
+
+def random_data(rows=400, features=12, classes=3, nan=0.1, seed=0):
+    """(X, y) con NaN dispersos, una columna sin NaN y otra sin valores en la clase 0."""
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, classes, rows)
+    X = rng.normal(size=(rows, features)) + y[:, None] * rng.normal(size=features)
+    X[rng.random(X.shape) < nan] = np.nan
+    X[:, 0] = rng.normal(size=rows)
+    X[y == 0, 1] = np.nan
+    return X, y
+
+
+def reference_fdr(X, y):
+    # Medias y varianzas (ddof=0) por clase de pandas, que ignora los NaN
+    groups = pd.DataFrame(X).groupby(y)
+    means, variances = groups.mean().to_numpy(), groups.var(ddof=0).to_numpy() + VAR_EPS
+    fdr = np.zeros(X.shape[1])
+    for i in range(len(means)):
+        for j in range(len(means)):
+            if i != j:
+                fdr += (means[i] - means[j]) ** 2 / (variances[i] + variances[j])
+    return fdr
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("workers, executor", [(1, "thread"), (3, "thread"), (2, "process")])
+def test_fdr_matches_pandas(dtype, workers, executor):
+    X, y = random_data()
+    rtol = 1e-9 if dtype == np.float64 else 1e-4
+    scores = fdr_scores(X.astype(dtype), y, workers=workers, executor=executor, block_size=5)
+    np.testing.assert_allclose(scores, reference_fdr(X, y), rtol=rtol)
+
+
+def test_class_statistics_match_pandas():
+    X, y = random_data()
+    classes, counts, means, variances = class_statistics(X, y)
+    groups = pd.DataFrame(X).groupby(y)
+    np.testing.assert_array_equal(classes, np.unique(y))
+    np.testing.assert_array_equal(counts, np.bincount(y))
+    np.testing.assert_allclose(means, groups.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(variances, groups.var(ddof=0).to_numpy(), rtol=1e-9)
+
+
+def test_multi_target_fdr_matches_pandas():
+    X, y = random_data()
+    other = np.random.default_rng(1).choice(np.array(["a", "b", "c", "d"]), len(y))
+    results = multi_target_fdr(X, [y, other], names=["y", "otro"], block_size=5)
+    for result, target in zip(results, [y, other]):
+        np.testing.assert_allclose(result.scores, reference_fdr(X, target), rtol=1e-9)
+
+
+def test_pairwise_correlation_matches_pandas():
+    X, _ = random_data()
+    frame = pd.DataFrame(X)
+    # Bloques de filas pequeños: las sumas se acumulan en varios pasos
+    corr, counts = pairwise_correlation(X, chunk_rows=64)
+    np.testing.assert_allclose(corr, frame.corr().to_numpy(), rtol=1e-9, atol=1e-12)
+    present = frame.notna().to_numpy().astype(np.int64)
+    np.testing.assert_array_equal(counts, present.T @ present)
+    rows, cols = np.triu_indices(X.shape[1], k=1)
+    np.testing.assert_array_equal(pair_counts(X, rows, cols), (present.T @ present)[rows, cols])
+
+
+@pytest.mark.parametrize("memory_budget", [2 ** 20, 20_000])
+def test_tiled_correlation_matches_pandas(memory_budget):
+    # Con 1 MiB X estandarizada se calcula una vez; con 20 kB cada bloque estandariza sus columnas
+    X, _ = random_data()
+    expected = pd.DataFrame(X).corr().to_numpy()
+    tiled = tiled_correlation(X, threshold=0.0, memory_budget=memory_budget)
+    rows, cols, values = tiled.pairs
+    np.testing.assert_allclose(values, np.abs(expected[rows, cols]), rtol=1e-9, atol=1e-12)
+    assert len(values) == X.shape[1] * (X.shape[1] - 1) // 2
+    column = correlation_columns(X, memory_budget=memory_budget)
+    np.testing.assert_allclose(column(1), expected[:, 1], rtol=1e-9, atol=1e-12)
+
+
+def test_spearman_matches_pandas():
+    X, _ = random_data(nan=0.0)
+    X[:, 1] = np.random.default_rng(2).normal(size=len(X))
+    frame = pd.DataFrame(X)
+    np.testing.assert_array_equal(rank_columns(X), frame.rank().to_numpy())
+    corr, _ = pairwise_correlation(rank_columns(X))
+    np.testing.assert_allclose(corr, frame.corr(method="spearman").to_numpy(), rtol=1e-9, atol=1e-12)
+
+    # Con NaN los rangos no se recalculan por par: es una aproximación de pandas, cercana
+    # si los NaN están dispersos (la columna 1, sin valores en la clase 0, queda fuera)
+    X, _ = random_data()
+    frame = pd.DataFrame(X)
+    np.testing.assert_array_equal(rank_columns(X), frame.rank().to_numpy())
+    corr, _ = pairwise_correlation(rank_columns(X))
+    dispersed = np.r_[0, 2:X.shape[1]]
+    np.testing.assert_allclose(corr[np.ix_(dispersed, dispersed)],
+                               frame.corr(method="spearman").to_numpy()[np.ix_(dispersed, dispersed)], atol=0.01)
+
+
+def test_pairwise_downdate_matches_pandas():
+    X, _ = random_data()
+    stats = PairwiseStats(range(X.shape[1]))
+    for r0 in range(0, len(X), 100):
+        stats.update(X[r0:r0 + 100])
+    stats.remove_rows(X[100:200])
+    remaining = np.concatenate([X[:100], X[200:]])
+    np.testing.assert_allclose(stats.correlation(), pd.DataFrame(remaining).corr().to_numpy(),
+                               rtol=1e-8, atol=1e-12)
+
+
+def test_streaming_update_and_downdate_match_pandas():
+    X, y = random_data(nan=0.0)
+    X[:, 1] = np.random.default_rng(2).normal(size=len(X))
+    columns = [f"f{i}" for i in range(X.shape[1])]
+    stats = StreamingStats(columns)
+    for r0 in range(0, len(X), 100):
+        stats.update(X[r0:r0 + 100], y[r0:r0 + 100])
+    stats.remove_rows(X[100:200], y[100:200])
+    keep = np.r_[0:100, 200:len(X)]
+    frame = pd.DataFrame(X[keep], columns=columns)
+
+    assert stats.count == len(keep)
+    np.testing.assert_allclose(stats.mean, frame.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(stats.covariance(), frame.cov().to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(stats.correlation(), frame.corr().to_numpy(), rtol=1e-9, atol=1e-12)
+    _, counts, means, variances = stats.class_statistics()
+    groups = frame.groupby(y[keep])
+    np.testing.assert_array_equal(counts, groups.count().to_numpy())
+    np.testing.assert_allclose(means, groups.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(variances, groups.var(ddof=0).to_numpy(), rtol=1e-8)
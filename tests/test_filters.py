@@ -0,0 +1,86 @@
+"""Expresiones de posiciones y columnas y criterios de `filter_positions`."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_core import filters
+from analisis_core.filters import filter_positions, match_columns, parse_positions
+
+from .test_equivalence import random_data
+
+
+def test_parse_positions():
+    np.testing.assert_array_equal(parse_positions("0-3, 8, 5:6, 9..9", 10), [0, 1, 2, 3, 5, 6, 8, 9])
+    # Repetidas y solapadas una sola vez, en orden
+    np.testing.assert_array_equal(parse_positions("4, 2-4,, 3", 5), [2, 3, 4])
+    assert len(parse_positions(" ", 5)) == 0
+    for text in ("3-1", "a", "1-2-3"):
+        with pytest.raises(ValueError):
+            parse_positions(text, 10)
+    for text in ("10", "8-10", "-1"):
+        with pytest.raises(ValueError, match="fuera de rango"):
+            parse_positions(text, 10)
+
+
+def test_match_columns():
+    columns = ["temp_a", "temp_b", "hum", "7", "presion"]
+    np.testing.assert_array_equal(match_columns(columns, "temp_*"), [0, 1])
+    np.testing.assert_array_equal(match_columns(columns, "presion, 0"), [0, 4])
+    np.testing.assert_array_equal(match_columns(columns, "1-2, *on"), [1, 2, 4])
+    # Un número que es el nombre de una columna gana a la posición
+    np.testing.assert_array_equal(match_columns(columns, "7"), [3])
+    np.testing.assert_array_equal(match_columns(columns, "4"), [4])
+    np.testing.assert_array_equal(match_columns(columns, "h?m, temp_[b]"), [1, 2])
+    with pytest.raises(KeyError):
+        match_columns(columns, "viento")
+
+
+def reference(X, rows, columns, max_row_nan, max_column_nan, drop_constant, bounds):
+    # Los mismos criterios con pandas, columna a columna y fila a fila
+    frame = pd.DataFrame(X)
+    drop_rows, drop_columns = set(rows), set(columns)
+    if max_row_nan is not None:
+        drop_rows |= set(np.flatnonzero(frame.isna().mean(axis=1) > max_row_nan))
+    if max_column_nan is not None:
+        drop_columns |= set(np.flatnonzero(frame.isna().mean(axis=0) > max_column_nan))
+    if drop_constant:
+        drop_columns |= set(np.flatnonzero(frame.nunique() <= 1))
+    for column, (low, high) in (bounds or {}).items():
+        values = frame[column]
+        outside = (values < low if low is not None else False) | (values > high if high is not None else False)
+        drop_rows |= set(np.flatnonzero(outside))
+    return sorted(drop_rows), sorted(drop_columns)
+
+
+@pytest.mark.parametrize("chunk", [filters.ROW_CHUNK, 7])
+def test_filter_positions_matches_reference(monkeypatch, chunk):
+    # Bloques de 7 filas: los criterios se acumulan entre bloques
+    monkeypatch.setattr(filters, "ROW_CHUNK", chunk)
+    X, _ = random_data(rows=120, features=8, nan=0.2, seed=11)
+    X[:, 3] = 2.5
+    X[:, 4] = np.nan
+    X[5, 6] = 1e6
+    X[::2, 7] = np.nan
+    X[1::2, 7] = -1.0
+
+    cases = [
+        dict(rows=[0, 119], columns=[2]),
+        dict(max_row_nan=0.25),
+        dict(max_column_nan=0.3),
+        dict(drop_constant=True),
+        dict(bounds={0: (-1.0, None), 6: (None, 100.0)}),
+        dict(rows=[3], max_row_nan=0.0, max_column_nan=0.5, drop_constant=True, bounds={1: (-2.0, 2.0)}),
+    ]
+    for options in cases:
+        options = {"rows": (), "columns": (), "max_row_nan": None, "max_column_nan": None,
+                   "drop_constant": False, "bounds": None, **options}
+        drop_rows, drop_columns = filter_positions(X, **options)
+        expected_rows, expected_columns = reference(X, **options)
+        np.testing.assert_array_equal(drop_rows, expected_rows)
+        np.testing.assert_array_equal(drop_columns, expected_columns)
+
+    # Un solo intervalo vale para todas las columnas; los NaN no cuentan como fuera
+    drop_rows, _ = filter_positions(X, bounds=(-3.0, 3.0))
+    expected, _ = reference(X, (), (), None, None, False, dict.fromkeys(range(X.shape[1]), (-3.0, 3.0)))
+    np.testing.assert_array_equal(drop_rows, expected)
+    assert 5 in drop_rows
@@ -0,0 +1,122 @@
+"""Eliminar, deshacer y rehacer sobre `MaskedDataset`, también tras compactar."""
+import numpy as np
+import pandas as pd
+
+from analisis_core import DatasetAnalysis
+from analisis_core.masked import MaskedDataset
+
+from .test_equivalence import random_data
+
+
+def base_frame(rows=10):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(rows, 3)), columns=["a", "b", "c"])
+    frame["y"] = np.arange(rows) % 2
+    return frame
+
+
+def edit(data, change):
+    data.apply(change)
+    data.record(change)
+
+
+def undo(data):
+    data.apply(data.pop_undo())
+
+
+def redo(data):
+    data.apply(data.pop_redo())
+
+
+def assert_active(data, base, rows, columns):
+    # Filas y columnas activas, en posiciones del DataFrame original
+    pd.testing.assert_frame_equal(data.features().to_frame(),
+                                  base.iloc[rows][columns].reset_index(drop=True))
+    np.testing.assert_array_equal(data.row_origin[data.positions()[0]], rows)
+
+
+def test_drop_undo_redo_rows_and_columns():
+    base = base_frame()
+    data = MaskedDataset(base, target="y")
+    all_rows = list(range(10))
+    assert_active(data, base, all_rows, ["a", "b", "c"])
+
+    edit(data, ("rows", np.array([1, 2]), False))
+    edit(data, ("columns", np.array([1]), False))
+    edit(data, ("batch", [("rows", np.array([7]), False), ("columns", np.array([0]), False)], None))
+    assert_active(data, base, [0, 3, 4, 5, 6, 8, 9], ["c"])
+    np.testing.assert_array_equal(data.target_series(), base["y"].iloc[[0, 3, 4, 5, 6, 8, 9]])
+
+    # El lote se deshace de una vez; después, en orden inverso
+    undo(data)
+    assert_active(data, base, [0, 3, 4, 5, 6, 7, 8, 9], ["a", "c"])
+    undo(data)
+    undo(data)
+    assert_active(data, base, all_rows, ["a", "b", "c"])
+    assert data.pop_undo() is None
+
+    redo(data)
+    assert_active(data, base, [0, 3, 4, 5, 6, 7, 8, 9], ["a", "b", "c"])
+    redo(data)
+    redo(data)
+    assert_active(data, base, [0, 3, 4, 5, 6, 8, 9], ["c"])
+    assert data.pop_redo() is None
+
+    # Una edición nueva descarta lo que quedaba por rehacer
+    undo(data)
+    edit(data, ("rows", np.array([0]), False))
+    assert not data.redo_stack
+    assert_active(data, base, [3, 4, 5, 6, 7, 8, 9], ["a", "c"])
+
+
+def test_compact_keeps_history():
+    base = base_frame()
+    data = MaskedDataset(base, target="y", undo_limit=2, compact_ratio=0.3)
+    edit(data, ("rows", np.array([0, 1, 2, 3]), False))
+    edit(data, ("rows", np.array([5]), False))
+    # La tercera edición hace definitiva la primera: se descartan sus 4 filas
+    edit(data, ("columns", np.array([1]), False))
+    assert data.base.shape[0] == 6
+    np.testing.assert_array_equal(data.row_origin, [4, 5, 6, 7, 8, 9])
+    assert_active(data, base, [4, 6, 7, 8, 9], ["a", "c"])
+
+    # El historial se renumeró: deshacer y rehacer siguen apuntando a las mismas filas
+    undo(data)
+    assert_active(data, base, [4, 6, 7, 8, 9], ["a", "b", "c"])
+    undo(data)
+    assert_active(data, base, [4, 5, 6, 7, 8, 9], ["a", "b", "c"])
+    assert data.pop_undo() is None
+    redo(data)
+    redo(data)
+    assert_active(data, base, [4, 6, 7, 8, 9], ["a", "c"])
+    assert data.target_series().tolist() == base["y"].iloc[[4, 6, 7, 8, 9]].tolist()
+
+
+def test_analysis_undo_redo_keeps_correlation(tmp_path):
+    X, y = random_data(rows=200, features=5, nan=0.05, seed=8)
+    frame = pd.DataFrame(X, columns=list("abcde"))
+    frame["y"] = y
+    path = tmp_path / "datos.csv"
+    frame.to_csv(path, index=False)
+    analysis = DatasetAnalysis(use_cache=False, workers=1)
+    analysis.load(str(path), target="y")
+    analysis.compute_cross_correlation()
+
+    def check(rows, columns):
+        # La caché se actualiza con cada edición (downdate) y debe coincidir con pandas
+        expected = frame.iloc[rows][columns].astype(np.float32).astype(np.float64).corr().to_numpy()
+        corr = analysis.corr_cache.get(analysis.df, analysis.data_version)
+        np.testing.assert_allclose(corr, expected, rtol=1e-6, atol=1e-9)
+        assert list(analysis.df.columns) == columns
+
+    analysis.drop_rows([0, 5, 6])
+    analysis.drop_column("c")
+    rows = [r for r in range(200) if r not in (0, 5, 6)]
+    check(rows, ["a", "b", "d", "e"])
+    assert analysis.undo()
+    check(rows, list("abcde"))
+    assert analysis.undo()
+    check(list(range(200)), list("abcde"))
+    assert analysis.redo() and analysis.redo()
+    check(rows, ["a", "b", "d", "e"])
+    assert not analysis.can_redo
@@ -0,0 +1,67 @@
+"""La ejecución en paralelo, con hilos o procesos, da exactamente lo mismo que en serie."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_core import DatasetAnalysis
+from analisis_core.fdr import fdr_scores, multi_target_fdr
+from analisis_core.tiled import tiled_correlation
+
+from .test_equivalence import random_data
+
+PARALLEL = [(2, "thread"), (3, "thread"), (2, "process")]
+
+
+@pytest.mark.parametrize("workers, executor", PARALLEL)
+def test_parallel_fdr_is_identical(workers, executor):
+    X, y = random_data(rows=500, features=23)
+    other = np.random.default_rng(1).integers(0, 5, len(y))
+    np.testing.assert_array_equal(fdr_scores(X, y, workers=workers, executor=executor, block_size=4),
+                                  fdr_scores(X, y, workers=1, block_size=4))
+    serial = multi_target_fdr(X, [y, other], one_vs_rest=True, class_pairs=True, block_size=4)
+    parallel = multi_target_fdr(X, [y, other], one_vs_rest=True, class_pairs=True, workers=workers,
+                                executor=executor, block_size=4)
+    for a, b in zip(parallel, serial):
+        for field in ("scores", "one_vs_rest", "pair_scores"):
+            np.testing.assert_array_equal(getattr(a, field), getattr(b, field))
+
+
+@pytest.mark.parametrize("workers, executor", PARALLEL)
+def test_parallel_correlation_is_identical(workers, executor):
+    X, _ = random_data(rows=500, features=23)
+    # Presupuesto mínimo: varios bloques de características, repartidos entre los workers
+    options = dict(threshold=0.05, top_k=3, memory_budget=64_000)
+    serial = tiled_correlation(X, workers=1, **options)
+    parallel = tiled_correlation(X, workers=workers, executor=executor, **options)
+    for a, b in zip(parallel, serial):
+        if isinstance(a, tuple):
+            for part_a, part_b in zip(a, b):
+                np.testing.assert_array_equal(part_a, part_b)
+        else:
+            np.testing.assert_array_equal(a, b)
+
+
+def test_parallel_analysis_is_identical(tmp_path):
+    X, y = random_data(rows=300, features=30, nan=0.05, seed=7)
+    frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    frame["y"] = y
+    path = tmp_path / "datos.csv"
+    frame.to_csv(path, index=False)
+
+    def results(workers):
+        analysis = DatasetAnalysis(use_cache=False, workers=workers)
+        # Con más características que `wide_features` la correlación va por bloques
+        analysis.corr_cache.wide_features = 10
+        analysis.corr_cache.memory_budget = 40_000
+        analysis.load(str(path), target="y")
+        return (analysis.compute_fdr(), analysis.compute_multi_fdr(["y"], one_vs_rest=True)[1],
+                list(analysis.compute_cross_correlation()), analysis.pearson_pairs(0.1))
+
+    serial, parallel = results(1), results(3)
+    # 'f1' no tiene valores en la clase 0: su FDR es NaN en los dos casos
+    assert [name for name, _ in parallel[0]] == [name for name, _ in serial[0]]
+    np.testing.assert_array_equal([score for _, score in parallel[0]], [score for _, score in serial[0]])
+    for a, b in zip(parallel[1], serial[1]):
+        np.testing.assert_array_equal(a.scores, b.scores)
+        np.testing.assert_array_equal(a.one_vs_rest, b.one_vs_rest)
+    assert parallel[2:] == serial[2:]
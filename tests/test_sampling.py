@@ -0,0 +1,39 @@
+"""Estimaciones por muestreo con NaN en los datos."""
+import numpy as np
+import pandas as pd
+
+from analisis_core.sampling import SampleStats, array_batches, progressive
+
+from .test_equivalence import random_data, reference_fdr
+
+
+def test_sample_estimates_ignore_missing_values():
+    X, y = random_data(rows=2000, features=6, nan=0.1, seed=5)
+    X[:, 1] = np.random.default_rng(6).normal(size=len(X))
+    stats = SampleStats(range(X.shape[1]), seed=0)
+    approximations = list(progressive(stats, array_batches(X, y, batch_rows=500, seed=0)))
+    final = approximations[-1]
+    assert final.rows == len(X)
+
+    # Con todas las filas la estimación puntual es el cálculo exacto
+    frame = pd.DataFrame(X)
+    r, low, high = final.correlation
+    np.testing.assert_allclose(r, frame.corr().to_numpy(), rtol=1e-8, atol=1e-12)
+    fdr = {name: (score, lo, hi) for name, score, lo, hi, _, _ in final.fdr}
+    np.testing.assert_allclose([fdr[i][0] for i in range(X.shape[1])], reference_fdr(X, y), rtol=1e-8)
+
+    for approximation in approximations:
+        r, low, high = approximation.correlation
+        assert np.isfinite(low).all() and np.isfinite(high).all()
+        assert (low <= r + 1e-12).all() and (r <= high + 1e-12).all()
+        assert all(np.isfinite(part).all() for part in approximation.cross)
+        assert all(np.isfinite(lo) and np.isfinite(hi) and lo <= score <= hi
+                   for _, score, lo, hi, _, _ in approximation.fdr)
+        assert approximation.pearson_pairs(0.0)
+
+    # Los pares con menos observaciones tienen un intervalo más ancho
+    counts = frame.notna().to_numpy().astype(int)
+    counts = counts.T @ counts
+    width = high - low
+    assert width[0, 2] > width[0, 1]
+    assert counts[0, 2] < counts[0, 1]
@@ -0,0 +1,93 @@
+"""Guardar y reabrir sesiones: resultados restaurados tal cual o recalculados si cambió el CSV."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from analisis_core import DatasetAnalysis
+
+from .test_equivalence import random_data
+
+
+def write_csv(path, seed=9):
+    X, y = random_data(rows=300, features=8, nan=0.05, seed=seed)
+    frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    frame["y"] = y
+    frame.to_csv(path, index=False)
+
+
+def edited_analysis(path):
+    # Ediciones por posición y todos los análisis que guarda una sesión
+    analysis = DatasetAnalysis(use_cache=False, workers=1)
+    analysis.load(str(path), target="y")
+    analysis.drop_rows([0, 10, 20])
+    analysis.drop_column("f3")
+    analysis.filter(rows=[5], max_column_nan=0.5)
+    analysis.drop_column("f5")
+    analysis.undo()
+    analysis.compute_fdr()
+    analysis.compute_cross_correlation()
+    analysis.compute_pearson(0.1)
+    analysis.compute_mutual_information(8)
+    analysis.select_features(3)
+    return analysis
+
+
+def assert_same_results(restored, expected, exact=True):
+    compare = np.testing.assert_array_equal if exact else np.testing.assert_allclose
+    assert list(restored.df.columns) == list(expected.df.columns)
+    assert restored.df.shape == expected.df.shape
+    for name in ("fdr_results", "pearson", "mi_results", "feature_selection"):
+        a, b = getattr(restored, name), getattr(expected, name)
+        assert [row[0] for row in a] == [row[0] for row in b], name
+        compare(np.array([row[1:] for row in a], dtype=np.float64),
+                np.array([row[1:] for row in b], dtype=np.float64))
+    compare(restored.cross_correlation, expected.cross_correlation)
+
+
+def test_round_trip_restores_results(tmp_path):
+    path = tmp_path / "datos.csv"
+    write_csv(path)
+    analysis = edited_analysis(path)
+    session = str(tmp_path / "sesion.npz")
+    analysis.save_session(session)
+
+    restored = DatasetAnalysis(use_cache=False, workers=1)
+    assert restored.restore_session(session)
+    assert_same_results(restored, analysis)
+    np.testing.assert_array_equal(restored.df.to_numpy(), analysis.df.to_numpy())
+    np.testing.assert_array_equal(restored.targets, analysis.targets)
+    # La caché de correlación vuelve con la sesión: el umbral se cambia sin recalcular
+    assert restored.update_pearson(0.2) == analysis.update_pearson(0.2)
+
+    # El historial también: rehacer y deshacer dan lo mismo que en la sesión original
+    assert restored.can_redo
+    restored.redo()
+    analysis.redo()
+    assert list(restored.df.columns) == list(analysis.df.columns)
+    while restored.undo():
+        assert analysis.undo()
+    assert not analysis.can_undo
+    assert restored.df.shape == analysis.df.shape
+
+    # Cambiar sólo la fecha no obliga a recalcular: decide el contenido
+    os.utime(path, (1, 1))
+    touched = DatasetAnalysis(use_cache=False, workers=1)
+    assert touched.restore_session(session)
+
+
+def test_changed_source_recomputes(tmp_path):
+    path = tmp_path / "datos.csv"
+    write_csv(path)
+    saved = edited_analysis(path)
+    session = str(tmp_path / "sesion.npz")
+    saved.save_session(session)
+
+    # Mismas columnas y filas con otros valores: se reaplica el historial y se recalcula
+    write_csv(path, seed=10)
+    restored = DatasetAnalysis(use_cache=False, workers=1)
+    assert not restored.restore_session(session)
+    expected = edited_analysis(path)
+    assert_same_results(restored, expected, exact=False)
+    np.testing.assert_allclose(restored.df.to_numpy(), expected.df.to_numpy())
+    assert [name for name, _ in restored.fdr_results] != [name for name, _ in saved.fdr_results]
@@ -0,0 +1,34 @@
+"""Tipos de `compact_frame` y su ida y vuelta por la caché de CSV."""
+import numpy as np
+import pandas as pd
+
+from analisis_core.csvcache import CSVCache
+from analisis_core.store import compact_frame, numeric_block
+
+
+def test_compact_frame_keeps_integers_exact(tmp_path):
+    n = 40
+    rng = np.random.default_rng(0)
+    ids = (np.arange(n) + 2 ** 25).astype(np.float64)
+    ids[3] = np.nan
+    frame = pd.DataFrame({"id": np.arange(n) + 2 ** 40, "a": rng.normal(size=n), "label": rng.integers(0, 3, n),
+                          "ids": ids, "b": rng.normal(size=n), "text": ["x", "y"] * (n // 2)})
+    path = tmp_path / "datos.csv"
+    frame.to_csv(path, index=False)
+
+    compact = compact_frame(pd.read_csv(path))
+    # Los enteros se reducen sin pasar a float; los float que float32 no conserva quedan aparte
+    assert compact["label"].dtype == np.int8
+    np.testing.assert_array_equal(compact["id"].to_numpy(), frame["id"].to_numpy())
+    np.testing.assert_array_equal(compact["ids"].to_numpy(), ids)
+    block, positions = numeric_block(compact)
+    assert block.dtype == np.float32 and block.shape == (n, 2)
+    np.testing.assert_array_equal(positions, [-1, 0, -1, -1, 1, -1])
+
+    cache = CSVCache(str(tmp_path / "cache"))
+    first, hit = cache.read_csv(str(path))
+    assert not hit
+    cached, hit = cache.read_csv(str(path))
+    assert hit
+    pd.testing.assert_frame_equal(cached, first)
+    np.testing.assert_array_equal(numeric_block(cached)[1], positions)
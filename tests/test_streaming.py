@@ -0,0 +1,74 @@
+"""El modo streaming, por bloques y con NaN, frente al cálculo en memoria."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_core import DatasetAnalysis, LoadedCSV
+from analisis_core.streaming import StreamingStats, stream_csv
+
+from .test_equivalence import random_data
+
+
+@pytest.fixture
+def nan_csv(tmp_path):
+    X, y = random_data(rows=300, features=6, nan=0.15, seed=3)
+    frame = pd.DataFrame(X, columns=list("abcdef"))
+    frame.insert(3, "y", y)
+    path = tmp_path / "datos.csv"
+    frame.to_csv(path, index=False)
+    return str(path), frame
+
+
+def analyses(path):
+    memory = DatasetAnalysis(use_cache=False, workers=1)
+    memory.load(path, target="y")
+    # Bloques de 37 filas: ninguno coincide con los límites de las clases ni de los NaN
+    stats, preview = stream_csv(path, target="y", chunksize=37)
+    streaming = DatasetAnalysis(use_cache=False, workers=1)
+    streaming.install(LoadedCSV(preview, stats, (path, ",", 0), "y"))
+    return memory, streaming
+
+
+def test_streaming_matches_in_memory(nan_csv):
+    path, frame = nan_csv
+    memory, streaming = analyses(path)
+
+    # 'b' no tiene valores en la clase 0: su FDR es NaN en los dos caminos
+    expected = dict(memory.compute_fdr())
+    names, scores = zip(*streaming.compute_fdr())
+    np.testing.assert_allclose(scores, [expected[name] for name in names], rtol=1e-5)
+    np.testing.assert_allclose(streaming.compute_cross_correlation(), memory.compute_cross_correlation(),
+                               rtol=1e-5)
+    assert [(a, b, n) for a, b, _, n in streaming.pearson_pairs(0.0)] == \
+        [(a, b, n) for a, b, _, n in memory.pearson_pairs(0.0)]
+    selected, expected_selected = streaming.compute_pearson(0.1), memory.compute_pearson(0.1)
+    assert selected and [name for name, _ in selected] == [name for name, _ in expected_selected]
+
+    features = frame.drop(columns="y")
+    _, counts, means, variances = streaming.stream.class_statistics()
+    groups = features.groupby(frame["y"])
+    np.testing.assert_array_equal(counts, groups.count().to_numpy())
+    np.testing.assert_allclose(means, groups.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(variances, groups.var(ddof=0).to_numpy(), rtol=1e-8)
+    present = features.notna().to_numpy().astype(np.int64)
+    np.testing.assert_array_equal(streaming.stream.counts, present.T @ present)
+
+
+def test_streaming_downdate_with_nan_matches_pandas():
+    X, y = random_data(rows=300, features=6, nan=0.15, seed=4)
+    stats = StreamingStats(range(X.shape[1]))
+    for r0 in range(0, len(X), 37):
+        stats.update(X[r0:r0 + 37], y[r0:r0 + 37])
+    stats.remove_rows(X[37:74], y[37:74])
+    keep = np.r_[0:37, 74:len(X)]
+    frame = pd.DataFrame(X[keep])
+
+    assert stats.count == len(keep)
+    np.testing.assert_allclose(stats.mean, frame.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(stats.correlation(), frame.corr().to_numpy(), rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(stats.covariance(), frame.cov().to_numpy(), rtol=1e-8, atol=1e-12)
+    _, counts, means, variances = stats.class_statistics()
+    groups = frame.groupby(y[keep])
+    np.testing.assert_array_equal(counts, groups.count().to_numpy())
+    np.testing.assert_allclose(means, groups.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(variances, groups.var(ddof=0).to_numpy(), rtol=1e-8, atol=1e-12)
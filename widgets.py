@@ -0,0 +1,273 @@
+import tkinter as tk
+from tkinter import ttk
+
+from analisis_core.profiling import PROFILER
+
+# numpy, pandas y los motores se importan dentro de cada función: las ventanas
+# construyen sus vistas sin cargarlos y, cuando hay datos que mostrar, ya están en memoria.
+
+VISIBLE_ROWS = 20
+VISIBLE_COLUMNS = 12
+ROW_HEIGHT = 20
+COLUMN_WIDTH = 90
+
+
+class DataGrid(ttk.Frame):
+    """Vista virtualizada de un DataFrame sobre un ttk.Treeview.
+
+    Sólo se formatean las filas y columnas visibles: el Treeview contiene como
+    mucho `VISIBLE_ROWS` elementos y las barras de desplazamiento mueven una
+    ventana sobre los datos en lugar de desplazar el widget. Cada redibujado
+    cuesta O(filas visibles × columnas visibles) sin importar el tamaño del dataset.
+    """
+
+    def __init__(self, parent, visible_rows=VISIBLE_ROWS, visible_columns=VISIBLE_COLUMNS):
+        super().__init__(parent)
+        self.data = None
+        self.first_row = 0
+        self.first_column = 0
+        self.visible_rows = visible_rows
+        self.visible_columns = visible_columns
+
+        # Salto directo a una fila
+        jump_frame = ttk.Frame(self)
+        jump_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(jump_frame, text="Ir a fila:").pack(side="left")
+        self.jump_entry = ttk.Entry(jump_frame, width=10)
+        self.jump_entry.pack(side="left", padx=5)
+        self.jump_entry.bind("<Return>", lambda event: self.jump())
+        ttk.Button(jump_frame, text="Ir", command=self.jump).pack(side="left")
+        self.info_var = tk.StringVar()
+        ttk.Label(jump_frame, textvariable=self.info_var).pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(body, show="headings", height=visible_rows, selectmode="browse")
+        self.vscroll = ttk.Scrollbar(body, orient="vertical", command=self.on_vscroll)
+        self.hscroll = ttk.Scrollbar(self, orient="horizontal", command=self.on_hscroll)
+        self.vscroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.hscroll.pack(fill="x")
+
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.tree.bind("<Configure>", self.on_resize)
+
+    def set_data(self, data):
+        import pandas as pd
+
+        if isinstance(data, pd.Series):
+            data = data.to_frame()
+        self.data = data
+        self.first_row = 0
+        self.first_column = 0
+        self.render()
+
+    def clear(self):
+        self.set_data(None)
+
+    @property
+    def n_rows(self):
+        return 0 if self.data is None else self.data.shape[0]
+
+    @property
+    def n_columns(self):
+        return 0 if self.data is None else self.data.shape[1]
+
+    def goto(self, row):
+        max_first = max(self.n_rows - self.visible_rows, 0)
+        self.first_row = min(max(int(row), 0), max_first)
+        self.render()
+
+    def jump(self):
+        try:
+            self.goto(int(self.jump_entry.get()))
+        except ValueError:
+            return
+
+    def scroll_rows(self, amount):
+        self.goto(self.first_row + amount)
+
+    def scroll_columns(self, amount):
+        max_first = max(self.n_columns - self.visible_columns, 0)
+        self.first_column = min(max(self.first_column + amount, 0), max_first)
+        self.render()
+
+    def on_vscroll(self, action, value, unit=None):
+        if action == "moveto":
+            self.goto(float(value) * self.n_rows)
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_rows(int(value) * step)
+
+    def on_hscroll(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_columns(int(float(value) * self.n_columns) - self.first_column)
+        elif action == "scroll":
+            step = self.visible_columns if unit == "pages" else 1
+            self.scroll_columns(int(value) * step)
+
+    def on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        rows = max((event.height - ROW_HEIGHT) // ROW_HEIGHT, 1)
+        columns = max(event.width // COLUMN_WIDTH - 1, 1)
+        if rows != self.visible_rows or columns != self.visible_columns:
+            self.visible_rows = rows
+            self.visible_columns = columns
+            self.render()
+
+    def render(self):
+        if self.data is None:
+            self.tree.delete(*self.tree.get_children())
+            self.tree.configure(columns=())
+            self.vscroll.set(0, 1)
+            self.hscroll.set(0, 1)
+            self.info_var.set("")
+            return
+
+        row_stop = min(self.first_row + self.visible_rows, self.n_rows)
+        column_stop = min(self.first_column + self.visible_columns, self.n_columns)
+        window = self.data.iloc[self.first_row:row_stop, self.first_column:column_stop]
+
+        headers = ["#"] + [str(c) for c in window.columns]
+        if tuple(self.tree["columns"]) != tuple(f"c{i}" for i in range(len(headers))):
+            self.tree.configure(columns=[f"c{i}" for i in range(len(headers))])
+        for i, name in enumerate(headers):
+            self.tree.heading(f"c{i}", text=name)
+            self.tree.column(f"c{i}", width=COLUMN_WIDTH, stretch=False, anchor="e")
+
+        # Se reutilizan los elementos existentes; sólo cambian sus valores
+        items = self.tree.get_children()
+        for pos, (label, values) in enumerate(zip(window.index, window.itertuples(index=False, name=None))):
+            row = [str(label)] + [format_value(v) for v in values]
+            if pos < len(items):
+                self.tree.item(items[pos], values=row)
+            else:
+                self.tree.insert("", "end", values=row)
+        if len(items) > window.shape[0]:
+            self.tree.delete(*items[window.shape[0]:])
+
+        total_rows = max(self.n_rows, 1)
+        total_columns = max(self.n_columns, 1)
+        self.vscroll.set(self.first_row / total_rows, row_stop / total_rows)
+        self.hscroll.set(self.first_column / total_columns, column_stop / total_columns)
+        self.info_var.set(f"Filas {self.first_row}-{max(row_stop - 1, 0)} de {self.n_rows} · "
+                          f"{self.n_columns} columnas")
+
+
+class RenderQueue:
+    """Redibuja sólo los paneles cuyo estado cambió, una vez por ciclo de Tk.
+
+    `renderers` asocia cada panel a la función que lo dibuja y `revision(panel)`
+    devuelve una clave que cambia cuando cambian sus datos. `schedule()` puede
+    llamarse varias veces seguidas: el redibujado se hace una sola vez en
+    `after_idle` y sólo para los paneles cuya clave difiere de la ya dibujada.
+    """
+
+    def __init__(self, root, renderers, revision, on_render=None):
+        self.root = root
+        self.renderers = renderers
+        self.revision = revision
+        self.on_render = on_render
+        self.rendered = {}
+        self.forced = set()
+        self._pending = None
+
+    def schedule(self, *force):
+        # Los paneles de `force` se redibujan aunque su clave no haya cambiado
+        self.forced.update(force)
+        if self._pending is None:
+            self._pending = self.root.after_idle(self.flush)
+
+    def flush(self):
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+        dirty = [panel for panel in self.renderers
+                 if panel in self.forced or self.rendered.get(panel) != self.revision(panel)]
+        self.forced.clear()
+        if dirty:
+            with PROFILER.track("display_dataframe"):
+                for panel in dirty:
+                    with PROFILER.track(panel):
+                        self.renderers[panel]()
+                    self.rendered[panel] = self.revision(panel)
+        if self.on_render is not None:
+            self.on_render(dirty)
+
+
+def format_value(value):
+    import numpy as np
+
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def approximation_text(approximation, part, threshold=None):
+    """Tabla de texto de una estimación por muestreo ("fdr", "pearson" o "cross") con sus intervalos."""
+    import pandas as pd
+
+    level = f"IC {approximation.confidence:.0%}"
+    if part == "fdr":
+        if approximation.fdr is None:
+            return ""
+        table = pd.DataFrame(approximation.fdr, columns=["Característica", "FDR", "Inferior", "Superior",
+                                                         "Mejor rango", "Peor rango"])
+    elif part == "cross":
+        scores, low, high = approximation.cross
+        table = pd.DataFrame({"Característica": approximation.columns, "Correlación Cruzada": scores,
+                              "Inferior": low, "Superior": high})
+    else:
+        # Pares cuyo intervalo de |r| alcanza el umbral; los seguros tienen el inferior por encima
+        table = pd.DataFrame(approximation.pearson_pairs(threshold),
+                             columns=["Característica A", "Característica B", "|r|", "Inferior", "Superior"])
+    header = f"Estimación: {approximation.describe()} ({level} en Inferior/Superior)\n\n"
+    return header + table.round(4).to_string(index=False)
+
+
+def multi_fdr_text(features, results, top=10, best=3):
+    """Texto del FDR con varios targets: ranking de cada uno y, si se calcularon, las mejores
+    características de cada clase contra el resto y de cada par de clases."""
+    import pandas as pd
+
+    from analisis_core.fdr import rank_features
+
+    def leaders(scores):
+        return ", ".join(f"{name} ({format_value(score)})" for name, score in rank_features(features, scores)[:best])
+
+    sections = []
+    for result in results:
+        table = pd.DataFrame(rank_features(features, result.scores)[:top], columns=["Característica", "FDR"])
+        lines = [f"Target: {result.target} ({len(result.classes)} clases)", table.round(4).to_string(index=False)]
+        if result.one_vs_rest is not None:
+            lines.append("Clase contra el resto:")
+            lines += [f"  {label}: {leaders(scores)}" for label, scores in zip(result.classes, result.one_vs_rest)]
+        if result.pair_scores is not None:
+            lines.append("Pares de clases:")
+            lines += [f"  {result.classes[i]} / {result.classes[j]}: {leaders(scores)}"
+                      for (i, j), scores in zip(result.pairs, result.pair_scores)]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def selection_text(selection):
+    """Texto de `DatasetAnalysis.feature_selection`: características en el orden en que se eligieron."""
+    import pandas as pd
+
+    table = pd.DataFrame(selection, columns=["Característica", "Relevancia", "Redundancia", "Puntaje"])
+    header = f"Selección de {len(selection)} características (relevancia y redundancia |r| media):\n"
+    return header + table.round(4).to_string(index=False)
+
+
+def ranking_text(results, name, unique=False):
+    """Tabla de texto de una lista [(característica, valor)] con los valores redondeados a 4 decimales."""
+    import pandas as pd
+
+    table = pd.DataFrame(results, columns=["Característica", name]).round(4)
+    if unique:
+        table = table.drop_duplicates()
+    return table.to_string(index=False)